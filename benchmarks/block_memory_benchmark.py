@@ -0,0 +1,132 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Measure the memory used by the blocks created in a scrape cycle of a synthetic facility, with the compact slotted
+Block and with an equivalent block keeping its attributes in an instance dictionary, as Block used to.
+
+Every channel of every instrument is parsed into a new block, as happens when all of a facility's archiver
+pages change. The peak memory of the cycle, the memory held by its blocks once they are all created, and the
+rate at which it is allocated at the usual scrape interval are reported for each.
+
+Run from the root of the repository with::
+
+    python -m benchmarks.block_memory_benchmark
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+import tracemalloc
+
+from mock import patch
+
+from benchmarks.payloads import instrument_sources
+from block import Block
+from external_webpage.web_page_parser import WebPageParser
+
+# Seconds between the scrapes of an instrument the allocation rate is reported for
+SCRAPE_INTERVAL = 5
+
+# Block as it was before it had slots: the same class with an instance dictionary
+DictBlock = type(
+    "DictBlock",
+    (object,),
+    {
+        key: value
+        for key, value in vars(Block).items()
+        if key not in Block.__slots__ and key not in ("__slots__", "__dict__", "__weakref__")
+    },
+)
+
+
+def facility_pages(number_of_instruments, number_of_blocks):
+    """
+    Args:
+        number_of_instruments: number of instruments in the facility
+        number_of_blocks: number of blocks on each instrument
+
+    Returns: list of the blocks, dataweb and instrument archiver pages of every instrument
+    """
+    pages = []
+    for _ in range(number_of_instruments):
+        sources = instrument_sources(number_of_blocks)
+        pages.extend(
+            [
+                sources.get_json_from_blocks_archive(),
+                sources.get_json_from_dataweb_archive(),
+                sources.get_json_from_instrument_archive(),
+            ]
+        )
+    return pages
+
+
+def measure_cycle(pages):
+    """
+    Parse every page of a scrape cycle into blocks, measuring the memory used.
+    Args:
+        pages: the archiver pages of the facility
+
+    Returns: tuple of the peak memory of the cycle and the memory held by its blocks, in bytes, and the time it
+        took in seconds
+    """
+    parser = WebPageParser()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        blocks = [parser.extract_blocks(page) for page in pages]
+        elapsed = time.perf_counter() - start
+        held, peak = tracemalloc.get_traced_memory()
+        del blocks
+    finally:
+        tracemalloc.stop()
+    return peak - baseline, held - baseline, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory used by blocks in a scrape.")
+    parser.add_argument("--instruments", type=int, default=40, help="Number of instruments")
+    parser.add_argument(
+        "--blocks", type=int, default=150, help="Number of blocks on each instrument"
+    )
+    args = parser.parse_args()
+
+    pages = facility_pages(args.instruments, args.blocks)
+    channels = sum(len(page["Channels"]) for page in pages)
+    print("{} instruments, {} channels per cycle".format(args.instruments, channels))
+    print(
+        "{:<10}{:>12}{:>16}{:>16}{:>14}{:>12}".format(
+            "block", "bytes/block", "peak MiB", "held MiB", "MiB/s", "cycle ms"
+        )
+    )
+    for name, block_class in [("dict", DictBlock), ("slotted", Block)]:
+        with patch("external_webpage.web_page_parser.Block", block_class):
+            peak, held, elapsed = measure_cycle(pages)
+        print(
+            "{:<10}{:>12.0f}{:>16.2f}{:>16.2f}{:>14.3f}{:>12.1f}".format(
+                name,
+                held / channels,
+                peak / 2.0**20,
+                held / 2.0**20,
+                held / 2.0**20 / SCRAPE_INTERVAL,
+                elapsed * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
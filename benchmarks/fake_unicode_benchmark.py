@@ -0,0 +1,116 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Compare the single pass decoder of the archiver's fake unicode escapes with the repeated search it replaced, on
+long waveform and character array values.
+
+Run from the root of the repository with::
+
+    python -m benchmarks.fake_unicode_benchmark
+"""
+
+from __future__ import print_function
+
+import argparse
+import re
+import timeit
+
+from external_webpage.web_page_parser import decode_fake_unicode
+
+
+def _replace_first_fake_unicode(value):
+    """
+    The previous decoder: replace the first run of escapes, searching from the start of the value.
+    Args:
+        value: the value to use
+
+    Returns: tuple of new value and whether a replace was made
+    """
+    match = re.search(r"((?:\\u[\d-]{4})+)", value)
+    if match is None:
+        return value, False
+
+    start, end = match.span(1)
+    asbytearray = bytearray()
+    for string_val in re.split(r"\\u", match.group(1))[1:]:
+        val = int(string_val)
+        if val < 0:
+            val += 256
+        asbytearray.append(val)
+    return value[:start] + asbytearray.decode("utf-8") + value[end:], True
+
+
+def repeated_search_decode(value):
+    """
+    Args:
+        value: the value to decode
+
+    Returns: the value decoded by the previous decoder
+    """
+    replaced = True
+    while replaced:
+        value, replaced = _replace_first_fake_unicode(value)
+    return value
+
+
+def values(length):
+    """
+    Args:
+        length: number of elements in the waveforms and character arrays
+
+    Returns: list of tuple of name and value, as the archiver serves them
+    """
+    return [
+        ("short value", "12.345"),
+        ("waveform", " ".join("{:.3f}".format(index * 0.5) for index in range(length))),
+        ("ascii char array", "sample position {} ".format(length) * (length // 20)),
+        ("escaped char array", "T=4K \\u-062\\u-080C, B=1\\u-062\\u-075T " * (length // 30)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fake unicode decoders.")
+    parser.add_argument(
+        "--length", type=int, default=1000, help="Number of elements in the array values"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timings, the best is used")
+    parser.add_argument("--number", type=int, default=200, help="Decodes in each timing")
+    args = parser.parse_args()
+
+    print(
+        "{:<22}{:>10}{:>18}{:>18}{:>10}".format(
+            "value", "chars", "repeated/s", "single pass/s", "speed-up"
+        )
+    )
+    for name, value in values(args.length):
+        assert decode_fake_unicode(value) == repeated_search_decode(value)
+        times = [
+            min(timeit.repeat(lambda: decode(value), repeat=args.repeat, number=args.number))
+            for decode in (repeated_search_decode, decode_fake_unicode)
+        ]
+        print(
+            "{:<22}{:>10}{:>18.0f}{:>18.0f}{:>9.1f}x".format(
+                name,
+                len(value),
+                args.number / times[0],
+                args.number / times[1],
+                times[0] / times[1],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
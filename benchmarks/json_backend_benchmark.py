@@ -0,0 +1,92 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Compare the encode and decode throughput of the installed JSON backends on realistic instrument payloads.
+
+Run from the root of the repository with::
+
+    python -m benchmarks.json_backend_benchmark
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import timeit
+
+from benchmarks.payloads import collated_instrument_data, instrument_sources
+from external_webpage.json_backend import available_backends
+
+
+def payloads(number_of_blocks):
+    """
+    Args:
+        number_of_blocks: number of blocks on the instrument
+
+    Returns: list of tuple of name and object of the payloads encoded and decoded by the server
+    """
+    sources = instrument_sources(number_of_blocks)
+    return [
+        ("instrument data", collated_instrument_data(number_of_blocks)),
+        ("configuration", sources.read_config()),
+        ("blocks archive page", sources.get_json_from_blocks_archive()),
+    ]
+
+
+def benchmark(backend, obj, repeat, number):
+    """
+    Time encoding and decoding an object with a backend.
+    Args:
+        backend: the JSON backend
+        obj: the object to encode and decode
+        repeat: number of times to repeat the timing; the best is used
+        number: number of encodes or decodes in each timing
+
+    Returns: tuple of encodes per second and decodes per second
+    """
+    encoded = backend.dumps(obj)
+    encode_time = min(timeit.repeat(lambda: backend.dumps(obj), repeat=repeat, number=number))
+    decode_time = min(timeit.repeat(lambda: backend.loads(encoded), repeat=repeat, number=number))
+    return number / encode_time, number / decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the throughput of the JSON backends.")
+    parser.add_argument(
+        "--blocks", type=int, default=100, help="Number of blocks on the instrument"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timings, the best is used")
+    parser.add_argument("--number", type=int, default=200, help="Operations per timing")
+    args = parser.parse_args()
+
+    print(
+        "{:<22}{:<10}{:>10}{:>16}{:>16}".format(
+            "payload", "backend", "bytes", "encode/s", "decode/s"
+        )
+    )
+    for name, obj in payloads(args.blocks):
+        size = len(json.dumps(obj))
+        for backend in available_backends():
+            encodes, decodes = benchmark(backend, obj, args.repeat, args.number)
+            print(
+                "{:<22}{:<10}{:>10}{:>16.0f}{:>16.0f}".format(
+                    name, backend.name, size, encodes, decodes
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Realistic instrument payloads for the benchmarks, built from the data mothers used by the tests.
+"""
+
+from builtins import object, range
+
+from external_webpage.instrument_information_collator import InstrumentInformationCollator
+from tests.data_mother import ArchiveMother, ConfigMother
+
+PV_PREFIX = "TE:NDW1798:"
+
+# Instrument PVs shown on the dataweb page, with typical values
+INST_PV_VALUES = {
+    "RUNSTATE": "RUNNING",
+    "RUNNUMBER": "00012345",
+    "_RBNUMBER": "1920001",
+    "TITLE": "Sample in magnet, 5 K, field scan",
+    "_USERNAME": "A User, Another User",
+    "STARTTIME": "10/19/2017 09:04:16",
+    "RUNDURATION": "3725",
+    "RUNDURATION_PD": "3725",
+    "GOODFRAMES": "186250",
+    "GOODFRAMES_PD": "186250",
+    "RAWFRAMES": "186300",
+    "RAWFRAMES_PD": "186300",
+    "PERIOD": "1",
+    "NUMPERIODS": "1",
+    "BEAMCURRENT": "180.2",
+    "TOTALUAMPS": "167.8",
+    "COUNTRATE": "12.5",
+    "TOTALCOUNTS": "1254368",
+    "SHUTTER": "OPEN",
+    "SIM_MODE": "NO",
+    "TITLEDISP": "YES",
+    "TIME_OF_DAY": "10/19/2017 10:06:21",
+}
+
+
+class _PayloadReader(object):
+    """
+    Reader returning fixed archiver pages and configuration instead of reading them from an instrument.
+    """
+
+    def __init__(self, config, blocks_page, dataweb_page, instrument_page):
+        self._config = config
+        self._blocks_page = blocks_page
+        self._dataweb_page = dataweb_page
+        self._instrument_page = instrument_page
+
+    def read_config(self):
+        return self._config
+
+    def get_json_from_blocks_archive(self):
+        return self._blocks_page
+
+    def get_json_from_dataweb_archive(self):
+        return self._dataweb_page
+
+    def get_json_from_instrument_archive(self):
+        return self._instrument_page
+
+
+def instrument_sources(number_of_blocks=100, number_of_groups=10):
+    """
+    Create the configuration and archiver pages of an instrument.
+    Args:
+        number_of_blocks: number of blocks in the configuration
+        number_of_groups: number of groups the blocks are spread between
+
+    Returns: a reader returning the configuration and pages
+    """
+    block_names = ["BLOCK_{}".format(index) for index in range(number_of_blocks)]
+    groups = [
+        ConfigMother.create_group("GROUP_{}".format(group), block_names[group::number_of_groups])
+        for group in range(number_of_groups)
+    ]
+    config = ConfigMother.create_config(
+        name="benchmark",
+        blocks=[ConfigMother.create_block(name) for name in block_names],
+        groups=groups,
+    )
+
+    blocks_page = ArchiveMother.create_info_page(
+        [
+            ArchiveMother.create_channel(
+                name=name, value="{:.6f}".format(index * 1.234567), units="mm"
+            )
+            for index, name in enumerate(block_names)
+        ]
+    )
+    rc_channels = []
+    for name in block_names:
+        for suffix, value in [
+            ("LOW", "0.0"),
+            ("HIGH", "100.0"),
+            ("INRANGE", "YES"),
+            ("ENABLE", "NO"),
+        ]:
+            rc_channels.append(
+                ArchiveMother.create_channel(name="{}:RC:{}.VAL".format(name, suffix), value=value)
+            )
+    dataweb_page = ArchiveMother.create_info_page(rc_channels)
+    instrument_page = ArchiveMother.create_info_page(
+        [
+            ArchiveMother.create_channel(name="{}.VAL".format(pv), value=value)
+            for pv, value in INST_PV_VALUES.items()
+        ]
+    )
+    return _PayloadReader(config, blocks_page, dataweb_page, instrument_page)
+
+
+def collated_instrument_data(number_of_blocks=100, number_of_groups=10):
+    """
+    Create the data served for an instrument, collated from its configuration and archiver pages.
+    Args:
+        number_of_blocks: number of blocks in the configuration
+        number_of_groups: number of groups the blocks are spread between
+
+    Returns: the collated data
+    """
+    reader = instrument_sources(number_of_blocks, number_of_groups)
+    return InstrumentInformationCollator("localhost", PV_PREFIX, reader).collate()
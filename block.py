@@ -33,6 +33,21 @@ class Block(object):
     # Status hen the block is disconnected
     DISCONNECTED = "Disconnected"
 
+    # Blocks are created for every channel on every scrape, so keep them compact without an instance dictionary
+    __slots__ = (
+        "name",
+        "status",
+        "value",
+        "alarm",
+        "visibility",
+        "low",
+        "high",
+        "inrange",
+        "enabled",
+        "units",
+        "precision",
+    )
+
     def __init__(self, name, status, value, alarm, visibility, precision=None, units=""):
         """
         Standard constructor.
@@ -140,6 +155,32 @@ class Block(object):
         """Sets the block's enabled status."""
         self.enabled = value
 
+    def clear_rc_values(self):
+        """Clears the block's run control values, as for a newly created block."""
+        self.low = None
+        self.high = None
+        self.inrange = None
+        self.enabled = "NO"
+
+    def description_key(self):
+        """
+        Returns: a tuple of everything the block's description is made from, which is equal for two blocks
+            exactly when their descriptions are
+        """
+        return (
+            self.name,
+            self.status,
+            self.value,
+            self.alarm,
+            self.visibility,
+            self.precision,
+            self.units,
+            self.low,
+            self.high,
+            self.inrange,
+            self.enabled,
+        )
+
     def is_connected(self):
         """
         :return Whether this block is connected
@@ -1,10 +1,23 @@
 from __future__ import unicode_literals
 
 import logging
+import sys
+from builtins import object
 from collections import OrderedDict
 
 logger = logging.getLogger("JSON_bourne")
 
+# Number of channel names whose shortened titles and run control details are kept for an instrument
+TITLE_TABLE_SIZE = 4096
+
+# Suffix of each run control PV and the block method setting its value
+_RC_SETTERS = {
+    "LOW.VAL": "set_rc_low",
+    "HIGH.VAL": "set_rc_high",
+    "INRANGE.VAL": "set_rc_inrange",
+    "ENABLE.VAL": "set_rc_enabled",
+}
+
 
 def shorten_title(title):
     """
@@ -29,29 +42,107 @@ def shorten_title(title):
         return title_parts[-1]
 
 
-def set_rc_values_for_blocks(blocks, run_control_pvs):
+def parse_rc_pv(pv):
+    """
+    Gets the block a run control PV belongs to and the setting it holds.
+
+    Args:
+        pv: The shortened title of the run control PV, e.g. BLOCK:RC:LOW.VAL
+
+    Returns: tuple of the block name and the name of the block method setting the value; None if the PV is not a
+        run control setting
+
+    """
+    pv_parts = pv.split(":")
+    return pv_parts[0].strip(), _RC_SETTERS.get(pv_parts[-1])
+
+
+class TitleTable(object):
+    """
+    Bounded table of the shortened titles and run control details of an instrument's channels, which rarely
+    change between scrapes, so they are worked out once rather than on every scrape. Shortened titles are
+    interned so the blocks of every scrape share the same name strings. The least recently used entries are
+    dropped when the table is full, and the table should be cleared when the configuration changes.
+    """
+
+    def __init__(self, size=TITLE_TABLE_SIZE):
+        """
+        Initialize.
+        Args:
+            size: maximum number of entries kept in each of the tables
+        """
+        self._size = size
+        self._titles = OrderedDict()
+        self._rc_pvs = OrderedDict()
+
+    def _lookup(self, table, key, calculate):
+        """
+        Args:
+            table: the table to look in
+            key: the key to look up
+            calculate: function calculating the value from the key if it is not in the table
+
+        Returns: the value for the key
+        """
+        try:
+            value = table[key]
+            table.move_to_end(key)
+            return value
+        except KeyError:
+            value = calculate(key)
+            table[key] = value
+            if len(table) > self._size:
+                table.popitem(last=False)
+            return value
+
+    def shorten_title(self, title):
+        """
+        Args:
+            title: The PV address as string.
+
+        Returns: the title shortened by shorten_title, interned
+
+        """
+        return self._lookup(self._titles, title, lambda key: sys.intern(shorten_title(key)))
+
+    def parse_rc_pv(self, pv):
+        """
+        Args:
+            pv: The shortened title of the run control PV
+
+        Returns: the block name and run control setter name as returned by parse_rc_pv
+
+        """
+        return self._lookup(self._rc_pvs, pv, parse_rc_pv)
+
+    def clear(self):
+        """
+        Forget every title, e.g. because the configuration has changed.
+        """
+        self._titles.clear()
+        self._rc_pvs.clear()
+
+    def __len__(self):
+        return len(self._titles) + len(self._rc_pvs)
+
+
+def set_rc_values_for_blocks(blocks, run_control_pvs, titles=None):
     """
     Set all RC values for all the given blocks. Blocks contains the blocks and their run control settings
     Args:
         blocks: dictionary of {pv_names : block_objects} containing info blocks
         run_control_pvs: dictionary of {pv_names : block_objects} containing run control settings
+        titles (TitleTable): the table to look up the run control details of the PVs in; None to parse them
     """
+    parse = parse_rc_pv if titles is None else titles.parse_rc_pv
     for pv, block_object in run_control_pvs.items():
-        pv_parts = pv.split(":")
-        name = pv_parts[0].strip()
-        suffix = pv_parts[-1]
+        name, setter = parse(pv)
 
         try:
             block = blocks[name]
 
-            if "LOW.VAL" == suffix:
-                block.set_rc_low(block_object.get_value())
-            elif "HIGH.VAL" == suffix:
-                block.set_rc_high(block_object.get_value())
-            elif "INRANGE.VAL" == suffix:
-                block.set_rc_inrange(block_object.get_value())
-            elif "ENABLE.VAL" == suffix:
-                block.set_rc_enabled(block_object.get_value())
+            if setter is not None:
+                getattr(block, setter)(block_object.get_value())
         except KeyError:
             logging.info("Could not find block but it has runcontrol pvs {}".format(name))
 
@@ -0,0 +1,110 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Adaptive interval between scrapes of an instrument.
+
+An instrument whose blocks are changing is scraped at the minimum interval, which is the usual update interval so
+the archiver is never polled more often than before. While an instrument which is between runs stays the same
+the interval grows up to the maximum; a running instrument stays at the usual update interval so a run is never
+followed less closely than before.
+"""
+
+from builtins import object
+
+from external_webpage.request_handler_utils import get_summary_details_of_instrument
+
+# Shortest time between scrapes of an instrument whose blocks are changing, in seconds; the usual update interval
+MIN_POLL_INTERVAL = 5
+# Longest time between scrapes of a running instrument, in seconds
+RUNNING_POLL_INTERVAL = 5
+# Longest time between scrapes of an instrument which is between runs and not changing, in seconds
+MAX_POLL_INTERVAL = 30
+# Factor the interval grows by after each scrape in which nothing changed
+BACKOFF_FACTOR = 1.5
+
+# Run states in which the instrument is counting or moving between counting states
+ACTIVE_RUN_STATES = frozenset(
+    [
+        "RUNNING",
+        "WAITING",
+        "VETOING",
+        "BEGINNING",
+        "ENDING",
+        "PAUSING",
+        "RESUMING",
+        "ABORTING",
+        "SAVING",
+        "STORING",
+        "UPDATING",
+        "CHANGING",
+    ]
+)
+
+
+class AdaptivePollInterval(object):
+    """
+    Chooses the time to wait before the next scrape of an instrument from the data of the last one.
+    """
+
+    def __init__(
+        self,
+        min_interval=MIN_POLL_INTERVAL,
+        running_interval=RUNNING_POLL_INTERVAL,
+        max_interval=MAX_POLL_INTERVAL,
+        backoff_factor=BACKOFF_FACTOR,
+    ):
+        """
+        Initialize.
+        Args:
+            min_interval: shortest interval, used while blocks are changing
+            running_interval: longest interval while the instrument is running
+            max_interval: longest interval while the instrument is between runs
+            backoff_factor: factor the interval grows by after each scrape in which nothing changed
+        """
+        self.min_interval = min_interval
+        self.running_interval = max(min_interval, min(running_interval, max_interval))
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+        self._previous_groups = None
+
+    def next_interval(self, data):
+        """
+        Update the interval from the data of a successful scrape.
+        Args:
+            data: the collated data for the instrument
+
+        Returns: the number of seconds to wait before the next scrape
+        """
+        groups = data.get("groups") if isinstance(data, dict) else None
+        changed = groups is not self._previous_groups and groups != self._previous_groups
+        self._previous_groups = groups
+
+        if changed:
+            self.interval = self.min_interval
+            return self.interval
+
+        running = get_summary_details_of_instrument(data)["run_state"] in ACTIVE_RUN_STATES
+        limit = self.running_interval if running else self.max_interval
+        self.interval = min(self.interval * self.backoff_factor, limit)
+        return self.interval
+
+    def reset(self):
+        """
+        Forget the previous data, e.g. after a failed scrape, so the next data counts as a change.
+        """
+        self.interval = self.min_interval
+        self._previous_groups = None
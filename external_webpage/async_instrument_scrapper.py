@@ -0,0 +1,374 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Scrape engine running every instrument's scrape cycle on a single asyncio event loop.
+
+Instead of one thread per instrument, each mostly waiting between scrapes or on a slow archiver, each instrument
+has a coroutine on the engine's event loop. The blocking parts of a scrape, each read from the archivers and the
+block server and then the collation with the InstrumentInformationCollator, run as separate jobs in a worker
+pool, so no worker is kept waiting on another. The pool grows with the number of instruments, so a stalled
+archiver only holds up its own instrument; its threads are only started when there are reads for them.
+"""
+
+import asyncio
+import logging
+from builtins import object
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from threading import Event, Lock, Thread
+
+from external_webpage.circuit_breaker import CLOSED
+from external_webpage.instrument_information_collator import InstrumentInformationCollator
+from external_webpage.instrument_scapper import ScrapeReporter, snapshot_store
+from external_webpage.scrape_schedule import DeadlineSchedule, scrape_phases
+from external_webpage.viewer_demand import viewer_demand
+
+logger = logging.getLogger("JSON_bourne")
+
+# Number of blocking reads a scrape makes at the same time: the three archiver pages and the configuration
+READS_PER_SCRAPE = 4
+# Size of the pool before any scrappers have started
+MIN_SCRAPE_WORKERS = 8
+
+
+class AsyncScrapeEngine(object):
+    """
+    Event loop, in its own thread, on which the instrument scrappers run, with the pool their blocking reads run
+    in. The loop is started by the first scrapper.
+    """
+
+    def __init__(self, min_workers=MIN_SCRAPE_WORKERS):
+        """
+        Initialize.
+        Args:
+            min_workers: size of the pool before any scrappers have started
+        """
+        self._workers = min_workers
+        self._executor = ThreadPoolExecutor(max_workers=min_workers, thread_name_prefix="scrape")
+        self._scrappers = 0
+        self._loop = None
+        self._thread = None
+        self._start_lock = Lock()
+        self._shut_down = False
+
+    def _run_loop(self, loop, started):
+        """
+        Run the event loop until it is stopped.
+        Args:
+            loop: the event loop
+            started: event set once the loop is running
+        """
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _running_loop(self):
+        """
+        Returns: the event loop, starting it if it is not yet running; None if the engine has been shut down
+        """
+        with self._start_lock:
+            if self._loop is None and not self._shut_down:
+                loop = asyncio.new_event_loop()
+                started = Event()
+                self._thread = Thread(
+                    target=self._run_loop, args=(loop, started), name="scrape_engine", daemon=True
+                )
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def shutdown(self):
+        """
+        Stop the event loop and its thread and shut down the pool, waiting for scrapes in progress to finish. The
+        scrappers on the engine should be stopped first; any still running are cancelled. The engine cannot be
+        used again.
+        """
+        with self._start_lock:
+            self._shut_down = True
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._cancel_tasks(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    async def _cancel_tasks():
+        """
+        Cancel the other tasks on the event loop and wait for them to finish.
+        """
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, coroutine):
+        """
+        Run a coroutine on the engine's event loop.
+        Args:
+            coroutine: the coroutine to run
+
+        Returns: a concurrent.futures.Future of its result
+        Raises RuntimeError: if the engine has been shut down
+        """
+        loop = self._running_loop()
+        if loop is None:
+            coroutine.close()
+            raise RuntimeError("The scrape engine has been shut down")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    def call_soon(self, callback, *args):
+        """
+        Call a function on the engine's event loop from any thread; nothing is called once the engine has been
+        shut down.
+        Args:
+            callback: the function to call
+            args: its arguments
+        """
+        loop = self._running_loop()
+        if loop is not None:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def add_scrapper(self):
+        """
+        Make room in the pool for the reads of another scrapper, so it never waits for a worker. Called on the
+        engine's event loop.
+        """
+        self._scrappers += 1
+        workers = self._scrappers * READS_PER_SCRAPE
+        if workers > self._workers:
+            # A pool cannot be resized, so replace it with one twice the size, to replace it rarely as scrappers
+            # start; the old pool finishes the reads it has been given
+            self._workers = max(workers, 2 * self._workers)
+            self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="scrape"
+            )
+
+    def remove_scrapper(self):
+        """
+        Record that a scrapper has finished; the pool keeps its size. Called on the engine's event loop.
+        """
+        self._scrappers -= 1
+
+    async def run_blocking(self, function, *args):
+        """
+        Run a blocking function in the engine's pool. Must be awaited on the engine's event loop.
+        Args:
+            function: the function to run
+            args: its arguments
+
+        Returns: the result of the function
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+
+scrape_engine = AsyncScrapeEngine()
+
+
+class AsyncInstrumentScrapper(object):
+    """
+    Continually scrapes data from an instrument's ArchiveEngine as a coroutine on a scrape engine. It has the same
+    interface as the thread based InstrumentScrapper so the web scrapper manager can use either.
+    """
+
+    def __init__(
+        self,
+        name,
+        host,
+        pv_prefix,
+        engine=scrape_engine,
+        collator=None,
+        store=snapshot_store,
+        demand=viewer_demand,
+        phases=scrape_phases,
+        breaker=None,
+    ):
+        """
+        Initialize.
+        Args:
+            name: Name of instrument.
+            host: Host for the instrument.
+            pv_prefix: The pv_prefix of the instrument.
+            engine: the scrape engine to run on
+            collator: the collator of the instrument's information; None to read it from the instrument
+            store: the snapshot store to publish to
+            demand: record of which instruments are being viewed
+            phases: the phase offsets to take the offset of the first scrape from
+            breaker: the circuit breaker of the host; None for the host's shared breaker
+        """
+        self._name = name
+        self._host = host
+        self._pv_prefix = pv_prefix
+        self._engine = engine
+        self._collator = collator
+        self._demand = demand
+        self._phases = phases
+        self._reporter = ScrapeReporter(name, host, store, demand=demand, breaker=breaker)
+        self._future = None
+        self._task = None
+        self._wake_event = None
+        self._stopped = False
+
+    def is_instrument(self, name, host):
+        """
+        Is this scrapper for this name and _host
+        Args:
+            name: name of the instrument
+            host: _host of the instrument
+
+        Returns: True is _host and name match; False otherwise
+        """
+        return self._name == name and self._host == host
+
+    async def _run(self):
+        """
+        Scrape the instrument continuously until stopped, starting at the scrapper's phase offset and then at
+        each deadline.
+        """
+        self._task = asyncio.current_task()
+        if self._stopped:
+            return
+        if self._collator is None:
+            self._collator = InstrumentInformationCollator(self._host, self._pv_prefix)
+        logger.info("Scrapper started for {}".format(self._name))
+        self._wake_event = asyncio.Event()
+        self._demand.add_listener(self._name, self._wake_from_any_thread)
+        self._engine.add_scrapper()
+        try:
+            schedule = DeadlineSchedule(self._phases.next_offset(), asyncio.get_running_loop().time)
+            await self._wait(schedule)
+            while True:
+                try:
+                    data = await self._collate()
+                    wait = self._reporter.succeeded(data)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    wait = self._reporter.failed(e)
+                schedule.advance(wait)
+                await self._wait(schedule)
+        finally:
+            self._engine.remove_scrapper()
+            self._demand.remove_listener(self._name, self._wake_from_any_thread)
+            self._collator.close()
+
+    async def _collate(self):
+        """
+        Scrape the instrument. The archiver pages are read while the configuration is, each read a job of its own
+        in the engine's pool, and the information is collated from them once they have all been read.
+
+        Returns: the collated information
+        """
+        breaker = self._reporter.breaker
+        if breaker.state != CLOSED:
+            # Trying the host blocks while it checks the host accepts a connection
+            await self._engine.run_blocking(breaker.admit)
+        reads = [
+            asyncio.ensure_future(self._engine.run_blocking(read))
+            for read in self._collator.page_reads()
+        ]
+        try:
+            instrument_config = await self._engine.run_blocking(
+                self._collator.read_instrument_config
+            )
+        except BaseException:
+            # Nothing will use the pages, so do not read those that have not started
+            for read in reads:
+                read.cancel()
+            raise
+        pages = await asyncio.gather(*reads, return_exceptions=True)
+        return await self._engine.run_blocking(
+            self._collator.collate_pages, instrument_config, pages
+        )
+
+    async def _wait(self, schedule):
+        """
+        Wait for the deadline of the next scrape, bringing it forward if the instrument is viewed again unless its
+        host's breaker is open, in which case the host is only tried again when its backoff is over.
+        Args:
+            schedule: the deadlines of the scrapes
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), schedule.remaining())
+            except asyncio.TimeoutError:
+                break
+            self._wake_event.clear()
+            if self._reporter.breaker.state == CLOSED:
+                schedule.restart()
+                break
+        self._wake_event.clear()
+
+    def _wake(self):
+        """
+        End the wait before the next scrape; called on the engine's event loop.
+        """
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    def _wake_from_any_thread(self):
+        """
+        End the wait before the next scrape, e.g. when a web request views the instrument.
+        """
+        self._engine.call_soon(self._wake)
+
+    def _cancel(self):
+        """
+        Cancel the scrapper's coroutine; called on the engine's event loop.
+        """
+        if self._task is not None:
+            self._task.cancel()
+
+    def start(self):
+        """
+        Start scraping the instrument.
+        """
+        self._future = self._engine.submit(self._run())
+
+    def stop(self):
+        """
+        Stop scraping; a scrape in progress finishes in the pool but is not published.
+        """
+        self._stopped = True
+        if self._future is not None:
+            self._engine.call_soon(self._cancel)
+
+    def is_alive(self):
+        """
+        Returns: True if the scrapper has been started and has not finished; False otherwise
+        """
+        return self._future is not None and not self._future.done()
+
+    def join(self, timeout=None):
+        """
+        Wait for the scrapper to finish.
+        Args:
+            timeout: the maximum time to wait in seconds; None to wait until it finishes
+        """
+        if self._future is None:
+            return
+        try:
+            self._future.result(timeout)
+        except CancelledError:
+            pass
+        except Exception as e:
+            logger.error("Scrapper for {} stopped with an error: {}".format(self._name, e))
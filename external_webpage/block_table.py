@@ -0,0 +1,140 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Persistent table of an instrument's blocks, updated from each archiver page so that only what has changed is
+rebuilt.
+
+A channel which is the same as on the previous page keeps its Block, and a block whose description would be the
+same keeps its description dictionary. Only the blocks whose value, alarm, connection or settings changed are
+formatted again, and a group in which no block changed is the same dictionary as in the previous snapshot.
+"""
+
+import logging
+from builtins import object
+from collections import OrderedDict
+
+from external_webpage.web_page_parser import BlocksParseError, WebPageParser
+
+logger = logging.getLogger("JSON_bourne")
+
+
+class BlockTable(object):
+    """
+    The blocks of an instrument from one archiver group, with their descriptions, kept between scrapes.
+    """
+
+    def __init__(self, parser=None):
+        """
+        Initialize.
+        Args:
+            parser: the parser to create blocks from channels with; None for a new parser
+        """
+        self._parser = parser if parser is not None else WebPageParser()
+        # Channel name to the channel last read and the block created from it
+        self._channels = {}
+        # Block name to the description key and the description made from it
+        self._descriptions = {}
+        # The groups dictionary last made
+        self._groups = OrderedDict()
+
+    def update(self, info_page_as_json):
+        """
+        Update the blocks from an archiver page. Blocks of unchanged channels are reused, with their run control
+        values cleared as they are set again from each page.
+        Args:
+            info_page_as_json: the json from an info web page
+
+        Returns: ordered dictionary of block name to block
+        Raises BlocksParseError: if the page has no channels
+        """
+        try:
+            channels = info_page_as_json["Channels"]
+        except (KeyError, TypeError):
+            raise BlocksParseError("There is no json object for channels")
+
+        blocks = OrderedDict()
+        previous_channels = self._channels
+        self._channels = {}
+        for channel in channels:
+            try:
+                channel_name = channel["Channel"]
+                previous = previous_channels.get(channel_name)
+                if previous is not None and previous[0] == channel:
+                    block = previous[1]
+                    block.clear_rc_values()
+                else:
+                    block = self._parser.create_block_from_channel(channel)
+                self._channels[channel_name] = (channel, block)
+                blocks[block.get_name()] = block
+            except (ValueError, KeyError, AttributeError, TypeError) as ex:
+                logger.error("Can not convert block from channel {0}: {1}".format(channel, ex))
+        return blocks
+
+    def _describe(self, name, block):
+        """
+        Args:
+            name: name of the block
+            block: the block
+
+        Returns: the block's description; the previous one if nothing it is made from has changed
+        """
+        key = block.description_key()
+        previous = self._descriptions.get(name)
+        if previous is not None and previous[0] == key:
+            return previous[1]
+        description = block.get_description()
+        self._descriptions[name] = (key, description)
+        return description
+
+    def groups(self, blocks, instrument_config):
+        """
+        Populate the groups of the configuration with the descriptions of the blocks, describing only the blocks
+        which have changed.
+        Args:
+            blocks (dict[str, block.Block]): the blocks, with their run control values and visibility set
+            instrument_config (InstrumentConfig): Instrument configurations from the block server.
+
+        Returns:
+            groups (dict[str, dict[str, dict]]): All groups and their associated blocks; a group whose blocks
+                are unchanged is the same dictionary as last time. These must not be modified.
+        """
+        descriptions = {}
+        groups = OrderedDict()
+        for group in instrument_config.groups:
+            group_blocks = OrderedDict()
+            for name in group["blocks"]:
+                if name in blocks:
+                    if name not in descriptions:
+                        descriptions[name] = self._describe(name, blocks[name])
+                    group_blocks[name] = descriptions[name]
+
+            previous = self._groups.get(group["name"])
+            if (
+                previous is not None
+                and len(previous) == len(group_blocks)
+                and all(
+                    previous.get(name) is description for name, description in group_blocks.items()
+                )
+                and list(previous) == list(group_blocks)
+            ):
+                group_blocks = previous
+            groups[group["name"]] = group_blocks
+
+        self._descriptions = {
+            name: entry for name, entry in self._descriptions.items() if name in descriptions
+        }
+        self._groups = groups
+        return groups
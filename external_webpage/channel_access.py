@@ -0,0 +1,493 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Long-lived Channel Access subscriptions.
+
+A PvMonitor keeps its channel open and is sent each new value by the IOC, so reading it needs no name search,
+connection or network round trip, and changes can be acted on as soon as they happen. The channel access used is
+CaChannel by default; FakeChannelAccess stands in for it where there is no Channel Access network, e.g. in tests.
+
+Every Channel Access read goes through the process-wide ChannelCache, which keeps one monitor per PV, so the name
+search broadcast for a PV is only made the first time it is read, and closes monitors that are no longer read.
+"""
+
+import itertools
+import logging
+import time
+from builtins import bytes, object
+from collections import defaultdict
+from threading import Condition, RLock
+
+from CaChannel import CaChannel, CaChannelException, ca
+
+logger = logging.getLogger("JSON_bourne")
+
+
+def _ints_to_string(integers):
+    """
+    Convert the value of a char waveform to a string, as caget does with as_string.
+    Args:
+        integers: the characters as a sequence of integers
+
+    Returns: the string up to the first null character
+    """
+    return bytes(itertools.takewhile(lambda character: character != 0, integers)).decode("utf-8")
+
+
+class _CaChannelSubscription(object):
+    """
+    Subscription to the value of a PV through CaChannel.
+    """
+
+    def __init__(self, pv_name, on_connection, on_value):
+        """
+        Initialize and start connecting to the PV.
+        Args:
+            pv_name: name of the PV
+            on_connection: function called with True when the channel connects and False when it disconnects
+            on_value: function called with each new value of the PV
+        """
+        self._on_connection = on_connection
+        self._on_value = on_value
+        self._subscribed = False
+        self._is_string = False
+        self._channel = CaChannel(pv_name)
+        self._channel.search_and_connect(None, self._connection_changed)
+        self._channel.flush_io()
+
+    def _connection_changed(self, epics_args, _):
+        """
+        Called by CaChannel when the connection state changes. The subscription is made on the first connection
+        and lasts through reconnections.
+        """
+        connected = epics_args[1] == ca.CA_OP_CONN_UP
+        if connected and not self._subscribed:
+            request_type = ca.dbf_type_to_DBR(self._channel.field_type())
+            self._is_string = request_type == ca.DBR_CHAR
+            self._channel.add_masked_array_event(
+                request_type, None, ca.DBE_VALUE, self._value_changed, use_numpy=False
+            )
+            self._channel.flush_io()
+            self._subscribed = True
+        self._on_connection(connected)
+
+    def _value_changed(self, epics_args, _):
+        """
+        Called by CaChannel with each new value.
+        """
+        value = epics_args["pv_value"]
+        if self._is_string:
+            value = _ints_to_string(value)
+        self._on_value(value)
+
+    def close(self):
+        """
+        Close the channel.
+        """
+        self._channel.clear_channel()
+        self._channel.flush_io()
+
+
+class CaChannelAccess(object):
+    """
+    Channel Access through CaChannel.
+    """
+
+    def subscribe(self, pv_name, on_connection, on_value):
+        """
+        Subscribe to the value of a PV. Char waveforms are sent as strings.
+        Args:
+            pv_name: name of the PV
+            on_connection: function called with True when the channel connects and False when it disconnects
+            on_value: function called with each new value of the PV
+
+        Returns: the subscription, with a close method
+        """
+        return _CaChannelSubscription(pv_name, on_connection, on_value)
+
+
+class _FakeSubscription(object):
+    """
+    Subscription to a PV of a FakeChannelAccess.
+    """
+
+    def __init__(self, channel_access, pv_name, on_connection, on_value):
+        self._channel_access = channel_access
+        self.pv_name = pv_name
+        self.on_connection = on_connection
+        self.on_value = on_value
+
+    def close(self):
+        self._channel_access.unsubscribe(self)
+
+
+class FakeChannelAccess(object):
+    """
+    Channel access to PVs held in memory, for use without a Channel Access network. A PV is connected once it has
+    a value and callbacks are called on the thread setting the value.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._subscriptions = defaultdict(list)
+        self.subscribe_count = 0
+
+    def subscribe(self, pv_name, on_connection, on_value):
+        """
+        Subscribe to the value of a PV.
+        Args:
+            pv_name: name of the PV
+            on_connection: function called with True when the PV connects and False when it disconnects
+            on_value: function called with each new value of the PV
+
+        Returns: the subscription, with a close method
+        """
+        self.subscribe_count += 1
+        subscription = _FakeSubscription(self, pv_name, on_connection, on_value)
+        self._subscriptions[pv_name].append(subscription)
+        if pv_name in self._values:
+            on_connection(True)
+            on_value(self._values[pv_name])
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscription.
+        Args:
+            subscription: the subscription
+        """
+        self._subscriptions[subscription.pv_name].remove(subscription)
+
+    def subscriptions(self, pv_name):
+        """
+        Args:
+            pv_name: name of the PV
+
+        Returns: the number of open subscriptions to the PV
+        """
+        return len(self._subscriptions[pv_name])
+
+    def set_value(self, pv_name, value):
+        """
+        Set the value of a PV, connecting it if it was disconnected.
+        Args:
+            pv_name: name of the PV
+            value: the new value
+        """
+        was_connected = pv_name in self._values
+        self._values[pv_name] = value
+        for subscription in list(self._subscriptions[pv_name]):
+            if not was_connected:
+                subscription.on_connection(True)
+            subscription.on_value(value)
+
+    def disconnect(self, pv_name):
+        """
+        Disconnect a PV.
+        Args:
+            pv_name: name of the PV
+        """
+        if self._values.pop(pv_name, None) is None:
+            return
+        for subscription in list(self._subscriptions[pv_name]):
+            subscription.on_connection(False)
+
+
+_default_channel_access = None
+
+
+def default_channel_access():
+    """
+    Returns: the channel access used when none is given, i.e. CaChannel
+    """
+    global _default_channel_access
+    if _default_channel_access is None:
+        _default_channel_access = CaChannelAccess()
+    return _default_channel_access
+
+
+class PvMonitor(object):
+    """
+    Keeps the latest value of a PV from a long-lived subscription.
+    """
+
+    def __init__(self, pv_name, channel_access=None, on_first_connection=None):
+        """
+        Initialize and subscribe to the PV.
+        Args:
+            pv_name: name of the PV
+            channel_access: the channel access to use; None for CaChannel
+            on_first_connection: function called with the seconds taken to connect when the channel first
+                connects; None for no notification
+        """
+        self.pv_name = pv_name
+        self._lock = Condition()
+        self._connected = False
+        self._has_value = False
+        self._value = None
+        self._listeners = []
+        self._subscribed_at = time.monotonic()
+        self._on_first_connection = on_first_connection
+        self.connect_latency = None
+        if channel_access is None:
+            channel_access = default_channel_access()
+        self._subscription = channel_access.subscribe(
+            pv_name, self._connection_changed, self._value_changed
+        )
+
+    def _connection_changed(self, connected):
+        """
+        Args:
+            connected: True if the channel has connected; False if it has disconnected
+        """
+        first_connection = False
+        with self._lock:
+            self._connected = connected
+            if not connected:
+                self._has_value = False
+            elif self.connect_latency is None:
+                self.connect_latency = time.monotonic() - self._subscribed_at
+                first_connection = True
+        if first_connection and self._on_first_connection is not None:
+            self._on_first_connection(self.connect_latency)
+        if not connected:
+            logger.warning("Lost connection to {}".format(self.pv_name))
+
+    def _value_changed(self, value):
+        """
+        Args:
+            value: the new value of the PV
+        """
+        with self._lock:
+            self._value = value
+            self._has_value = True
+            self._lock.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(value)
+            except Exception as e:
+                logger.exception(
+                    "Error notifying listener of {} change: {}".format(self.pv_name, e)
+                )
+
+    def add_listener(self, listener):
+        """
+        Add a function to be called with each new value. It is called on the Channel Access thread so should
+        return quickly.
+        Args:
+            listener: function taking the new value
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def has_listeners(self):
+        """
+        Returns: True if any function is listening for changes to the PV; False otherwise
+        """
+        with self._lock:
+            return len(self._listeners) > 0
+
+    @property
+    def connected(self):
+        """
+        Returns: True if the channel is connected and has a value; False otherwise
+        """
+        with self._lock:
+            return self._connected and self._has_value
+
+    def get(self, timeout=0):
+        """
+        Args:
+            timeout: the time in seconds to wait for the channel to connect and be sent a value if it has not been
+
+        Returns: the latest value of the PV
+        Raises CaChannelException: if the channel is not connected or has not been sent a value
+        """
+        with self._lock:
+            if timeout > 0:
+                self._lock.wait_for(lambda: self._connected and self._has_value, timeout)
+            if not (self._connected and self._has_value):
+                raise CaChannelException(ca.ECA_DISCONN)
+            return self._value
+
+    def close(self):
+        """
+        Close the subscription.
+        """
+        self._subscription.close()
+
+
+# Seconds a PV can go unread before its monitor is closed
+IDLE_TIMEOUT = 30 * 60
+
+# Seconds between checks for monitors which have not been read
+EVICTION_INTERVAL = 60
+
+# Seconds to wait for a newly monitored PV to connect before reading it fails
+CONNECT_TIMEOUT = 1
+
+
+class ChannelCache(object):
+    """
+    Process-wide cache of PV monitors. Reading a PV through the cache subscribes to it the first time (a miss) and
+    reads the latest value of the existing monitor afterwards (a hit). Monitors which have not been read for the
+    idle timeout, and which nothing is listening to, are closed.
+    """
+
+    def __init__(self, channel_access=None, idle_timeout=IDLE_TIMEOUT, clock=time.monotonic):
+        """
+        Initialize.
+        Args:
+            channel_access: the channel access to use; None for CaChannel
+            idle_timeout: seconds a PV can go unread before its monitor is closed
+            clock: function returning the current monotonic time in seconds
+        """
+        self._channel_access = channel_access
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        self._lock = RLock()
+        self._monitors = {}
+        self._last_read = {}
+        self._next_eviction = clock() + EVICTION_INTERVAL
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._connections = 0
+        self._total_connect_latency = 0.0
+        self._max_connect_latency = 0.0
+
+    def _record_connection(self, latency):
+        """
+        Args:
+            latency: seconds a new monitor took to connect
+        """
+        with self._lock:
+            self._connections += 1
+            self._total_connect_latency += latency
+            self._max_connect_latency = max(self._max_connect_latency, latency)
+
+    def monitor(self, pv_name):
+        """
+        Get the monitor of a PV, subscribing to it if it is not already monitored. Counts as a read of the PV.
+        Args:
+            pv_name: name of the PV
+
+        Returns: tuple of the monitor and True if it was already monitored, False if it was just subscribed to
+        """
+        evicted = []
+        with self._lock:
+            now = self._clock()
+            if now >= self._next_eviction:
+                evicted = self._evict_idle(now)
+            self._last_read[pv_name] = now
+            monitor = self._monitors.get(pv_name)
+            if monitor is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        self._close(evicted)
+        if monitor is not None:
+            return monitor, True
+
+        # Subscribe without holding the lock, which Channel Access callbacks take
+        new_monitor = PvMonitor(
+            pv_name, self._channel_access, on_first_connection=self._record_connection
+        )
+        with self._lock:
+            monitor = self._monitors.setdefault(pv_name, new_monitor)
+        if monitor is not new_monitor:
+            new_monitor.close()
+        return monitor, False
+
+    def get(self, pv_name):
+        """
+        Read the latest value of a PV. A PV which was not being monitored is given a short time to connect.
+        Args:
+            pv_name: name of the PV
+
+        Returns: the latest value of the PV
+        Raises CaChannelException: if the PV is not connected or has not been sent a value
+        """
+        monitor, existing = self.monitor(pv_name)
+        return monitor.get(0 if existing else CONNECT_TIMEOUT)
+
+    def add_listener(self, pv_name, listener):
+        """
+        Add a function to be called with each new value of a PV. A PV with listeners is never closed as idle.
+        Args:
+            pv_name: name of the PV
+            listener: function taking the new value; it is called on the Channel Access thread so should return
+                quickly
+        """
+        monitor, _ = self.monitor(pv_name)
+        monitor.add_listener(listener)
+
+    def _evict_idle(self, now):
+        """
+        Remove the monitors which have not been read for the idle timeout and have no listeners. Must be called
+        holding the lock.
+        Args:
+            now: the current time
+
+        Returns: the removed monitors, to be closed once the lock is released
+        """
+        self._next_eviction = now + EVICTION_INTERVAL
+        evicted = []
+        for pv_name, monitor in list(self._monitors.items()):
+            if now - self._last_read[pv_name] >= self._idle_timeout and not monitor.has_listeners():
+                evicted.append(monitor)
+                del self._monitors[pv_name]
+                del self._last_read[pv_name]
+                self._evictions += 1
+        return evicted
+
+    @staticmethod
+    def _close(monitors):
+        """
+        Args:
+            monitors: the monitors to close
+        """
+        for monitor in monitors:
+            try:
+                monitor.close()
+            except Exception as e:
+                logger.error("Error closing monitor of {}: {}".format(monitor.pv_name, e))
+
+    def statistics(self):
+        """
+        Returns: dictionary of the number of open and connected channels, cache hits, misses and evictions, and
+            the number of new channels connected with their mean and maximum connect latency in seconds
+        """
+        with self._lock:
+            monitors = list(self._monitors.values())
+            mean_latency = None
+            if self._connections > 0:
+                mean_latency = self._total_connect_latency / self._connections
+            statistics = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "connections": self._connections,
+                "mean_connect_latency": mean_latency,
+                "max_connect_latency": self._max_connect_latency,
+            }
+        statistics["channels"] = len(monitors)
+        statistics["connected_channels"] = sum(1 for monitor in monitors if monitor.connected)
+        return statistics
+
+
+channel_cache = ChannelCache()
@@ -0,0 +1,250 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Circuit breaker for each instrument host, so that hosts which are down stop using the scrappers' capacity.
+
+While a host's breaker is closed its instruments are scraped as usual. After a number of consecutive failed
+scrapes the breaker opens, and the wait before each further attempt doubles, with jitter so that instruments
+which went down together do not retry together. While it is open, each attempt first tries a cheap TCP
+connection to the host instead of waiting for the full fetch to time out. If that connects, the breaker is
+half-open and one full scrape is tried. The breaker closes when that scrape succeeds, or opens again if it fails.
+Only one scrapper of the host makes each trial; the others skip their scrapes until its outcome is recorded.
+"""
+
+import logging
+import random
+import socket
+import time
+from builtins import object
+from threading import Lock
+
+from external_webpage.data_source_reader import PORT_INSTPV
+
+logger = logging.getLogger("JSON_bourne")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Number of consecutive failed scrapes after which the breaker opens
+FAILURE_THRESHOLD = 3
+# Wait after the first failed scrape before jitter, in seconds; it doubles with each further failure. Jitter
+# waits between half and all of it, so no wait is shorter than the fixed minute that was waited before
+INITIAL_BACKOFF = 2 * 60
+# Longest wait between attempts before jitter, in seconds
+MAX_BACKOFF = 15 * 60
+# Port and timeout of the connection tried before scraping a host whose breaker is open
+PROBE_PORT = PORT_INSTPV
+PROBE_TIMEOUT = 2
+# Seconds after which a trial whose outcome was never recorded, e.g. because its scrapper was stopped, is given
+# up so that another scrapper can try the host
+TRIAL_TIMEOUT = 5 * 60
+
+
+class HostUnreachableError(IOError):
+    """
+    Raised when the host of an instrument whose breaker is open does not accept a connection.
+    """
+
+
+class TrialInProgressError(HostUnreachableError):
+    """
+    Raised instead of scraping a host whose breaker is not closed while another scrapper is trying it.
+    """
+
+
+def tcp_probe(host, port=PROBE_PORT, timeout=PROBE_TIMEOUT):
+    """
+    Try to connect to a host.
+    Args:
+        host: the host
+        port: the port to connect to
+        timeout: seconds to wait for the connection
+
+    Returns: True if the host accepted the connection; False otherwise
+    """
+    try:
+        socket.create_connection((host, port), timeout).close()
+        return True
+    except (OSError, socket.timeout):
+        return False
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker of a host, shared by the scrappers of all its instruments.
+    """
+
+    def __init__(
+        self,
+        host,
+        failure_threshold=FAILURE_THRESHOLD,
+        initial_backoff=INITIAL_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+        probe=tcp_probe,
+        random_fn=random.random,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize.
+        Args:
+            host: the host
+            failure_threshold: number of consecutive failures after which the breaker opens
+            initial_backoff: wait after the first failure before jitter, in seconds
+            max_backoff: longest wait before jitter, in seconds
+            probe: function taking the host and returning True if it accepts a connection
+            random_fn: function returning a random number in [0, 1) to jitter the waits with
+            clock: function returning the current monotonic time in seconds
+        """
+        self._host = host
+        self._failure_threshold = failure_threshold
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._probe = probe
+        self._random_fn = random_fn
+        self._clock = clock
+        self._lock = Lock()
+        self._failures = 0
+        # When the trial of the host started; None if no trial is in progress
+        self._trial_started = None
+        self.state = CLOSED
+
+    def _start_trial(self):
+        """
+        Claim the trial of a host whose breaker is not closed. Must be called holding the lock.
+
+        Returns: True if the trial was claimed; False if the breaker has closed so no trial is needed
+        Raises TrialInProgressError: if another scrapper is trying the host
+        """
+        if self.state == CLOSED:
+            return False
+        now = self._clock()
+        if self._trial_started is not None and now - self._trial_started < TRIAL_TIMEOUT:
+            raise TrialInProgressError("A scrape of {} is already being tried".format(self._host))
+        self._trial_started = now
+        return True
+
+    def call(self, function):
+        """
+        Scrape the host once it has been admitted.
+        Args:
+            function: function doing the scrape
+
+        Returns: the result of the function
+        Raises HostUnreachableError: if the breaker is not closed and the host does not accept a connection
+        Raises TrialInProgressError: if the breaker is not closed and another caller is trying the host
+        """
+        self.admit()
+        return function()
+
+    def admit(self):
+        """
+        Let a scrape of the host go ahead. If the breaker is not closed the scrape is a trial, made by one caller
+        at a time, which first checks the host accepts a connection.
+
+        Raises HostUnreachableError: if the breaker is not closed and the host does not accept a connection
+        Raises TrialInProgressError: if the breaker is not closed and another caller is trying the host
+        """
+        if self.state != CLOSED:
+            with self._lock:
+                trial = self._start_trial()
+            if trial:
+                if not self._probe(self._host):
+                    with self._lock:
+                        self._trial_started = None
+                    raise HostUnreachableError("{} is not accepting connections".format(self._host))
+                with self._lock:
+                    if self.state == OPEN:
+                        self.state = HALF_OPEN
+
+    def record_success(self):
+        """
+        Record a successful scrape, closing the breaker.
+        """
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit breaker for {} closed".format(self._host))
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self):
+        """
+        Record a failed scrape, opening the breaker if there have been too many in a row.
+
+        Returns: the number of seconds to wait before the next attempt
+        """
+        with self._lock:
+            self._failures += 1
+            if self.state != OPEN and (
+                self.state == HALF_OPEN or self._failures >= self._failure_threshold
+            ):
+                logger.info(
+                    "Circuit breaker for {} opened after {} failures".format(
+                        self._host, self._failures
+                    )
+                )
+                self.state = OPEN
+            self._trial_started = None
+            failures = self._failures
+        return self._backoff(failures)
+
+    def retry_wait(self):
+        """
+        Returns: the number of seconds to wait before trying again after skipping a scrape, without counting a
+            failure
+        """
+        with self._lock:
+            failures = self._failures
+        return self._backoff(max(failures, 1))
+
+    def _backoff(self, failures):
+        """
+        Args:
+            failures: the number of consecutive failures
+
+        Returns: the jittered number of seconds to wait before the next attempt
+        """
+        backoff = min(self._initial_backoff * 2 ** min(failures - 1, 32), self._max_backoff)
+        # Equal jitter: wait at least half the backoff so a dead host is not retried too soon
+        return backoff / 2 + self._random_fn() * backoff / 2
+
+
+class CircuitBreakerRegistry(object):
+    """
+    The circuit breaker of each host.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._breakers = {}
+
+    def for_host(self, host):
+        """
+        Args:
+            host: the host
+
+        Returns: the circuit breaker of the host, created if it does not exist
+        """
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host)
+                self._breakers[host] = breaker
+            return breaker
+
+
+circuit_breakers = CircuitBreakerRegistry()
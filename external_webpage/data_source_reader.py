@@ -17,13 +17,16 @@
 Classes for getting external resources.
 """
 
-import json
 import logging
+from threading import Lock
+from weakref import WeakSet
 
 import requests
-from CaChannel.util import caget
+from requests.adapters import HTTPAdapter
 
-from external_webpage.utils import dehex_and_decompress
+from external_webpage import json_backend
+from external_webpage.channel_access import channel_cache
+from external_webpage.utils import dehex_and_decompress, fingerprint
 
 logger = logging.getLogger("JSON_bourne")
 
@@ -39,20 +42,118 @@ CONFIG_PV = "CS:BLOCKSERVER:GET_CURR_CONFIG_DETAILS"
 # Timeout for url get
 URL_GET_TIMEOUT = 60
 
+# Timeout for connecting to the instrument for a url get, kept short so that a scrape of an unreachable
+# instrument does not hold a scrape worker for the whole get timeout
+URL_CONNECT_TIMEOUT = 3
+
+# Timeouts for connecting and reading, as taken by requests
+URL_TIMEOUTS = (URL_CONNECT_TIMEOUT, URL_GET_TIMEOUT)
+
+# Number of connections kept alive to each port of an instrument
+CONNECTIONS_PER_PORT = 2
+
+# The readers in use, for monitoring their connections
+_readers = WeakSet()
+_readers_lock = Lock()
+
+
+def create_session():
+    """
+    Returns: a session which keeps connections alive to the instrument's block server and archiver ports
+    """
+    session = requests.Session()
+    # One pool for each of the ports used on the instrument
+    adapter = HTTPAdapter(pool_connections=3, pool_maxsize=CONNECTIONS_PER_PORT)
+    session.mount("http://", adapter)
+    return session
+
+
+def connection_statistics():
+    """
+    Returns: dictionary of the number of requests made by all the readers, the number of connections opened for
+        them and the fraction of requests which reused a connection
+    """
+    with _readers_lock:
+        readers = list(_readers)
+    requests_made = 0
+    connections = 0
+    for reader in readers:
+        reader_statistics = reader.connection_statistics()
+        requests_made += reader_statistics["requests"]
+        connections += reader_statistics["connections"]
+    return {
+        "requests": requests_made,
+        "connections": connections,
+        "reuse_rate": _reuse_rate(requests_made, connections),
+    }
+
+
+def _reuse_rate(requests_made, connections):
+    """
+    Args:
+        requests_made: number of requests made
+        connections: number of connections opened for them
+
+    Returns: the fraction of requests which reused a connection; None if no requests have been made
+    """
+    if requests_made == 0:
+        return None
+    return max(requests_made - connections, 0) / float(requests_made)
+
 
 class DataSourceReader(object):
     """
     Access of external data sources from urls.
     """
 
-    def __init__(self, host, pv_prefix):
+    def __init__(self, host, pv_prefix, session=None, channel_cache=channel_cache):
         """
         Initialize.
         Args:
             host: The host name for the instrument.
+            pv_prefix: The pv prefix of the instrument.
+            session: the requests session to use; None for a new session keeping connections alive
+            channel_cache: the cache of Channel Access monitors to read the configuration from
         """
         self._host = host
         self._pv_prefix = pv_prefix
+        self._session = create_session() if session is None else session
+        self._channel_cache = channel_cache
+        # Fingerprint of the raw configuration last decoded, and the configuration decoded from it
+        self._config_fingerprint = None
+        self._config = None
+        # Archiver group name to the fingerprint of the page last read and the JSON parsed from it
+        self._pages = {}
+        with _readers_lock:
+            _readers.add(self)
+
+    def connection_statistics(self):
+        """
+        Returns: dictionary of the number of requests made, the number of connections opened for them and the
+            fraction of requests which reused a connection
+        """
+        requests_made = 0
+        connections = 0
+        for adapter in self._session.adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_made += pool.num_requests
+                    connections += pool.num_connections
+        return {
+            "requests": requests_made,
+            "connections": connections,
+            "reuse_rate": _reuse_rate(requests_made, connections),
+        }
+
+    def close(self):
+        """
+        Close the connections kept alive to the instrument.
+        """
+        self._session.close()
 
     def get_json_from_blocks_archive(self):
         """
@@ -89,41 +190,88 @@ class DataSourceReader(object):
             port: the port the url is on
             group_name: the name of the group within the archiver to access.
 
-        Returns: A converted list of block objects.
+        Returns: The JSON of the page; the same object as last time if the page has not changed, which must not
+            be modified.
 
         """
         url = "http://{host}:{port}/group?name={group_name}&format=json".format(
             host=self._host, port=port, group_name=group_name
         )
         try:
-            page = requests.get(url, timeout=URL_GET_TIMEOUT)
-            return page.json()
+            page = self._session.get(url, timeout=URL_TIMEOUTS)
+            return self._cached_page(group_name, page.content)
         except Exception as e:
             logger.error("URL not found or json not understood: " + str(url))
             raise e
 
+    def _cached_page(self, group_name, content):
+        """
+        Parse the content of an archiver page, unless it is the same as the last page read for its group.
+        Args:
+            group_name: the name of the group within the archiver
+            content: the page content as bytes
+
+        Returns: The JSON of the page; the same object as last time if it has not changed.
+        """
+        content_fingerprint = fingerprint(content)
+        cached = self._pages.get(group_name)
+        if cached is not None and cached[0] == content_fingerprint:
+            return cached[1]
+        page_json = json_backend.loads(content)
+        self._pages[group_name] = (content_fingerprint, page_json)
+        return page_json
+
+    def _cached_config(self, raw, decode):
+        """
+        Decode a raw configuration, unless it is the same as the one last decoded.
+        Args:
+            raw: the raw configuration
+            decode: function decoding the raw configuration
+
+        Returns: The configuration as a dictionary; the same dictionary as last time if it has not changed, which
+            must not be modified.
+        """
+        raw_fingerprint = fingerprint(raw)
+        if raw_fingerprint != self._config_fingerprint:
+            self._config = decode(raw)
+            self._config_fingerprint = raw_fingerprint
+        return self._config
+
     def read_config(self):
         """
-        Read the configuration from the instrument block server. First using channel access then falling back to the
-        blockserver webserver.
+        Read the configuration from the instrument block server. First using the latest value from a channel access
+        monitor then falling back to the blockserver webserver. The configuration is only decoded when it has
+        changed.
 
-        Returns: The configuration as a dictionary.
+        Returns: The configuration as a dictionary; the same dictionary as last time if it has not changed, which
+            must not be modified.
         """
         try:
             pv = self._pv_prefix + CONFIG_PV
-            raw = caget(pv, as_string=True)
-            config_details = dehex_and_decompress(raw)
-            config_details = json.loads(config_details)
-            return config_details
+            raw = self._channel_cache.get(pv)
+            return self._cached_config(
+                raw, lambda value: json_backend.loads(dehex_and_decompress(value))
+            )
         except Exception as ex:
             logger.error(
                 f"Error getting instrument config details from {pv}, using webserver instead. {ex}"
             )
 
-        page = requests.get(
-            "http://{}:{}/".format(self._host, PORT_CONFIG), timeout=URL_GET_TIMEOUT
+        page = self._session.get(
+            "http://{}:{}/".format(self._host, PORT_CONFIG), timeout=URL_TIMEOUTS
         )
-        content = page.content.decode("utf-8")
+        return self._cached_config(page.content, self._decode_config_page)
+
+    @staticmethod
+    def _decode_config_page(content):
+        """
+        Decode the configuration served by the blockserver webserver.
+        Args:
+            content: the page content as bytes
+
+        Returns: The configuration as a dictionary.
+        """
+        content = content.decode("utf-8")
         corrected_page = (
             content.replace("'", '"')
             .replace("None", "null")
@@ -131,7 +279,7 @@ class DataSourceReader(object):
             .replace("False", "false")
         )
         try:
-            return json.loads(corrected_page)
+            return json_backend.loads(corrected_page)
         except Exception as e:
             logger.error("JSON conversion failed: " + str(e))
             logger.error("JSON was: " + str(corrected_page))
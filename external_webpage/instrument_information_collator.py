@@ -22,32 +22,58 @@ from builtins import object, str
 from collections import OrderedDict
 
 from block_utils import format_blocks, set_rc_values_for_blocks
+from external_webpage.block_table import BlockTable
 from external_webpage.data_source_reader import DataSourceReader
 from external_webpage.web_page_parser import WebPageParser
 
 logger = logging.getLogger("JSON_bourne")
 
 
-def create_groups_dictionary(archive_blocks, instrument_config):
+def _read(read):
     """
-    Populate groups with block information from the archive server.
     Args:
-        archive_blocks (dict[str, block.Block]): Block information from the archive server.
-        instrument_config (InstrumentConfig): Instrument configurations from the block server.
+        read: function reading a page
 
-    Returns:
-        groups (dict[str, dict[str, dict]]): All groups and their associated blocks.
+    Returns: the page, or the exception raised reading it
+    """
+    try:
+        return read()
+    except Exception as e:
+        return e
+
+
+def _fetched(fetch):
+    """
+    Args:
+        fetch: the finished future of a page read
+
+    Returns: the page, or the exception raised reading it
+    """
+    error = fetch.exception()
+    return fetch.result() if error is None else error
+
+
+def _discard(fetch):
+    """
+    Drop the result of a fetch nothing will read.
+    Args:
+        fetch: the finished, possibly cancelled, future of a page read
+    """
+    if not fetch.cancelled():
+        fetch.exception()
+
+
+def _page(page):
+    """
+    Args:
+        page: a page, or the exception raised reading it
 
+    Returns: the page
+    Raises: the exception raised reading the page
     """
-    blocks_all_formatted = format_blocks(archive_blocks)
-    groups = OrderedDict()
-    for group in instrument_config.groups:
-        blocks = OrderedDict()
-        for block in group["blocks"]:
-            if block in blocks_all_formatted.keys():
-                blocks[block] = blocks_all_formatted[block]
-        groups[group["name"]] = blocks
-    return groups
+    if isinstance(page, Exception):
+        raise page
+    return page
 
 
 class InstrumentConfig(object):
@@ -105,20 +131,80 @@ class InstrumentInformationCollator(object):
     # name of the channel fo the run duration for the current period
     RUN_DURATION_PD_CHANNEL_NAME = "RUNDURATION_PD"
 
-    def __init__(self, host, pv_prefix, reader=None):
+    def __init__(self, host, pv_prefix, reader=None, fetch_executor=None):
         """
         Initialize.
         Args:
             host: The host of the instrument from which to read the information.
             pv_prefix: The pv_prefix of the instrument from which to read the information.
             reader: A reader object to get external information.
+            fetch_executor: pool in which to fetch the archiver pages while the configuration is read; None to
+                fetch them one after another once it has been read
         """
+        self._fetch_executor = fetch_executor
         if reader is None:
             self.reader = DataSourceReader(host, pv_prefix)
         else:
             self.reader = reader
 
         self.web_page_parser = WebPageParser()
+        # Blocks kept between scrapes, so only changed channels are parsed and changed blocks formatted
+        self._block_table = BlockTable(self.web_page_parser)
+        self._dataweb_table = BlockTable(self.web_page_parser)
+        # The configuration last read and the InstrumentConfig made from it, reused until it changes
+        self._config_json = None
+        self._instrument_config = None
+        # The sources the groups and instrument PVs were last built from and the results, reused while the reader
+        # returns the same pages
+        self._groups_sources = None
+        self._groups = None
+        self._inst_pvs_source = None
+        self._inst_pvs = None
+
+    def close(self):
+        """
+        Close the reader's connections to the instrument.
+        """
+        self.reader.close()
+
+    def page_reads(self):
+        """
+        Returns: the functions reading the blocks, dataweb and instrument archiver pages; they may be called
+            concurrently with each other and with read_instrument_config
+        """
+        return [
+            self.reader.get_json_from_blocks_archive,
+            self.reader.get_json_from_dataweb_archive,
+            self.reader.get_json_from_instrument_archive,
+        ]
+
+    def read_instrument_config(self):
+        """
+        Read the instrument's configuration. The reader returns the same dictionary while the configuration is
+        unchanged, in which case the InstrumentConfig and its group layout are reused.
+
+        Returns: the instrument configuration
+        """
+        config_json = self.reader.read_config()
+        if config_json is not self._config_json:
+            self._instrument_config = InstrumentConfig(config_json)
+            self._config_json = config_json
+            # Blocks may have been added or removed, so start a new table of their titles
+            self.web_page_parser.titles.clear()
+        return self._instrument_config
+
+    @staticmethod
+    def _same_sources(sources, previous_sources):
+        """
+        Args:
+            sources: tuple of the sources of a result
+            previous_sources: tuple of the sources of the previous result; None if there is none
+
+        Returns: True if every source is the same object as before, so the previous result can be reused
+        """
+        return previous_sources is not None and all(
+            source is previous for source, previous in zip(sources, previous_sources)
+        )
 
     def _get_inst_pvs(self, instrument_archive_blocks):
         """
@@ -247,45 +333,94 @@ class InstrumentInformationCollator(object):
         Returns: JSON of the instrument's configuration and status.
 
         """
-        instrument_config = InstrumentConfig(self.reader.read_config())
+        if self._fetch_executor is None:
+            instrument_config = self.read_instrument_config()
+            return self.collate_pages(
+                instrument_config, [_read(read) for read in self.page_reads()]
+            )
+
+        # Fetch the archiver pages concurrently while the configuration is read, so a cycle takes as long as
+        # the slowest fetch rather than all of them
+        fetches = [self._fetch_executor.submit(read) for read in self.page_reads()]
+        try:
+            instrument_config = self.read_instrument_config()
+        except Exception:
+            # Nothing will read the pages, so do not start the fetches still queued and do not wait for the others
+            for fetch in fetches:
+                fetch.cancel()
+                fetch.add_done_callback(_discard)
+            raise
+        return self.collate_pages(instrument_config, [_fetched(fetch) for fetch in fetches])
+
+    def collate_pages(self, instrument_config, pages):
+        """
+        Collate the information on instrument configuration, blocks and run status PVs from what has been read.
+        Args:
+            instrument_config: the instrument's configuration
+            pages: the blocks, dataweb and instrument archiver pages, in the order of page_reads, each either the
+                page or the exception raised reading it
+
+        Returns: JSON of the instrument's configuration and status.
+        """
+        blocks_archive, dataweb_archive, instrument_archive = pages
         error_statuses = []
 
+        # The reader returns the same page object while a page is unchanged, in which case what was built from it
+        # is reused rather than parsed and formatted again
+        groups_sources = None
         try:
             # read blocks
-            json_from_blocks_archive = self.reader.get_json_from_blocks_archive()
-            blocks = self.web_page_parser.extract_blocks(json_from_blocks_archive)
-
-            json_from_dataweb_archive = self.reader.get_json_from_dataweb_archive()
-            dataweb_blocks = self.web_page_parser.extract_blocks(json_from_dataweb_archive)
+            json_from_blocks_archive = _page(blocks_archive)
+            json_from_dataweb_archive = _page(dataweb_archive)
+            groups_sources = (
+                json_from_blocks_archive,
+                json_from_dataweb_archive,
+                instrument_config,
+            )
+            if not self._same_sources(groups_sources, self._groups_sources):
+                blocks = self._block_table.update(json_from_blocks_archive)
+                dataweb_blocks = self._dataweb_table.update(json_from_dataweb_archive)
 
         except Exception as e:
             error_string = "Failed to read block archiver"
             error_statuses.append(error_string)
             logger.error(f"{error_string}: " + str(e))
+            groups_sources = None
             blocks = {}
             dataweb_blocks = {}
 
         try:
-            json_from_instrument_archive = self.reader.get_json_from_instrument_archive()
-            instrument_blocks = self.web_page_parser.extract_blocks(json_from_instrument_archive)
-
-            inst_pvs = format_blocks(self._get_inst_pvs(instrument_blocks))
+            json_from_instrument_archive = _page(instrument_archive)
+            if json_from_instrument_archive is self._inst_pvs_source:
+                inst_pvs = self._inst_pvs
+            else:
+                instrument_blocks = self.web_page_parser.extract_blocks(
+                    json_from_instrument_archive
+                )
+                inst_pvs = format_blocks(self._get_inst_pvs(instrument_blocks))
+                self._inst_pvs_source = json_from_instrument_archive
+                self._inst_pvs = inst_pvs
         except Exception as e:
             error_string = "Failed to read instrument archiver"
             error_statuses.append(error_string)
             logger.error(f"{error_string}: " + str(e))
             inst_pvs = {}
 
-        try:
-            set_rc_values_for_blocks(blocks, dataweb_blocks)
-        except Exception as e:
-            logger.error("Error in setting rc values for blocks: " + str(e))
-
-        # get block visibility from config
-        for block_name, block in blocks.items():
-            block.set_visibility(instrument_config.block_is_visible(block_name))
-
-        groups = create_groups_dictionary(blocks, instrument_config)
+        if groups_sources is not None and self._same_sources(groups_sources, self._groups_sources):
+            groups = self._groups
+        else:
+            try:
+                set_rc_values_for_blocks(blocks, dataweb_blocks, self.web_page_parser.titles)
+            except Exception as e:
+                logger.error("Error in setting rc values for blocks: " + str(e))
+
+            # get block visibility from config
+            for block_name, block in blocks.items():
+                block.set_visibility(instrument_config.block_is_visible(block_name))
+
+            groups = self._block_table.groups(blocks, instrument_config)
+            self._groups_sources = groups_sources
+            self._groups = groups
 
         return {
             "config_name": instrument_config.name,
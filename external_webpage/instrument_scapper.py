@@ -1,18 +1,128 @@
 import logging
 import traceback
-from builtins import range, str
-from threading import Event, RLock, Thread
-from time import sleep
+from builtins import object, str
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
 
+from external_webpage.adaptive_polling import AdaptivePollInterval
+from external_webpage.circuit_breaker import CLOSED, TrialInProgressError, circuit_breakers
 from external_webpage.instrument_information_collator import InstrumentInformationCollator
+from external_webpage.request_handler_utils import get_clock_offset, get_time_shift
+from external_webpage.scrape_schedule import DeadlineSchedule, scrape_phases
+from external_webpage.snapshot_store import SnapshotStore
+from external_webpage.viewer_demand import UNVIEWED_POLL_INTERVAL, viewer_demand
 
-scraped_data = {}
-scraped_data_lock = RLock()
+snapshot_store = SnapshotStore()
 logger = logging.getLogger("JSON_bourne")
 
-WAIT_BETWEEN_UPDATES = 5
-WAIT_BETWEEN_FAILED_UPDATES = 60
 RETRIES_BETWEEN_LOGS = 60
+# If the instrument time differs from the webserver time by more than this (in seconds) it is out of sync
+TIME_SHIFT_THRESHOLD = 5 * 60
+
+
+def publish_instrument_data(name, data, store=snapshot_store):
+    """
+    Publish the data scraped for an instrument as a new snapshot, encoding it to JSON so that requests only need
+    to send the already encoded body. The instrument's clock offset is parsed once here and the time shift added
+    to a copy of the data, so the collated data is never modified.
+    Args:
+        name: name of the instrument
+        data: the collated data for the instrument; empty string if the instrument is unavailable
+        store: the snapshot store to publish to
+
+    Returns: the published snapshot
+    Raises ValueError: if the data can not be converted to JSON
+    """
+    if isinstance(data, dict):
+        clock_offset = get_clock_offset(name, data)
+        time_diff, out_of_sync = get_time_shift(name, clock_offset, TIME_SHIFT_THRESHOLD)
+        data = dict(data, time_diff=time_diff, out_of_sync=out_of_sync)
+    return store.publish(name, data)
+
+
+class ScrapeReporter(object):
+    """
+    Publishes the outcome of each scrape of an instrument and logs failures, without flooding the log while an
+    instrument stays unavailable.
+    """
+
+    def __init__(
+        self,
+        name,
+        host,
+        store=snapshot_store,
+        poll_interval=None,
+        demand=viewer_demand,
+        breaker=None,
+    ):
+        """
+        Initialize.
+        Args:
+            name: Name of instrument.
+            host: Host for the instrument.
+            store: the snapshot store to publish to
+            poll_interval: the adaptive interval between successful scrapes; None for the default intervals
+            demand: record of which instruments are being viewed
+            breaker: the circuit breaker of the host; None for the host's shared breaker
+        """
+        self._name = name
+        self._host = host
+        self._store = store
+        self._demand = demand
+        self.breaker = breaker if breaker is not None else circuit_breakers.for_host(host)
+        self._poll_interval = poll_interval if poll_interval is not None else AdaptivePollInterval()
+        self._previously_failed = False
+        self._tries_since_logged = 0
+
+    def succeeded(self, data):
+        """
+        Publish the data from a successful scrape.
+        Args:
+            data: the collated data for the instrument
+
+        Returns: the number of seconds to wait before the next scrape
+        Raises ValueError: if the data can not be converted to JSON
+        """
+        self.breaker.record_success()
+        self._store.set_breaker_state(self._name, self.breaker.state)
+        publish_instrument_data(self._name, data, self._store)
+        self._tries_since_logged += 1
+        if self._previously_failed:
+            logger.error("Reconnected with " + str(self._name))
+        self._previously_failed = False
+        wait = self._poll_interval.next_interval(data)
+        if not self._demand.is_viewed(self._name):
+            wait = max(wait, UNVIEWED_POLL_INTERVAL)
+        return wait
+
+    def failed(self, error):
+        """
+        Publish that the instrument is unavailable after a failed scrape.
+        Args:
+            error: the exception raised by the scrape
+
+        Returns: the number of seconds to wait before the next scrape
+        """
+        if isinstance(error, TrialInProgressError):
+            # Another scrapper of the host is trying it, so wait for its outcome without counting a failure
+            return self.breaker.retry_wait()
+        wait = self.breaker.record_failure()
+        self._store.set_breaker_state(self._name, self.breaker.state)
+        self._tries_since_logged += 1
+        if not self._previously_failed or self._tries_since_logged >= RETRIES_BETWEEN_LOGS:
+            logger.error(
+                "Failed to get data from instrument: {0} at {1} error was: {2}{3}".format(
+                    self._name,
+                    self._host,
+                    error,
+                    " - Stack (1 line) {stack}:".format(stack=traceback.format_exc()),
+                )
+            )
+            self._previously_failed = True
+            self._tries_since_logged = 0
+        publish_instrument_data(self._name, "", self._store)
+        self._poll_interval.reset()
+        return wait
 
 
 class InstrumentScrapper(Thread):
@@ -20,36 +130,46 @@ class InstrumentScrapper(Thread):
     Thread that continually scrapes data from an instrument's ArchiveEngine.
     """
 
-    _previously_failed = False
-    _tries_since_logged = 0
-
-    def wait(self, seconds):
+    def wait(self, schedule):
         """
-        Wait for a number of seconds but in short waits so can stop thread more quickly
+        Wait for the deadline of the next scrape, returning early if the thread is stopped or bringing the deadline
+        forward if the instrument is viewed again, unless its host's breaker is open in which case the host is only
+        tried again when its backoff is over
         Args:
-            seconds: number of seconds to wait
+            schedule: the deadlines of the scrapes
 
         Returns:
 
         """
-        for i in range(seconds):
-            if self._stop_event.is_set():
-                return
-            sleep(1)
-
-    def __init__(self, name, host, pv_prefix):
+        while self._wake_event.wait(schedule.remaining()) and not self._stop_event.is_set():
+            self._wake_event.clear()
+            if self._reporter.breaker.state == CLOSED:
+                schedule.restart()
+                break
+        self._wake_event.clear()
+
+    def __init__(
+        self, name, host, pv_prefix, demand=viewer_demand, phases=scrape_phases, breaker=None
+    ):
         """
         Initialize.
         Args:
             name: Name of instrument.
             host: Host for the instrument.
             pv_prefix: The pv_prefix of the instrument.
+            demand: record of which instruments are being viewed
+            phases: the phase offsets to take the offset of the first scrape from
+            breaker: the circuit breaker of the host; None for the host's shared breaker
         """
         super(InstrumentScrapper, self).__init__()
         self._host = host
         self._pv_prefix = pv_prefix
         self._name = name
         self._stop_event = Event()
+        self._wake_event = Event()
+        self._demand = demand
+        self._phases = phases
+        self._reporter = ScrapeReporter(name, host, demand=demand, breaker=breaker)
 
     def is_instrument(self, name, host):
         """
@@ -69,37 +189,32 @@ class InstrumentScrapper(Thread):
         Returns:
 
         """
-        global scraped_data
-        web_page_scraper = InstrumentInformationCollator(self._host, self._pv_prefix)
+        # The instrument's own pool for its three archiver pages, as it has its own thread
+        fetch_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="fetch")
+        web_page_scraper = InstrumentInformationCollator(
+            self._host, self._pv_prefix, fetch_executor=fetch_executor
+        )
         logger.info("Scrapper started for {}".format(self._name))
-        while not self._stop_event.is_set():
-            try:
-                self._tries_since_logged += 1
-                temp_data = web_page_scraper.collate()
-                with scraped_data_lock:
-                    scraped_data[self._name] = temp_data
-                if self._previously_failed:
-                    logger.error("Reconnected with " + str(self._name))
-                self._previously_failed = False
-                self.wait(WAIT_BETWEEN_UPDATES)
-            except Exception as e:
-                if not self._previously_failed or self._tries_since_logged >= RETRIES_BETWEEN_LOGS:
-                    logger.error(
-                        "Failed to get data from instrument: {0} at {1} error was: {2}{3}".format(
-                            self._name,
-                            self._host,
-                            e,
-                            " - Stack (1 line) {stack}:".format(stack=traceback.format_exc()),
-                        )
-                    )
-                    self._previously_failed = True
-                    self._tries_since_logged = 0
-                with scraped_data_lock:
-                    scraped_data[self._name] = ""
-                self.wait(WAIT_BETWEEN_FAILED_UPDATES)
+        self._demand.add_listener(self._name, self._wake_event.set)
+        try:
+            schedule = DeadlineSchedule(self._phases.next_offset())
+            self.wait(schedule)
+            while not self._stop_event.is_set():
+                try:
+                    data = self._reporter.breaker.call(web_page_scraper.collate)
+                    wait = self._reporter.succeeded(data)
+                except Exception as e:
+                    wait = self._reporter.failed(e)
+                schedule.advance(wait)
+                self.wait(schedule)
+        finally:
+            self._demand.remove_listener(self._name, self._wake_event.set)
+            fetch_executor.shutdown(wait=False)
+            web_page_scraper.close()
 
     def stop(self):
         """
         Stop the thread at the next available point
         """
         self._stop_event.set()
+        self._wake_event.set()
@@ -0,0 +1,140 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Summary of all the instruments, as served for the ALL instrument.
+"""
+
+import bisect
+from builtins import object
+
+from external_webpage import json_backend
+from external_webpage.circuit_breaker import CLOSED
+from external_webpage.request_handler_utils import get_summary_details_of_instrument
+
+
+class InstrumentSummary(object):
+    """
+    Summary of whether each instrument is up, its run state and the state of its host's circuit breaker, kept in
+    order of instrument name.
+
+    The summary is updated one instrument at a time when its data changes, and its JSON is built from the encoded
+    entry of each instrument, so the summary of the unchanged instruments is neither recalculated nor re-encoded.
+    Updates must be serialised by the caller; readers never need a lock because the encoded summary is swapped
+    in with a single assignment.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._sort_keys = []
+        self._entries = {}
+        self._breaker_states = {}
+        # Tuple of version and encoded summary, replaced together
+        self._encoded = (0, b"{}")
+        # Tuple of error, version and the body made from them, replaced together
+        self._body = (None, None, None)
+
+    def update(self, name, data):
+        """
+        Update the summary of an instrument from its new data.
+        Args:
+            name: name of the instrument
+            data: the collated data for the instrument; empty string if the instrument is unavailable
+
+        Returns: True if the summary has changed; False otherwise
+        """
+        details = get_summary_details_of_instrument(data)
+        details["breaker"] = self._breaker_states.get(name, CLOSED)
+        return self._set_details(name, details)
+
+    def set_breaker_state(self, name, state):
+        """
+        Update the state of the circuit breaker of an instrument's host.
+        Args:
+            name: name of the instrument
+            state: the state of the breaker
+
+        Returns: True if the summary has changed; False otherwise
+        """
+        self._breaker_states[name] = state
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        return self._set_details(name, dict(entry[0], breaker=state))
+
+    def _set_details(self, name, details):
+        """
+        Set the summary details of an instrument, re-encoding the summary if they have changed.
+        Args:
+            name: name of the instrument
+            details: dictionary of the instrument's summary details
+
+        Returns: True if the summary has changed; False otherwise
+        """
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == details:
+            return False
+
+        if entry is None:
+            sort_key = name.lower()
+            index = bisect.bisect_right(self._sort_keys, sort_key)
+            self._sort_keys.insert(index, sort_key)
+            self._names.insert(index, name)
+        self._entries[name] = (
+            details,
+            b"".join([json_backend.dumps(name), b": ", json_backend.dumps(details)]),
+        )
+
+        encoded = b"".join([b"{", b", ".join(self._entries[name][1] for name in self._names), b"}"])
+        self._encoded = (self._encoded[0] + 1, encoded)
+        return True
+
+    @property
+    def version(self):
+        """
+        Returns: the number of times the summary has changed
+        """
+        return self._encoded[0]
+
+    def instruments_json(self):
+        """
+        Returns: the summary as UTF-8 encoded JSON of instrument name to whether it is up, its run state and the
+            state of its host's circuit breaker
+        """
+        return self._encoded[1]
+
+    def body(self, error):
+        """
+        The body served for the ALL instrument; it is only rebuilt when the summary or error changes.
+        Args:
+            error: error from retrieving the instrument list; empty string if there was none
+
+        Returns: UTF-8 encoded JSON of the error and the summary
+        """
+        cached_error, cached_version, body = self._body
+        version, instruments = self._encoded
+        if cached_error == error and cached_version == version:
+            return body
+        body = b"".join(
+            [
+                b'{"error": ',
+                json_backend.dumps(error),
+                b', "instruments": ',
+                instruments,
+                b"}",
+            ]
+        )
+        self._body = (error, version, body)
+        return body
@@ -0,0 +1,156 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Encoding and decoding of JSON with the fastest library installed.
+
+orjson is used if it is installed, then ujson, otherwise the standard library's json module. Every backend
+encodes to UTF-8 bytes and decodes from bytes or str. A document the fast backend rejects, e.g. one with lone
+surrogates which the standard library accepts, is handled by the standard library, so the choice of backend only
+changes the speed and the whitespace of the output.
+"""
+
+import json
+import logging
+from builtins import object
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+logger = logging.getLogger("JSON_bourne")
+
+ORJSON = "orjson"
+UJSON = "ujson"
+STDLIB = "json"
+
+
+class JsonBackend(object):
+    """
+    A library used to encode and decode JSON.
+    """
+
+    def __init__(self, name, dumps, loads):
+        """
+        Initialize.
+        Args:
+            name: name of the library
+            dumps: function encoding an object to UTF-8 encoded JSON
+            loads: function decoding JSON from bytes or str
+        """
+        self.name = name
+        self._dumps = dumps
+        self._loads = loads
+
+    def dumps(self, obj):
+        """
+        Args:
+            obj: the object to encode
+
+        Returns: the object as UTF-8 encoded JSON
+        Raises TypeError, ValueError: if the object can not be encoded
+        """
+        try:
+            return self._dumps(obj)
+        except (TypeError, ValueError, OverflowError):
+            if self.name == STDLIB:
+                raise
+            return _stdlib_dumps(obj)
+
+    def loads(self, document):
+        """
+        Args:
+            document: the JSON as bytes or str
+
+        Returns: the decoded object
+        Raises ValueError: if the document is not valid JSON
+        """
+        try:
+            return self._loads(document)
+        except ValueError:
+            if self.name == STDLIB:
+                raise
+            return json.loads(document)
+
+
+def _stdlib_dumps(obj):
+    """
+    Args:
+        obj: the object to encode
+
+    Returns: the object as UTF-8 encoded JSON
+    """
+    return json.dumps(obj).encode("utf-8")
+
+
+def _ujson_dumps(obj):
+    """
+    Args:
+        obj: the object to encode
+
+    Returns: the object as UTF-8 encoded JSON
+    """
+    return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+
+def available_backends():
+    """
+    Returns: the JSON backends which are installed, fastest first
+    """
+    backends = []
+    if orjson is not None:
+        backends.append(
+            JsonBackend(
+                ORJSON, lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), orjson.loads
+            )
+        )
+    if ujson is not None:
+        backends.append(JsonBackend(UJSON, _ujson_dumps, ujson.loads))
+    backends.append(JsonBackend(STDLIB, _stdlib_dumps, json.loads))
+    return backends
+
+
+backend = available_backends()[0]
+logger.info("Using {} to encode and decode JSON".format(backend.name))
+
+
+def dumps(obj):
+    """
+    Encode an object as JSON with the fastest backend.
+    Args:
+        obj: the object to encode
+
+    Returns: the object as UTF-8 encoded JSON
+    Raises TypeError, ValueError: if the object can not be encoded
+    """
+    return backend.dumps(obj)
+
+
+def loads(document):
+    """
+    Decode JSON with the fastest backend.
+    Args:
+        document: the JSON as bytes or str
+
+    Returns: the decoded object
+    Raises ValueError: if the document is not valid JSON
+    """
+    return backend.loads(document)
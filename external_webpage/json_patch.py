@@ -0,0 +1,120 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+JSON patches (RFC 6902) between versions of an instrument's data.
+
+Objects are compared key by key; any other value, including arrays, is replaced whole when it changes. The
+order of an object's keys is kept, which the dataweb page relies on for the order of groups and blocks, so an
+object whose keys have been reordered is replaced whole as well.
+"""
+
+import copy
+
+
+def _escape(key):
+    """
+    Args:
+        key: an object key
+
+    Returns: the key escaped for use in a JSON pointer
+    """
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    """
+    Args:
+        token: a token from a JSON pointer
+
+    Returns: the object key
+    """
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(source, target, path, operations):
+    """
+    Add the operations changing source into target to the list of operations.
+    Args:
+        source: the original value
+        target: the new value
+        path: JSON pointer to the value
+        operations: list of operations to add to
+    """
+    if source is target:
+        return
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        if source != target or type(source) is not type(target):
+            operations.append({"op": "replace", "path": path, "value": target})
+        return
+
+    kept = [key for key in source if key in target]
+    added = [key for key in target if key not in source]
+    if list(target) != kept + added:
+        operations.append({"op": "replace", "path": path, "value": target})
+        return
+
+    for key in source:
+        if key not in target:
+            operations.append({"op": "remove", "path": path + "/" + _escape(key)})
+    for key in kept:
+        _diff(source[key], target[key], path + "/" + _escape(key), operations)
+    for key in added:
+        operations.append({"op": "add", "path": path + "/" + _escape(key), "value": target[key]})
+
+
+def make_patch(source, target):
+    """
+    Make a JSON patch from one document to another.
+    Args:
+        source: the original document
+        target: the new document
+
+    Returns: the list of patch operations
+    """
+    operations = []
+    _diff(source, target, "", operations)
+    return operations
+
+
+def apply_patch(document, patch):
+    """
+    Apply a JSON patch made by make_patch to a document.
+    Args:
+        document: the document to patch; it is not modified
+        patch: list of patch operations
+
+    Returns: the patched document
+    Raises ValueError: if an operation is not supported
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        if operation["path"] == "":
+            if operation["op"] != "replace":
+                raise ValueError("Unsupported operation on whole document: {}".format(operation))
+            document = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in operation["path"].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[token]
+        if operation["op"] in ("add", "replace"):
+            parent[tokens[-1]] = copy.deepcopy(operation["value"])
+        elif operation["op"] == "remove":
+            del parent[tokens[-1]]
+        else:
+            raise ValueError("Unsupported operation: {}".format(operation))
+    return document
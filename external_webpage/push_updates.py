@@ -0,0 +1,164 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Pushing updates to clients which hold a connection open, rather than polling.
+
+The broadcaster is used from the web server's IO loop only; the scrappers hand their new snapshots to that loop
+before they are broadcast.
+"""
+
+from builtins import object
+from collections import defaultdict
+from datetime import timedelta
+
+from tornado.locks import Event
+from tornado.util import TimeoutError
+
+# Event sent when an instrument is not available
+UNAVAILABLE_EVENT = "unavailable"
+
+
+def format_server_sent_event(data, event_id=None, event=None):
+    """
+    Format a message as a server-sent event.
+    Args:
+        data: the message as bytes
+        event_id: id of the event; the client sends back the last id it received when it reconnects
+        event: name of the event type; None for the default message type
+
+    Returns: the event as bytes
+    """
+    lines = []
+    if event_id is not None:
+        lines.append("id: {}".format(event_id).encode("utf-8"))
+    if event is not None:
+        lines.append("event: {}".format(event).encode("utf-8"))
+    for line in data.splitlines() or [b""]:
+        lines.append(b"data: " + line)
+    return b"\n".join(lines) + b"\n\n"
+
+
+def snapshot_event(snapshot):
+    """
+    Args:
+        snapshot: the snapshot of an instrument
+
+    Returns: the server-sent event for the snapshot, with its generation token as the event id
+    """
+    if not snapshot.is_up():
+        return format_server_sent_event(b"", snapshot.token, UNAVAILABLE_EVENT)
+    return format_server_sent_event(snapshot.body, snapshot.token)
+
+
+class Subscription(object):
+    """
+    A client's subscription to the updates for a key. Only the latest message is kept, so a client which is slow
+    to receive skips straight to the newest update.
+    """
+
+    def __init__(self, key):
+        """
+        Initialize.
+        Args:
+            key: the key subscribed to
+        """
+        self.key = key
+        self.closed = False
+        self._latest = None
+        self._has_message = Event()
+
+    def close(self):
+        """
+        Mark the subscription as closed, waking anything waiting for its next message.
+        """
+        self.closed = True
+        self._has_message.set()
+
+    def push(self, message):
+        """
+        Replace any message waiting to be sent with this one.
+        Args:
+            message: the message
+        """
+        self._latest = message
+        self._has_message.set()
+
+    async def next_message(self, timeout):
+        """
+        Wait for the next message.
+        Args:
+            timeout: the longest time to wait in seconds
+
+        Returns: the message; None if there was no message before the timeout or the subscription is closed
+        """
+        try:
+            await self._has_message.wait(timeout=timedelta(seconds=timeout))
+        except TimeoutError:
+            return None
+        self._has_message.clear()
+        message, self._latest = self._latest, None
+        return message
+
+
+class UpdateBroadcaster(object):
+    """
+    Sends each message published for a key to every subscription to that key.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, key):
+        """
+        Args:
+            key: the key to subscribe to
+
+        Returns: a new subscription to the key
+        """
+        subscription = Subscription(key)
+        self._subscriptions[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Args:
+            subscription: the subscription to end
+        """
+        subscription.close()
+        subscriptions = self._subscriptions.get(subscription.key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.key]
+
+    def has_subscribers(self, key):
+        """
+        Args:
+            key: the key
+
+        Returns: True if there are any subscriptions to the key; False otherwise
+        """
+        return key in self._subscriptions
+
+    def publish(self, key, message):
+        """
+        Send a message to the subscriptions of a key.
+        Args:
+            key: the key
+            message: the message
+        """
+        for subscription in self._subscriptions.get(key, ()):
+            subscription.push(message)
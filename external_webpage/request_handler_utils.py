@@ -2,7 +2,6 @@ import logging
 import re
 import time
 from builtins import str
-from collections import OrderedDict
 
 logger = logging.getLogger("JSON_bourne")
 
@@ -19,10 +18,10 @@ def get_instrument_and_callback(path):
     """
     # JSONP requires a response of the format "name_of_callback(json_string)"
     # e.g. myFunction({ "a": 1, "b": 2})
-    callback = re.findall("/?callback=(\w+)&", path)
+    callback = re.findall(r"/?callback=(\w+)(?:&|$)", path)
 
     # Look for the instrument data
-    instruments = re.findall("&Instrument=([^&]+)&", path)
+    instruments = re.findall(r"[?&]Instrument=([^&]+)(?:&|$)", path)
 
     if len(callback) != 1:
         raise ValueError("Invalid number of callbacks specified: {}".format(path))
@@ -33,26 +32,35 @@ def get_instrument_and_callback(path):
     return instruments[0].upper(), callback[0]
 
 
-def get_summary_details_of_all_instruments(data):
-    """
-    Gets whether ibex is running for each instrument.
-    :param data: The data scraped from the archiver webpage
-    :return: A json dictionary containing the states of each instrument (True if running, False otherwise)
+def get_since_generation(path):
     """
+    Looks at the path used to connect and picks out the generation token of the data the client already has, if
+    any.
+    Args:
+        path (str): the requested path
 
-    inst_data = OrderedDict()
-    ordered_inst_list = sorted(data.keys(), key=lambda s: s.lower())
-    for inst in ordered_inst_list:
-        v = data[inst]
+    Returns:
+        str: the generation token; None if no valid token is given
 
-        try:
-            run_state = v["inst_pvs"]["RUNSTATE"]["value"]
-        except (KeyError, TypeError):
-            run_state = "UNKNOWN"
+    """
+    tokens = re.findall(r"[?&]since=([0-9a-f]+-\d+)(?:&|$)", path)
+    if len(tokens) != 1:
+        return None
+    return tokens[0]
 
-        inst_data[inst] = {"is_up": (v != ""), "run_state": run_state}
 
-    return inst_data
+def get_summary_details_of_instrument(data):
+    """
+    Gets whether ibex is running for an instrument and its run state.
+    :param data: The data scraped from the archiver webpage for the instrument
+    :return: A json dictionary containing whether the instrument is running and its run state
+    """
+    try:
+        run_state = data["inst_pvs"]["RUNSTATE"]["value"]
+    except (KeyError, TypeError):
+        run_state = "UNKNOWN"
+
+    return {"is_up": (data != ""), "run_state": run_state}
 
 
 def get_instrument_time_since_epoch(instrument_name, instrument_data):
@@ -98,53 +106,59 @@ def get_instrument_time_since_epoch(instrument_name, instrument_data):
     return inst_time
 
 
-def set_time_shift(
+def get_clock_offset(
     instrument_name,
     instrument_data,
-    time_shift_threshold,
     extract_time_from_instrument_func=get_instrument_time_since_epoch,
     current_time_func=time.time,
 ):
     """
-    Update the instrument data with the time shift to the webserver.
+    Get how far the instrument's clock is ahead of the webserver's.
 
     :param instrument_name: The name of the instrument
     :param instrument_data: The data dictionary of the instrument
-    :param time_shift_threshold: If the time shift is greater than this value the data is considered outdated
+    :return: the offset in seconds; None if the instrument time can not be parsed
     """
     try:
-        inst_time = extract_time_from_instrument_func(instrument_name, instrument_data)
-        current_time = current_time_func()
-        time_diff = int(round(abs(current_time - inst_time)))
+        return (
+            extract_time_from_instrument_func(instrument_name, instrument_data)
+            - current_time_func()
+        )
     except (ValueError, TypeError, KeyError):
-        time_diff = None
+        return None
 
-    try:
-        instrument_data["time_diff"] = time_diff
 
-        if time_diff is not None and time_diff > time_shift_threshold:
-            instrument_data["out_of_sync"] = True
-            logger.warning(
-                f"There is a time shift of {time_diff} seconds between {instrument_name} and web server"
-            )
-        else:
-            instrument_data["out_of_sync"] = False
-    except TypeError:
-        logger.error(f"Cannot set time shift information for {instrument_name}.")
+def get_time_shift(instrument_name, clock_offset, time_shift_threshold):
+    """
+    Get the time shift information served for an instrument from the offset of its clock.
+
+    :param instrument_name: The name of the instrument
+    :param clock_offset: How far the instrument's clock is ahead of the webserver's in seconds; None if unknown
+    :param time_shift_threshold: If the time shift is greater than this value the data is considered outdated
+    :return: tuple of the time shift in whole seconds (None if unknown) and whether it is out of sync
+    """
+    if clock_offset is None:
+        return None, False
+    time_diff = int(round(abs(clock_offset)))
+    if time_diff > time_shift_threshold:
+        logger.warning(
+            f"There is a time shift of {time_diff} seconds between {instrument_name} and web server"
+        )
+        return time_diff, True
+    return time_diff, False
 
 
-def get_detailed_state_of_specific_instrument(instrument, data, time_shift_threshold=5 * 60):
+def get_snapshot_of_specific_instrument(instrument, snapshots):
     """
-    Gets the detailed state of a specific instrument, used to display the instrument's dataweb screen
-    :param instrument: The instrument to get data for
-    :param data: The data scraped from the archiver webpage
-    :param time_shift_threshold: The allowed time difference in seconds between the instrument and the webserver time
-    :return: The data from the archiver webpage filtered to only contain data about the requested instrument
+    Gets the latest snapshot of a specific instrument, whose body is the instrument's state encoded as JSON
+    :param instrument: The instrument to get the snapshot for
+    :param snapshots: Dictionary of instrument name to its latest snapshot
+    :return: The snapshot of the requested instrument
     """
-    if instrument not in data.keys():
+    if instrument not in snapshots.keys():
         raise ValueError(str(instrument) + " not known")
-    if data[instrument] == "":
+    snapshot = snapshots[instrument]
+    if not snapshot.is_up():
         raise ValueError("Instrument has become unavailable")
-    set_time_shift(instrument, data[instrument], time_shift_threshold)
 
-    return data[instrument]
+    return snapshot
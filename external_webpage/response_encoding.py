@@ -0,0 +1,191 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Compressed content encodings of the responses.
+
+Every response is a JSONP call, i.e. the body wrapped in a callback name chosen by the client, so the complete
+response can not simply be compressed once. Instead the body is compressed once into a raw deflate fragment and
+each gzip response is assembled around it, with the callback and closing bracket added as uncompressed (stored)
+deflate blocks. Only the CRC of the response has to be calculated per request. Brotli streams can not be
+assembled like this, so brotli is only served for the fixed callbacks of the info pages, whose responses are
+compressed once each.
+"""
+
+import struct
+import zlib
+from builtins import object
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+# Header of a gzip member: magic number, deflate method, no flags, no modification time, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+# Largest length of a single stored deflate block
+_MAX_STORED_BLOCK = 0xFFFF
+
+# JSONP callbacks of the instrument and overview pages, the only ones for which brotli responses are served
+BROTLI_CALLBACKS = frozenset(["instrument_data", "display_data"])
+
+
+def available_encodings(callback):
+    """
+    Args:
+        callback: name of the JSONP callback the response is wrapped in
+
+    Returns: the content encodings the response can be served in, in order of preference
+    """
+    if brotli is None or callback not in BROTLI_CALLBACKS:
+        return [GZIP]
+    return [BROTLI, GZIP]
+
+
+def choose_content_encoding(accept_encoding, available):
+    """
+    Choose the content encoding to use for a response.
+    Args:
+        accept_encoding: value of the request's Accept-Encoding header; None if it was not sent
+        available: the encodings that can be served in order of preference
+
+    Returns: the first available encoding accepted by the client; identity if there is none
+    """
+    if not accept_encoding:
+        return IDENTITY
+
+    accepted = set()
+    for coding in accept_encoding.split(","):
+        parts = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for parameter in parts[1:]:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(parts[0].lower())
+
+    for encoding in available:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return IDENTITY
+
+
+def _stored_blocks(data, final):
+    """
+    Encode data as uncompressed deflate blocks. Assumes the output starts on a byte boundary.
+    Args:
+        data: the bytes to store
+        final: True if the last block should end the deflate stream
+
+    Returns: the deflate blocks
+    """
+    blocks = []
+    chunks = [data[i : i + _MAX_STORED_BLOCK] for i in range(0, len(data), _MAX_STORED_BLOCK)]
+    if not chunks:
+        chunks = [b""]
+    for index, chunk in enumerate(chunks):
+        is_final = final and index == len(chunks) - 1
+        length = len(chunk)
+        blocks.append(struct.pack("<BHH", 1 if is_final else 0, length, length ^ 0xFFFF))
+        blocks.append(chunk)
+    return b"".join(blocks)
+
+
+def deflate_fragment(body):
+    """
+    Compress a body into deflate blocks which can be placed anywhere within a deflate stream: no block is marked
+    as final, the output ends on a byte boundary and nothing refers back to data before the body.
+    Args:
+        body: the bytes to compress
+
+    Returns: the compressed blocks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def gzip_around_fragment(prefix, body, fragment, suffix):
+    """
+    Create a gzip stream of prefix + body + suffix, reusing an already compressed body.
+    Args:
+        prefix: bytes to place before the body
+        body: the uncompressed body
+        fragment: the body compressed by deflate_fragment
+        suffix: bytes to place after the body
+
+    Returns: the gzip encoded bytes
+    """
+    crc = zlib.crc32(suffix, zlib.crc32(body, zlib.crc32(prefix)))
+    size = (len(prefix) + len(body) + len(suffix)) & 0xFFFFFFFF
+    return b"".join(
+        [
+            _GZIP_HEADER,
+            _stored_blocks(prefix, final=False),
+            fragment,
+            _stored_blocks(suffix, final=True),
+            struct.pack("<II", crc, size),
+        ]
+    )
+
+
+class EncodedBody(object):
+    """
+    A response body with its compressed variants, compressed once and reused for every response.
+    """
+
+    def __init__(self, body):
+        """
+        Initialize.
+        Args:
+            body: the uncompressed body
+        """
+        self.body = body
+        self._gzip_fragment = deflate_fragment(body)
+        self._brotli_responses = {}
+
+    def jsonp(self, callback, encoding=IDENTITY):
+        """
+        The body wrapped in a JSONP callback.
+        Args:
+            callback: name of the callback function
+            encoding: the content encoding to use, one of the available encodings for the callback
+
+        Returns: the response bytes in the given encoding
+        Raises ValueError: if brotli is asked for with a callback it is not served for
+        """
+        prefix = callback.encode("utf-8") + b"("
+        suffix = b")"
+        if encoding == GZIP:
+            return gzip_around_fragment(prefix, self.body, self._gzip_fragment, suffix)
+        response = b"".join([prefix, self.body, suffix])
+        if encoding == BROTLI:
+            if callback not in BROTLI_CALLBACKS:
+                raise ValueError("Brotli is not served for the callback {}".format(callback))
+            # Brotli streams can not be spliced, so the response for each fixed callback is compressed once
+            try:
+                return self._brotli_responses[callback]
+            except KeyError:
+                compressed = brotli.compress(response, mode=brotli.MODE_TEXT, quality=5)
+                self._brotli_responses[callback] = compressed
+                return compressed
+        return response
@@ -0,0 +1,106 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Scheduling of the scrapes of each instrument.
+
+Each scrapper starts at its own phase offset, so that instruments started together do not all read from their
+archivers at once. The offsets are taken from a low discrepancy sequence, which spreads them evenly however many
+instruments there are and wherever new ones are added. Scrapes are then scheduled against deadlines on the
+monotonic clock rather than by sleeping after each scrape, so the time a scrape takes does not shift the
+following ones and the age of an instrument's data stays predictable.
+"""
+
+import math
+import time
+from builtins import object
+from threading import Lock
+
+# Period over which the first scrapes of the instruments are spread, in seconds
+STAGGER_PERIOD = 5
+
+# Fractional part of the golden ratio; adding it repeatedly modulo one gives evenly spread values
+_GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+
+
+class StaggeredPhases(object):
+    """
+    Hands out the phase offsets of the scrappers.
+    """
+
+    def __init__(self, period=STAGGER_PERIOD):
+        """
+        Initialize.
+        Args:
+            period: period over which the offsets are spread, in seconds
+        """
+        self._period = period
+        self._lock = Lock()
+        self._count = 0
+
+    def next_offset(self):
+        """
+        Returns: the offset of the first scrape of a new scrapper, in seconds
+        """
+        with self._lock:
+            fraction = (self._count * _GOLDEN_RATIO_FRACTION) % 1
+            self._count += 1
+        return fraction * self._period
+
+
+scrape_phases = StaggeredPhases()
+
+
+class DeadlineSchedule(object):
+    """
+    Deadlines of the scrapes of an instrument on the monotonic clock.
+    """
+
+    def __init__(self, offset=0, clock=time.monotonic):
+        """
+        Initialize.
+        Args:
+            offset: seconds from now until the first deadline
+            clock: function returning the current monotonic time in seconds
+        """
+        self._clock = clock
+        self.deadline = clock() + offset
+
+    def remaining(self):
+        """
+        Returns: the number of seconds until the current deadline; zero if it has passed
+        """
+        return max(0, self.deadline - self._clock())
+
+    def advance(self, interval):
+        """
+        Move to the next deadline, an interval after the current one. If the scrape overran it, the missed
+        deadlines are skipped rather than scraping again straight away to catch up.
+        Args:
+            interval: seconds between the current deadline and the next
+
+        Returns: the number of seconds until the next deadline
+        """
+        now = self._clock()
+        self.deadline += interval
+        if self.deadline < now and interval > 0:
+            self.deadline += math.ceil((now - self.deadline) / interval) * interval
+        return max(0, self.deadline - now)
+
+    def restart(self):
+        """
+        Make the current deadline now, e.g. when a scrape is brought forward because the instrument is viewed.
+        """
+        self.deadline = self._clock()
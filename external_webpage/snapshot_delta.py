@@ -0,0 +1,150 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Differences between consecutive snapshots of an instrument, sent to clients which already have the earlier one.
+
+A delta message has the form::
+
+    {"type": "delta", "generation": <new generation token>, "base": <generation token it applies to>,
+     "groups": {group name: {block name: block description}},  # blocks whose description changed
+     "inst_pvs": {pv name: pv description},  # instrument PVs which were added or changed
+     "removed_inst_pvs": [pv name],
+     "changed": {key: value},  # other top level values which were added or changed
+     "removed": [key]}
+
+Whole snapshots are sent as ``{"type": "snapshot", "generation": <generation token>, "data": <instrument data>}``
+and an instrument becoming unavailable as ``{"type": "unavailable", "generation": <generation token>}``.
+"""
+
+from external_webpage import json_backend
+
+GROUPS = "groups"
+INST_PVS = "inst_pvs"
+
+
+def _group_layout(groups):
+    """
+    Args:
+        groups: the groups of an instrument's data
+
+    Returns: the names of the groups and of the blocks in each, in order
+    """
+    return [(name, list(blocks.keys())) for name, blocks in groups.items()]
+
+
+def _changed_entries(previous, current):
+    """
+    Args:
+        previous: dictionary of the previous values
+        current: dictionary of the current values
+
+    Returns: tuple of dictionary of the entries added or changed, and list of keys removed
+    """
+    changed = {
+        key: value
+        for key, value in current.items()
+        if key not in previous or (previous[key] is not value and previous[key] != value)
+    }
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def compute_delta(previous, current):
+    """
+    Compute the changes from one instrument's data to the next.
+    Args:
+        previous: the previous data of the instrument
+        current: the current data of the instrument
+
+    Returns: the delta as a dictionary, without its generations; None if the change can not be described by a
+        delta, e.g. because the instrument has become (un)available or the groups have been rearranged
+    """
+    if not isinstance(previous, dict) or not isinstance(current, dict):
+        return None
+
+    previous_groups = previous.get(GROUPS, {})
+    current_groups = current.get(GROUPS, {})
+    if _group_layout(previous_groups) != _group_layout(current_groups):
+        return None
+
+    groups = {}
+    for group_name, blocks in current_groups.items():
+        previous_blocks = previous_groups[group_name]
+        if blocks is previous_blocks:
+            continue
+        changed_blocks, _ = _changed_entries(previous_blocks, blocks)
+        if changed_blocks:
+            groups[group_name] = changed_blocks
+
+    inst_pvs, removed_inst_pvs = _changed_entries(
+        previous.get(INST_PVS, {}), current.get(INST_PVS, {})
+    )
+
+    other_previous = {
+        key: value for key, value in previous.items() if key not in (GROUPS, INST_PVS)
+    }
+    other_current = {key: value for key, value in current.items() if key not in (GROUPS, INST_PVS)}
+    changed, removed = _changed_entries(other_previous, other_current)
+
+    return {
+        GROUPS: groups,
+        INST_PVS: inst_pvs,
+        "removed_inst_pvs": removed_inst_pvs,
+        "changed": changed,
+        "removed": removed,
+    }
+
+
+def encode_delta_message(base_data, base_token, data, token):
+    """
+    Encode the delta message from the previous data of an instrument to its new data.
+    Args:
+        base_data: the previous data
+        base_token: the generation token of the previous data
+        data: the new data
+        token: the generation token of the new data
+
+    Returns: the message as UTF-8 encoded JSON; None if a whole snapshot must be sent instead
+    """
+    delta = compute_delta(base_data, data)
+    if delta is None:
+        return None
+    message = {"type": "delta", "generation": token, "base": base_token}
+    message.update(delta)
+    return json_backend.dumps(message)
+
+
+def encode_snapshot_message(snapshot):
+    """
+    Encode the message sending a whole snapshot, reusing its already encoded body.
+    Args:
+        snapshot: the snapshot
+
+    Returns: the message as UTF-8 encoded JSON
+    """
+    if not snapshot.is_up():
+        return '{{"type": "unavailable", "generation": "{}"}}'.format(snapshot.token).encode(
+            "utf-8"
+        )
+    return b"".join(
+        [
+            '{{"type": "snapshot", "generation": "{}", "data": '.format(snapshot.token).encode(
+                "utf-8"
+            ),
+            snapshot.body,
+            b"}",
+        ]
+    )
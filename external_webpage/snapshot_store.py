@@ -0,0 +1,325 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Store of the data scraped from each instrument, shared between the scrappers and the web requests.
+"""
+
+import logging
+import uuid
+from builtins import object
+from threading import Lock
+
+from external_webpage import json_backend
+from external_webpage.instrument_summary import InstrumentSummary
+from external_webpage.json_patch import make_patch
+from external_webpage.response_encoding import IDENTITY, EncodedBody
+from external_webpage.snapshot_delta import encode_delta_message
+
+logger = logging.getLogger("JSON_bourne")
+
+# Number of earlier generations of an instrument's data kept, from which patches to the current data can be made
+HISTORY_LENGTH = 12
+
+
+def encode_body(name, data):
+    """
+    Encode the data for an instrument as it is served.
+    Args:
+        name: name of the instrument
+        data: the collated data for the instrument
+
+    Returns: the data as UTF-8 encoded JSON
+    Raises ValueError: if the data can not be converted to JSON
+    """
+    try:
+        return json_backend.dumps(data)
+    except Exception as err:
+        raise ValueError("Unable to convert data for {} to JSON: {}".format(name, err))
+
+
+def generation_token(prefix, generation):
+    """
+    Args:
+        prefix: the token distinguishing this run of the server from earlier ones
+        generation: the generation of an instrument's data
+
+    Returns: the token clients are given for the generation, which never matches one from before a restart
+    """
+    return "{}-{}".format(prefix, generation)
+
+
+def add_generation(data, data_body, token):
+    """
+    Add the generation to the encoded data of an instrument, so that clients can ask for the changes since it.
+    Args:
+        data: the collated data for the instrument
+        data_body: the data encoded as UTF-8 JSON
+        token: the generation token of the data
+
+    Returns: the encoded data with a generation entry; unchanged if the data is not a dictionary
+    """
+    if not isinstance(data, dict):
+        return data_body
+    separator = b", " if data else b""
+    return b"".join(
+        [data_body[:-1], separator, '"generation": "{}"}}'.format(token).encode("utf-8")]
+    )
+
+
+class InstrumentSnapshot(object):
+    """
+    The data published for an instrument by a scrape. Once published it must not be modified, so it can be read
+    from any thread without locking.
+    """
+
+    def __init__(
+        self,
+        name,
+        data,
+        data_body,
+        generation,
+        token_prefix,
+        delta_base=None,
+        history=(),
+    ):
+        """
+        Initialize.
+        Args:
+            name: name of the instrument
+            data: the collated data for the instrument; empty string if the instrument is unavailable
+            data_body: the data encoded as UTF-8 JSON
+            generation: the number of times the data for this instrument has changed
+            token_prefix: the token distinguishing the store's generations from those of an earlier run
+            delta_base: tuple of the generation token and data of the previous generation, from which the delta
+                message is made; None if there was none
+            history: tuple of (generation, data) of the earlier generations kept, oldest first
+        """
+        self.name = name
+        self.data = data
+        self.token = generation_token(token_prefix, generation)
+        self.body = add_generation(data, data_body, self.token)
+        self.generation = generation
+        self.etag = '"{}"'.format(self.token)
+        self._token_prefix = token_prefix
+        self._delta_base = delta_base
+        self._delta_message = None
+        self.history = history
+        self.encoded = EncodedBody(self.body)
+        self._data_body_length = len(data_body)
+        self._patch_messages = {}
+
+    @property
+    def delta_message(self):
+        """
+        Returns: the encoded changes from the previous generation, made the first time they are asked for, so
+            only when a client is following the instrument; None if there are none
+        """
+        delta_base = self._delta_base
+        if delta_base is not None:
+            base_token, base_data = delta_base
+            self._delta_message = encode_delta_message(base_data, base_token, self.data, self.token)
+            self._delta_base = None
+        return self._delta_message
+
+    def has_data_body(self, data_body):
+        """
+        Args:
+            data_body: data for the instrument encoded as UTF-8 JSON
+
+        Returns: True if this snapshot's data has the same encoding; False otherwise
+        """
+        if len(data_body) != self._data_body_length:
+            return False
+        if not isinstance(self.data, dict):
+            return self.body == data_body
+        return self.body.startswith(data_body[:-1])
+
+    def patch_message_since(self, token):
+        """
+        The changes to this snapshot's data since an earlier generation, as a JSON patch.
+        Args:
+            token: the generation token of the data the client has
+
+        Returns: UTF-8 encoded JSON of the generation token, the base generation token and the patch from the base
+            generation; None if the generation is not known, e.g. because it is from before the server restarted,
+            or either generation is unavailable
+        """
+        try:
+            return self._patch_messages[token]
+        except KeyError:
+            pass
+
+        prefix, _, number = token.rpartition("-")
+        if prefix != self._token_prefix or not number.isdigit():
+            return None
+        generation = int(number)
+        if generation == self.generation:
+            base = self.data
+        else:
+            base = next((data for gen, data in self.history if gen == generation), None)
+        if not isinstance(base, dict) or not self.is_up():
+            return None
+
+        message = {
+            "generation": self.token,
+            "base": token,
+            "patch": make_patch(base, self.data),
+        }
+        self._patch_messages[token] = json_backend.dumps(message)
+        return self._patch_messages[token]
+
+    def etag_for(self, encoding):
+        """
+        Args:
+            encoding: the content encoding of the response
+
+        Returns: the entity tag of the body in the given encoding
+        """
+        if encoding == IDENTITY:
+            return self.etag
+        return '{}-{}"'.format(self.etag[:-1], encoding)
+
+    def is_up(self):
+        """
+        Returns: True if the instrument was available when the snapshot was taken; False otherwise
+        """
+        return self.data != ""
+
+
+class SnapshotStore(object):
+    """
+    Copy-on-write store of the latest snapshot of each instrument.
+
+    Publishing builds a new dictionary of snapshots and swaps it in with a single assignment. Readers take a
+    reference to the current dictionary, which is never modified afterwards, so they never need a lock and never
+    block the scrappers. Only writers are serialised, so that concurrent publishes do not lose each other's
+    updates.
+    """
+
+    def __init__(self):
+        self._write_lock = Lock()
+        self._snapshots = {}
+        # Distinguishes the generation tokens and entity tags from those of a previous run of the server, whose
+        # generations restarted
+        self._token_prefix = uuid.uuid4().hex[:8]
+        self._listeners = []
+        self._summary_listeners = []
+        self._summary = InstrumentSummary()
+
+    def add_listener(self, listener):
+        """
+        Add a function to be called with each new snapshot, i.e. whenever the data of an instrument changes. It is
+        called on the publishing thread so should return quickly.
+        Args:
+            listener: function taking the new snapshot
+        """
+        self._listeners.append(listener)
+
+    def add_summary_listener(self, listener):
+        """
+        Add a function to be called when the summary of all instruments changes without a new snapshot, e.g. when
+        the circuit breaker of an instrument's host changes state. It is called on the changing thread so should
+        return quickly.
+        Args:
+            listener: function taking no arguments
+        """
+        self._summary_listeners.append(listener)
+
+    def publish(self, name, data):
+        """
+        Publish new data for an instrument. If it encodes to the same body as the current snapshot that snapshot
+        is kept, so its generation and entity tag only change when the data does.
+        Args:
+            name: name of the instrument
+            data: the collated data for the instrument; empty string if the instrument is unavailable
+
+        Returns: the current snapshot for the instrument
+        Raises ValueError: if the data can not be converted to JSON
+        """
+        body = encode_body(name, data)
+        with self._write_lock:
+            previous = self._snapshots.get(name)
+            if previous is not None and previous.has_data_body(body):
+                return previous
+            if previous is None:
+                generation = 1
+                history = ()
+            else:
+                generation = previous.generation + 1
+                history = previous.history[-(HISTORY_LENGTH - 1) :] + (
+                    (previous.generation, previous.data),
+                )
+            snapshot = InstrumentSnapshot(
+                name,
+                data,
+                body,
+                generation,
+                self._token_prefix,
+                None if previous is None else (previous.token, previous.data),
+                history,
+            )
+            snapshots = dict(self._snapshots)
+            snapshots[name] = snapshot
+            self._snapshots = snapshots
+            self._summary.update(name, data)
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.exception("Error notifying listener of new data for {}: {}".format(name, e))
+        return snapshot
+
+    def set_breaker_state(self, name, state):
+        """
+        Record the state of the circuit breaker of an instrument's host in the summary of all instruments.
+        Args:
+            name: name of the instrument
+            state: the state of the breaker
+        """
+        with self._write_lock:
+            changed = self._summary.set_breaker_state(name, state)
+
+        if changed:
+            for listener in self._summary_listeners:
+                try:
+                    listener()
+                except Exception as e:
+                    logger.exception(
+                        "Error notifying listener of new summary for {}: {}".format(name, e)
+                    )
+
+    def snapshots(self):
+        """
+        Returns: the current snapshots as a dictionary of instrument name to snapshot. This must not be modified.
+        """
+        return self._snapshots
+
+    def get(self, name):
+        """
+        Args:
+            name: name of the instrument
+
+        Returns: the current snapshot of the instrument; None if nothing has been published for it
+        """
+        return self._snapshots.get(name)
+
+    @property
+    def summary(self):
+        """
+        Returns: the summary of all the instruments, kept up to date as their data changes
+        """
+        return self._summary
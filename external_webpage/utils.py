@@ -1,3 +1,4 @@
+import hashlib
 import zlib
 
 
@@ -17,3 +18,19 @@ def dehex_and_decompress(value):
         pass
 
     return zlib.decompress(bytes.fromhex(value)).decode("utf-8")
+
+
+def fingerprint(value):
+    """
+    A cheap fingerprint of a raw value, to tell whether it has changed without decoding it.
+    Args:
+        value: the value as bytes or str
+
+    Returns: the fingerprint as bytes
+    """
+    try:
+        value = value.encode("utf-8")
+    except AttributeError:
+        pass
+
+    return hashlib.blake2b(value, digest_size=16).digest()
@@ -0,0 +1,145 @@
+# This file is part of the ISIS IBEX application.
+# Copyright (C) 2017 Science & Technology Facilities Council.
+# All rights reserved.
+#
+# This program is distributed in the hope that it will be useful.
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License v1.0 which accompanies this distribution.
+# EXCEPT AS EXPRESSLY SET FORTH IN THE ECLIPSE PUBLIC LICENSE V1.0, THE PROGRAM
+# AND ACCOMPANYING MATERIALS ARE PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND.  See the Eclipse Public License v1.0 for more details.
+#
+# You should have received a copy of the Eclipse Public License v1.0
+# along with this program; if not, you can obtain a copy from
+# https://www.eclipse.org/org/documents/epl-v10.php or
+# http://opensource.org/licenses/eclipse-1.0.php
+"""
+Which instruments are being viewed, so that the scrappers can concentrate on them.
+
+An instrument counts as viewed for a few minutes after a client last requested its data or was sent an update of
+it. Instruments nobody is viewing are scraped at a slow background rate; the first request for one wakes its
+scrapper so it returns to the full rate straight away.
+"""
+
+import logging
+import time
+from builtins import object
+from threading import Lock
+
+logger = logging.getLogger("JSON_bourne")
+
+# Seconds after the last view of an instrument for which it is scraped at the full rate
+VIEWED_RECENTLY = 5 * 60
+# Shortest time between scrapes of an instrument nobody is viewing, in seconds
+UNVIEWED_POLL_INTERVAL = 60
+
+
+class ViewerDemand(object):
+    """
+    Records when each instrument was last viewed and notifies listeners when an instrument which was not being
+    viewed is viewed again.
+    """
+
+    def __init__(self, viewed_recently=VIEWED_RECENTLY, clock=time.monotonic):
+        """
+        Initialize.
+        Args:
+            viewed_recently: seconds after its last view for which an instrument counts as viewed
+            clock: function returning the current monotonic time in seconds
+        """
+        self._viewed_recently = viewed_recently
+        self._clock = clock
+        self._lock = Lock()
+        self._last_viewed = {}
+        self._listeners = {}
+
+    def _is_viewed(self, name, now):
+        """
+        Must be called holding the lock.
+        Args:
+            name: name of the instrument
+            now: the current time
+
+        Returns: True if the instrument has been viewed recently; False otherwise
+        """
+        last_viewed = self._last_viewed.get(name)
+        return last_viewed is not None and now - last_viewed < self._viewed_recently
+
+    def _forget_old_views(self, now):
+        """
+        Forget the instruments which have not been viewed recently. Must be called holding the lock.
+        Args:
+            now: the current time
+        """
+        self._last_viewed = {
+            name: last_viewed
+            for name, last_viewed in self._last_viewed.items()
+            if now - last_viewed < self._viewed_recently
+        }
+
+    def record_view(self, name):
+        """
+        Record that a client has viewed an instrument's data, notifying its listeners if it was not being viewed.
+        Args:
+            name: name of the instrument
+        """
+        with self._lock:
+            now = self._clock()
+            newly_viewed = not self._is_viewed(name, now)
+            if newly_viewed:
+                # Views only become old while an instrument is not being viewed, so this is rarely needed
+                self._forget_old_views(now)
+            self._last_viewed[name] = now
+            listeners = list(self._listeners.get(name, ())) if newly_viewed else []
+
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.exception("Error notifying listener that {} is viewed: {}".format(name, e))
+
+    def is_viewed(self, name):
+        """
+        Args:
+            name: name of the instrument
+
+        Returns: True if the instrument has been viewed recently; False otherwise
+        """
+        with self._lock:
+            return self._is_viewed(name, self._clock())
+
+    def add_listener(self, name, listener):
+        """
+        Add a function to be called when an instrument which was not being viewed is viewed.
+        Args:
+            name: name of the instrument
+            listener: function taking no arguments; it is called on the thread recording the view so should
+                return quickly
+        """
+        with self._lock:
+            self._listeners.setdefault(name, []).append(listener)
+
+    def remove_listener(self, name, listener):
+        """
+        Remove a listener added by add_listener; does nothing if it was not added.
+        Args:
+            name: name of the instrument
+            listener: the listener
+        """
+        with self._lock:
+            listeners = self._listeners.get(name, [])
+            if listener in listeners:
+                listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(name, None)
+
+    def viewed_instruments(self):
+        """
+        Returns: sorted list of the names of the instruments viewed recently
+        """
+        with self._lock:
+            now = self._clock()
+            return sorted(name for name in self._last_viewed if self._is_viewed(name, now))
+
+
+viewer_demand = ViewerDemand()
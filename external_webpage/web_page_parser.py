@@ -23,10 +23,50 @@ from builtins import object, str
 from collections import OrderedDict
 
 from block import Block
-from block_utils import shorten_title
+from block_utils import TitleTable
 
 logger = logging.getLogger("JSON_bourne")
 
+# A run of \\u-DDD which should be proper unicode characters but are not
+_FAKE_UNICODE_RUN = re.compile(r"(?:\\u[\d-]{4})+")
+# Length of each escape in a run
+_FAKE_UNICODE_LENGTH = len("\\u0000")
+
+
+def _decode_fake_unicode_run(match):
+    """
+    Args:
+        match: the match of a run of fake unicode escapes
+
+    Returns: the characters the run encodes
+    """
+    # for each value convert to actual value (unsigned byte) and add to byte array
+    run = match.group(0)
+    asbytearray = bytearray()
+    for start in range(2, len(run), _FAKE_UNICODE_LENGTH):
+        val = int(run[start : start + 4])
+        if val < 0:
+            val += 256
+        asbytearray.append(val)
+
+    # convert byte array to utf8
+    return asbytearray.decode("utf-8")
+
+
+def decode_fake_unicode(value):
+    """
+    Replace every run of `\\udddd` escapes, the signed bytes of UTF-8 characters, with the characters, in a
+    single pass over the value.
+    Args:
+        value: the value to decode
+
+    Returns: the decoded value; the value itself if it has no escapes
+    Raises ValueError: if an escape is not a byte or the bytes are not UTF-8
+    """
+    if "\\" not in value:
+        return value
+    return _FAKE_UNICODE_RUN.sub(_decode_fake_unicode_run, value)
+
 
 class BlocksParseError(Exception):
     """
@@ -48,6 +88,14 @@ class WebPageParser(object):
     Parses parts of a json web page.
     """
 
+    def __init__(self, titles=None):
+        """
+        Initialize.
+        Args:
+            titles (TitleTable): the table of shortened channel titles to use; None for a new table
+        """
+        self.titles = titles if titles is not None else TitleTable()
+
     def extract_blocks(self, info_page_as_json):
         """
         Extract blocks from channels on the given page.
@@ -66,24 +114,24 @@ class WebPageParser(object):
 
         for channel in channels:
             try:
-                block = self._create_block_from_channel(channel)
+                block = self.create_block_from_channel(channel)
                 blocks[block.get_name()] = block
             except (ValueError, KeyError, AttributeError, TypeError) as ex:
                 logger.error("Can not convert block from channel {0}: {1}".format(channel, ex))
 
         return blocks
 
-    def _create_block_from_channel(self, channel):
+    def create_block_from_channel(self, channel):
         """
         Create a single block from a channel object.
 
         Args:
             channel: the channel.
 
-        Returns:
+        Returns: the block
 
         """
-        name = shorten_title(channel["Channel"])
+        name = self.titles.shorten_title(channel["Channel"])
         connected = channel["Connected"]
         current_value = channel["Current Value"]
         if connected:
@@ -91,11 +139,7 @@ class WebPageParser(object):
 
             precision = str(current_value.get("Precision", ""))
 
-            value = str(current_value["Value"])
-
-            replaced = True
-            while replaced:
-                value, replaced = self._replace_fake_unicode(value)
+            value = decode_fake_unicode(str(current_value["Value"]))
             alarm = current_value["Alarm"]
         else:
             value = "null"
@@ -105,40 +149,3 @@ class WebPageParser(object):
         status = Block.CONNECTED if connected else Block.DISCONNECTED
 
         return Block(name, status, value, alarm, True, precision, units)
-
-    def _replace_fake_unicode(self, value):
-        """
-        Replace the first `\\udddd` with its unicode equivalent
-        Args:
-            value: the value to use
-
-        Returns: tuple of new value and whether a replace was made
-
-        """
-        # look for \\u-DDD which should be proper unicode characters but are not
-        match = re.search(r"((?:\\u[\d-]{4})+)", value)
-
-        if match is None:
-            return value, False
-
-        start, end = match.span(1)
-        unicode_chars = match.group(1)
-
-        # split multiple unicode characters into values
-        string_values = re.split(r"\\u", unicode_chars)[1:]
-
-        # for each value convert to actual value (unsigned byte) and ad to byte array
-        asbytearray = bytearray()
-        for string_val in string_values:
-            val = int(string_val)
-            if val < 0:
-                val += 256
-            asbytearray.append(val)
-
-        # convert byte array to utf8
-        asunicode = asbytearray.decode("utf-8")
-
-        # rebuild full string without mistake
-        modified_value = value[:start] + asunicode + value[end:]
-
-        return modified_value, True
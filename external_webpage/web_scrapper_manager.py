@@ -4,16 +4,16 @@ Relation to web scrapper management.
 
 from __future__ import print_function
 
-import json
 import logging
 from builtins import object, range
 from threading import Event, Thread
 from time import sleep
 
 from CaChannel import CaChannelException
-from CaChannel.util import caget
 
-from external_webpage.instrument_scapper import InstrumentScrapper
+from external_webpage import json_backend
+from external_webpage.async_instrument_scrapper import AsyncInstrumentScrapper, scrape_engine
+from external_webpage.channel_access import channel_cache
 from external_webpage.utils import dehex_and_decompress
 
 # logger for the class
@@ -36,15 +36,22 @@ class InstList(object):
     INSTRUMENT_LIST_NOT_JSON = "Instrument list is not json"
     INSTRUMENT_LIST_NOT_CORRECT_FORMAT = "Instrument list not in correct format"
 
-    def __init__(self, caget_fn=caget, local_inst_list=None):
+    def __init__(
+        self, caget_fn=None, local_inst_list=None, channel_cache=channel_cache, on_change=None
+    ):
         """
         Initialise.
         Args:
-            caget_fn: function to perform a caget
+            caget_fn: function to perform a caget; None to monitor the instrument list pv instead
             local_inst_list: local instrument list to override/add entries to the one from instrument list pv
+            channel_cache: the cache of Channel Access monitors to read the instrument list pv from
+            on_change: function called when the monitored instrument list changes; None for no notification
         """
         self.error_on_retrieve = "Instrument list not yet retrieved"
         self._caget_fn = caget_fn
+        self._channel_cache = channel_cache
+        if caget_fn is None and on_change is not None:
+            channel_cache.add_listener(INST_LIST_PV, lambda value: on_change())
         if local_inst_list is None:
             self._local_inst_list = {}
         else:
@@ -59,7 +66,10 @@ class InstList(object):
 
         inst_list = {}
         try:
-            raw = self._caget_fn(INST_LIST_PV, as_string=True)
+            if self._caget_fn is None:
+                raw = self._channel_cache.get(INST_LIST_PV)
+            else:
+                raw = self._caget_fn(INST_LIST_PV, as_string=True)
 
         except CaChannelException as ex:
             self.error_on_retrieve = InstList.INSTRUMENT_LIST_CAN_NOT_BE_READ
@@ -74,7 +84,7 @@ class InstList(object):
             return self._cached_list
 
         try:
-            full_inst_list = json.loads(full_inst_list_string)
+            full_inst_list = json_backend.loads(full_inst_list_string)
         except Exception as ex:
             self.error_on_retrieve = InstList.INSTRUMENT_LIST_NOT_JSON
             logger.error("ERROR: Error getting instrument list. {}".format(ex))
@@ -101,27 +111,39 @@ class WebScrapperManager(Thread):
     It is responsible for starting then and making sure they are running
     """
 
-    def __init__(self, scrapper_class=InstrumentScrapper, inst_list=None, local_inst_list=None):
+    def __init__(
+        self,
+        scrapper_class=AsyncInstrumentScrapper,
+        inst_list=None,
+        local_inst_list=None,
+        engine=scrape_engine,
+    ):
         """
         Initialiser.
         Args:
-            scrapper_class: the class for the Scrappers
+            scrapper_class: the class for the Scrappers; InstrumentScrapper to scrape each instrument in its own
+                thread
             inst_list: the instrument list getter
             local_inst_list: a local instrument list to add to global instrument list
+            engine: the scrape engine the scrappers run on, shut down when they have all stopped
         """
         super(WebScrapperManager, self).__init__()
+        self._stop_event = Event()
+        self._refresh_event = Event()
         if inst_list is None:
-            self._inst_list = InstList(local_inst_list=local_inst_list)
+            self._inst_list = InstList(
+                local_inst_list=local_inst_list, on_change=self.request_refresh
+            )
         else:
             self._inst_list = inst_list
 
         self._scrapper_class = scrapper_class
+        self._engine = engine
         self.scrappers = []
-        self._stop_event = Event()
 
     def wait(self, seconds):
         """
-        Wait for a number of seconds but in short waits so can stop thread more quickly
+        Wait for a number of seconds but in short waits so can stop thread, or refresh the scrappers, more quickly
         Args:
             seconds: number of seconds to wait
 
@@ -129,10 +151,16 @@ class WebScrapperManager(Thread):
 
         """
         for i in range(seconds):
-            if self._stop_event.is_set():
+            if self._stop_event.is_set() or self._refresh_event.is_set():
                 return
             sleep(1)
 
+    def request_refresh(self):
+        """
+        Refresh the scrappers from the instrument list as soon as possible, e.g. because it has changed.
+        """
+        self._refresh_event.set()
+
     def run(self):
         """
         Perform a run of the web scrapper management cycle
@@ -146,6 +174,7 @@ class WebScrapperManager(Thread):
         """
         Maintain the scrapper list by starting any instrument scrapper on the list and stopping those not on the list
         """
+        self._refresh_event.clear()
         inst_list = self._inst_list.retrieve()
         new_scrappers_list = []
         for scrapper in self.scrappers:
@@ -194,7 +223,7 @@ class WebScrapperManager(Thread):
 
     def stop_all(self):
         """
-        Stop all scrapper threads.
+        Stop all scrappers and then the scrape engine.
 
         """
         for scrapper in self.scrappers:
@@ -203,6 +232,7 @@ class WebScrapperManager(Thread):
         print("   Waiting for scrappers to stop ...")
         for scrapper in self.scrappers:
             scrapper.join()
+        self._engine.shutdown()
         print("   ... finished")
 
     def instrument_list_retrieval_errors(self):
@@ -4,6 +4,8 @@ var HOST = "https://dataweb2.isis.rl.ac.uk"
 var INST_REFRESH = 5000;
 var WALL_DISP_REFRESH = 2 * 60 * 1000;
 var TIMEOUT = 2500;
+// Open the page with Updates=push to have changes pushed by the server instead of polling for them
+var USE_PUSH = /[?&]Updates=push(&|$)/.test(location.search) && !!window.EventSource;
 
 function refresh_instruments() {
 	$.ajax({
@@ -14,10 +16,23 @@ function refresh_instruments() {
 		error: function(xhr, status, error){ 
 			document.getElementById("time").setAttribute("style", "color:red")
 		},
+		// Use a fixed url so the browser can revalidate the previous response with its Etag
+		cache: true,
 		jsonpCallback: "display_data"
 	});
 }
 
+function follow_instruments() {
+	var source = new EventSource(HOST + ":" + PORT + "/events?Instrument=all");
+	source.onmessage = function(event) {
+		display_data(JSON.parse(event.data));
+	};
+	// The browser reconnects by itself after an error
+	source.onerror = function(event) {
+		document.getElementById("time").setAttribute("style", "color:red")
+	};
+}
+
 function refresh_wall_display() {
 	// Refresh the wall display as it has a memory leak
 	var display = document.getElementById('wall_display');
@@ -161,7 +176,11 @@ var buttonHeight = $(window).height();
 
 open_wall_display();
 
-$(document).ready(refresh_instruments());
+if (USE_PUSH) {
+	$(document).ready(follow_instruments());
+} else {
+	$(document).ready(refresh_instruments());
 
-setInterval(refresh_instruments, INST_REFRESH);
+	setInterval(refresh_instruments, INST_REFRESH);
+}
 setInterval(refresh_wall_display, WALL_DISP_REFRESH);
@@ -19,6 +19,8 @@ var nodeTimeDiffTitle = document.createElement("H2");
 var instrumentState;
 var showHidden;
 var timeout = 4000;
+// Open the page with Updates=push to have changes pushed by the server instead of polling for them
+var usePush = getURLParameter("Updates") === "push" && !!window.EventSource;
 
 dictDisplayFirstInstPVs = {
     RUNSTATE: 'Run Status',
@@ -139,24 +141,91 @@ function clear(node) {
     }
 }
 
+/**
+ * Applies a JSON patch, as sent by the server, to a copy of some instrument data.
+ *
+ * @param data The instrument data.
+ * @param patch The list of patch operations.
+ * @return The patched data.
+ */
+function applyPatch(data, patch) {
+    data = JSON.parse(JSON.stringify(data));
+    for (var i = 0; i < patch.length; i++) {
+        var operation = patch[i];
+        if (operation.path === "") {
+            data = operation.value;
+            continue;
+        }
+        var tokens = operation.path.split("/").slice(1).map(function(token) {
+            return token.replace(/~1/g, "/").replace(/~0/g, "~");
+        });
+        var parent = data;
+        for (var j = 0; j < tokens.length - 1; j++) {
+            parent = parent[tokens[j]];
+        }
+        if (operation.op === "remove") {
+            delete parent[tokens[tokens.length - 1]];
+        } else {
+            parent[tokens[tokens.length - 1]] = operation.value;
+        }
+    }
+    return data;
+}
+
 /**
  * Fetches the latest instrument data.
  */
 function refresh() {
+	var request = {"Instrument": instrument};
+	// Ask for only the changes since the data already shown
+	if (instrumentState && instrumentState.generation !== undefined) {
+		request.since = instrumentState.generation;
+	}
 	$.ajax({
 		url: HOST + ":" + PORT + "/",
 		dataType: 'jsonp',
-		data: {"Instrument": instrument},
+		data: request,
+		// Use a fixed url so the browser can revalidate the previous response with its Etag
+		cache: true,
+		jsonpCallback: "instrument_data",
 		timeout: timeout,
 		error: function(xhr, status, error){
 			displayError();
 		},
 		success: function(data){
+			if (data.patch !== undefined) {
+				// A patch is only usable against the data it was made from, e.g. not after the server restarts
+				if (!instrumentState || data.base !== instrumentState.generation) {
+					instrumentState = null;
+					refresh();
+					return;
+				}
+				var generation = data.generation;
+				data = applyPatch(instrumentState, data.patch);
+				data.generation = generation;
+			}
 			parseObject(data);
 		}
 	});
 }
 
+/**
+ * Follows the instrument data, which the server sends as an event each time it changes.
+ */
+function followUpdates() {
+    var source = new EventSource(HOST + ":" + PORT + "/events?Instrument=" + encodeURIComponent(instrument));
+    source.onmessage = function(event) {
+        parseObject(JSON.parse(event.data));
+    };
+    source.addEventListener("unavailable", function(event) {
+        displayError();
+    });
+    // The browser reconnects by itself after an error
+    source.onerror = function(event) {
+        displayError();
+    };
+}
+
 /**
  * Build the error status list from the given error statuses.
  */
@@ -555,6 +624,10 @@ function writeAlarmInfo(nodeBlock, alarm) {
 // This will update when a connection is made
 $(document).ready(displayError());
 
-$(document).ready(refresh());
+if (usePush) {
+    $(document).ready(followUpdates());
+} else {
+    $(document).ready(refresh());
 
-setInterval(refresh, 5000);
+    setInterval(refresh, 5000);
+}
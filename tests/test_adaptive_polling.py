@@ -0,0 +1,119 @@
+import unittest
+
+from hamcrest import *
+
+from external_webpage.adaptive_polling import AdaptivePollInterval
+from external_webpage.circuit_breaker import CircuitBreaker
+from external_webpage.instrument_scapper import ScrapeReporter
+from external_webpage.snapshot_store import SnapshotStore
+from external_webpage.viewer_demand import UNVIEWED_POLL_INTERVAL, ViewerDemand
+
+
+def instrument_data(block_value, run_state="SETUP"):
+    return {
+        "groups": {"GROUP": {"BLOCK": {"value": block_value}}},
+        "inst_pvs": {"RUNSTATE": {"value": run_state}},
+    }
+
+
+class TestAdaptivePollInterval(unittest.TestCase):
+    def setUp(self):
+        self.poll_interval = AdaptivePollInterval(
+            min_interval=2, running_interval=5, max_interval=30, backoff_factor=2
+        )
+
+    def test_GIVEN_first_data_WHEN_next_interval_THEN_minimum_interval(self):
+        result = self.poll_interval.next_interval(instrument_data(1))
+
+        assert_that(result, is_(2))
+
+    def test_GIVEN_unchanged_blocks_between_runs_WHEN_next_interval_THEN_backs_off_to_maximum(self):
+        intervals = [self.poll_interval.next_interval(instrument_data(1)) for _ in range(7)]
+
+        assert_that(intervals, is_([2, 4, 8, 16, 30, 30, 30]))
+
+    def test_GIVEN_unchanged_blocks_while_running_WHEN_next_interval_THEN_backs_off_to_running_interval(
+        self,
+    ):
+        intervals = [
+            self.poll_interval.next_interval(instrument_data(1, "RUNNING")) for _ in range(4)
+        ]
+
+        assert_that(intervals, is_([2, 4, 5, 5]))
+
+    def test_GIVEN_backed_off_WHEN_block_changes_THEN_minimum_interval(self):
+        for _ in range(5):
+            self.poll_interval.next_interval(instrument_data(1))
+
+        result = self.poll_interval.next_interval(instrument_data(2))
+
+        assert_that(result, is_(2))
+
+    def test_GIVEN_backed_off_between_runs_WHEN_run_starts_THEN_interval_limited_to_running_interval(
+        self,
+    ):
+        for _ in range(5):
+            self.poll_interval.next_interval(instrument_data(1))
+
+        result = self.poll_interval.next_interval(instrument_data(1, "RUNNING"))
+
+        assert_that(result, is_(5))
+
+    def test_GIVEN_backed_off_WHEN_reset_THEN_next_data_gets_minimum_interval(self):
+        for _ in range(5):
+            self.poll_interval.next_interval(instrument_data(1))
+
+        self.poll_interval.reset()
+
+        assert_that(self.poll_interval.next_interval(instrument_data(1)), is_(2))
+
+    def test_GIVEN_default_intervals_WHEN_blocks_keep_changing_while_running_THEN_polled_at_usual_rate(
+        self,
+    ):
+        poll_interval = AdaptivePollInterval()
+
+        intervals = [
+            poll_interval.next_interval(instrument_data(value, "RUNNING")) for value in range(5)
+        ]
+
+        assert_that(intervals, only_contains(5))
+
+
+class TestScrapeReporterPolling(unittest.TestCase):
+    def setUp(self):
+        self.demand = ViewerDemand()
+        self.demand.record_view("TEST_INST")
+        self.reporter = ScrapeReporter(
+            "TEST_INST",
+            "HOST",
+            SnapshotStore(),
+            AdaptivePollInterval(2, 5, 30, 2),
+            self.demand,
+            CircuitBreaker("HOST", initial_backoff=10, random_fn=lambda: 1),
+        )
+
+    def test_GIVEN_unchanged_scrapes_WHEN_succeeded_THEN_wait_grows(self):
+        waits = [self.reporter.succeeded(instrument_data(1)) for _ in range(3)]
+
+        assert_that(waits, is_([2, 4, 8]))
+
+    def test_GIVEN_backed_off_WHEN_scrape_fails_and_then_succeeds_THEN_failed_wait_then_minimum_wait(
+        self,
+    ):
+        for _ in range(3):
+            self.reporter.succeeded(instrument_data(1))
+
+        failed_wait = self.reporter.failed(IOError("unreachable"))
+        wait = self.reporter.succeeded(instrument_data(1))
+
+        assert_that(failed_wait, is_(10))
+        assert_that(wait, is_(2))
+
+    def test_GIVEN_instrument_not_viewed_WHEN_succeeded_THEN_wait_is_background_interval(self):
+        reporter = ScrapeReporter(
+            "OTHER_INST", "HOST", SnapshotStore(), AdaptivePollInterval(2, 5, 30, 2), self.demand
+        )
+
+        wait = reporter.succeeded(instrument_data(1))
+
+        assert_that(wait, is_(UNVIEWED_POLL_INTERVAL))
@@ -0,0 +1,285 @@
+import asyncio
+import time
+import unittest
+from builtins import object
+from threading import Event, Lock
+
+from hamcrest import *
+
+from external_webpage.async_instrument_scrapper import AsyncInstrumentScrapper, AsyncScrapeEngine
+from external_webpage.circuit_breaker import OPEN, CircuitBreaker
+from external_webpage.scrape_schedule import StaggeredPhases
+from external_webpage.snapshot_store import SnapshotStore
+from external_webpage.viewer_demand import ViewerDemand
+
+TIMEOUT = 5
+
+
+class FakeCollator(object):
+    def __init__(self, data=None, error=None, release=None):
+        self.data = data if data is not None else {"inst_pvs": {}}
+        self.error = error
+        self.release = release
+        self.calls = 0
+        self.pages = None
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def page_reads(self):
+        return [lambda: "blocks", lambda: "dataweb", lambda: "instrument"]
+
+    def read_instrument_config(self):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(TIMEOUT)
+        if self.error is not None:
+            raise self.error
+        return "config"
+
+    def collate_pages(self, instrument_config, pages):
+        self.pages = pages
+        return self.data
+
+
+class TestAsyncInstrumentScrapper(unittest.TestCase):
+    def setUp(self):
+        self.engine = AsyncScrapeEngine(min_workers=2)
+        self.store = SnapshotStore()
+        self.published = Event()
+        self.store.add_listener(lambda snapshot: self.published.set())
+        self.demand = ViewerDemand()
+        self.scrappers = []
+
+    def tearDown(self):
+        for scrapper in self.scrappers:
+            scrapper.stop()
+            scrapper.join(TIMEOUT)
+        self.engine.shutdown()
+
+    def _scrapper(self, name, collator, breaker=None):
+        scrapper = AsyncInstrumentScrapper(
+            name,
+            "host",
+            "prefix",
+            engine=self.engine,
+            collator=collator,
+            store=self.store,
+            demand=self.demand,
+            phases=StaggeredPhases(0),
+            breaker=breaker if breaker is not None else CircuitBreaker("host"),
+        )
+        self.scrappers.append(scrapper)
+        return scrapper
+
+    def test_GIVEN_scrapper_WHEN_started_THEN_collated_data_published(self):
+        scrapper = self._scrapper("INST", FakeCollator({"inst_pvs": {}, "config_name": "conf"}))
+
+        scrapper.start()
+
+        assert_that(self.published.wait(TIMEOUT), is_(True))
+        assert_that(self.store.get("INST").data, has_entries({"config_name": "conf"}))
+        assert_that(scrapper.is_alive(), is_(True))
+
+    def test_GIVEN_collate_fails_WHEN_started_THEN_instrument_published_as_unavailable(self):
+        scrapper = self._scrapper("INST", FakeCollator(error=IOError("no archiver")))
+
+        scrapper.start()
+
+        assert_that(self.published.wait(TIMEOUT), is_(True))
+        assert_that(self.store.get("INST").is_up(), is_(False))
+
+    def test_GIVEN_running_scrapper_WHEN_stopped_THEN_scrapper_finishes(self):
+        scrapper = self._scrapper("INST", FakeCollator())
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+
+        scrapper.stop()
+        scrapper.join(TIMEOUT)
+
+        assert_that(scrapper.is_alive(), is_(False))
+
+    def test_GIVEN_running_scrapper_WHEN_stopped_THEN_collator_closed(self):
+        collator = FakeCollator()
+        scrapper = self._scrapper("INST", collator)
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+
+        scrapper.stop()
+        scrapper.join(TIMEOUT)
+
+        assert_that(collator.closed, is_(True))
+
+    def test_GIVEN_scrapper_not_started_WHEN_is_alive_THEN_false(self):
+        assert_that(self._scrapper("INST", FakeCollator()).is_alive(), is_(False))
+
+    def test_GIVEN_scrapper_stopped_before_it_runs_WHEN_joined_THEN_nothing_collated(self):
+        collator = FakeCollator()
+        scrapper = self._scrapper("INST", collator)
+
+        scrapper.stop()
+        scrapper.start()
+        scrapper.join(TIMEOUT)
+
+        assert_that(collator.calls, is_(0))
+
+    def test_GIVEN_more_scrappers_than_workers_WHEN_reads_stall_THEN_every_instrument_still_read(
+        self,
+    ):
+        release = Event()
+        collators = [FakeCollator(release=release) for _ in range(5)]
+        for index, collator in enumerate(collators):
+            self._scrapper("INST_{}".format(index), collator).start()
+
+        for _ in range(int(TIMEOUT / 0.01)):
+            if all(collator.calls == 1 for collator in collators):
+                break
+            time.sleep(0.01)
+        release.set()
+
+        assert_that([collator.calls for collator in collators], only_contains(1))
+
+    def test_GIVEN_page_read_fails_WHEN_scraped_THEN_collated_with_error_in_place_of_page(self):
+        error = IOError("no archiver")
+
+        class FailingReadCollator(FakeCollator):
+            def page_reads(self):
+                def fail():
+                    raise error
+
+                return [lambda: "blocks", fail, lambda: "instrument"]
+
+        collator = FailingReadCollator()
+        self._scrapper("INST", collator).start()
+
+        assert_that(self.published.wait(TIMEOUT), is_(True))
+        assert_that(collator.pages, contains_exactly("blocks", error, "instrument"))
+
+    def test_GIVEN_config_read_fails_WHEN_scraped_THEN_pages_not_collated(self):
+        collator = FakeCollator(error=IOError("no block server"))
+        self._scrapper("INST", collator).start()
+
+        assert_that(self.published.wait(TIMEOUT), is_(True))
+        assert_that(collator.pages, is_(None))
+
+    def test_GIVEN_unviewed_instrument_waiting_WHEN_viewed_THEN_scraped_again_straight_away(self):
+        collator = FakeCollator()
+        scrapper = self._scrapper("INST", collator)
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+
+        self.demand.record_view("INST")
+
+        for _ in range(int(TIMEOUT / 0.01)):
+            if collator.calls >= 2:
+                break
+            time.sleep(0.01)
+        assert_that(collator.calls, is_(2))
+
+    def test_GIVEN_breaker_open_after_failure_WHEN_viewed_THEN_not_scraped_before_backoff(self):
+        collator = FakeCollator(error=IOError("no archiver"))
+        breaker = CircuitBreaker("host", failure_threshold=1, probe=lambda host: True)
+        scrapper = self._scrapper("INST", collator, breaker)
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+
+        self.demand.record_view("INST")
+        time.sleep(0.2)
+
+        assert_that(breaker.state, is_(OPEN))
+        assert_that(collator.calls, is_(1))
+
+    def test_GIVEN_phase_offset_WHEN_started_THEN_first_scrape_waits_for_offset(self):
+        collator = FakeCollator()
+        phases = StaggeredPhases(TIMEOUT)
+        # The first offset is always zero
+        phases.next_offset()
+        scrapper = AsyncInstrumentScrapper(
+            "INST",
+            "host",
+            "prefix",
+            engine=self.engine,
+            collator=collator,
+            store=self.store,
+            demand=self.demand,
+            phases=phases,
+            breaker=CircuitBreaker("host"),
+        )
+        self.scrappers.append(scrapper)
+
+        scrapper.start()
+
+        assert_that(self.published.wait(0.2), is_(False))
+        assert_that(collator.calls, is_(0))
+
+    def test_GIVEN_open_breaker_for_unreachable_host_WHEN_started_THEN_not_collated_and_unavailable(
+        self,
+    ):
+        breaker = CircuitBreaker("host", failure_threshold=1, probe=lambda host: False)
+        breaker.record_failure()
+        collator = FakeCollator()
+        scrapper = AsyncInstrumentScrapper(
+            "INST",
+            "host",
+            "prefix",
+            engine=self.engine,
+            collator=collator,
+            store=self.store,
+            demand=self.demand,
+            phases=StaggeredPhases(0),
+            breaker=breaker,
+        )
+        self.scrappers.append(scrapper)
+
+        scrapper.start()
+
+        assert_that(self.published.wait(TIMEOUT), is_(True))
+        assert_that(self.store.get("INST").is_up(), is_(False))
+        assert_that(collator.calls, is_(0))
+
+    def test_GIVEN_engine_with_scrapper_WHEN_shut_down_THEN_loop_thread_stops(self):
+        scrapper = self._scrapper("INST", FakeCollator())
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+        scrapper.stop()
+        scrapper.join(TIMEOUT)
+        thread = self.engine._thread
+
+        self.engine.shutdown()
+
+        assert_that(thread.is_alive(), is_(False))
+
+    def test_GIVEN_engine_shut_down_WHEN_call_soon_THEN_loop_not_restarted(self):
+        self.engine.submit(asyncio.sleep(0)).result(TIMEOUT)
+        self.engine.shutdown()
+
+        self.engine.call_soon(lambda: None)
+
+        assert_that(self.engine._thread, is_(None))
+
+    def test_GIVEN_engine_shut_down_WHEN_scrapper_started_THEN_error(self):
+        self.engine.shutdown()
+
+        assert_that(calling(self._scrapper("INST", FakeCollator()).start), raises(RuntimeError))
+
+    def test_GIVEN_scrapper_on_shut_down_engine_WHEN_stopped_THEN_loop_not_restarted(self):
+        scrapper = self._scrapper("INST", FakeCollator())
+        scrapper.start()
+        self.published.wait(TIMEOUT)
+        self.engine.shutdown()
+
+        scrapper.stop()
+
+        assert_that(self.engine._thread, is_(None))
+        assert_that(scrapper.is_alive(), is_(False))
+
+    def test_GIVEN_scrapper_WHEN_is_instrument_THEN_matches_name_and_host(self):
+        scrapper = self._scrapper("INST", FakeCollator())
+
+        assert_that(scrapper.is_instrument("INST", "host"), is_(True))
+        assert_that(scrapper.is_instrument("INST", "other"), is_(False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+
+from hamcrest import *
+from mock import Mock
+
+from external_webpage.block_table import BlockTable
+from external_webpage.instrument_information_collator import InstrumentConfig
+from external_webpage.web_page_parser import BlocksParseError
+from tests.data_mother import ArchiveMother, ConfigMother
+
+
+def page(*channels):
+    return ArchiveMother.create_info_page(list(channels))
+
+
+class TestBlockTable(unittest.TestCase):
+    def setUp(self):
+        self.table = BlockTable()
+        self.config = InstrumentConfig(
+            ConfigMother.create_config(
+                blocks=[ConfigMother.create_block("BLOCK_1"), ConfigMother.create_block("BLOCK_2")],
+                groups=[
+                    ConfigMother.create_group("GROUP_1", ["BLOCK_1"]),
+                    ConfigMother.create_group("GROUP_2", ["BLOCK_2"]),
+                ],
+            )
+        )
+
+    def _groups(self, *channels):
+        return self.table.groups(self.table.update(page(*channels)), self.config)
+
+    def test_GIVEN_page_WHEN_updated_THEN_blocks_created_from_channels(self):
+        blocks = self.table.update(page(ArchiveMother.create_channel("BLOCK_1", value="1.0")))
+
+        assert_that(list(blocks.keys()), is_(["BLOCK_1"]))
+        assert_that(blocks["BLOCK_1"].get_value(), is_("1.0"))
+
+    def test_GIVEN_page_without_channels_WHEN_updated_THEN_parse_error(self):
+        assert_that(calling(self.table.update).with_args({}), raises(BlocksParseError))
+
+    def test_GIVEN_unchanged_channel_WHEN_updated_again_THEN_same_block_with_rc_values_cleared(
+        self,
+    ):
+        channel = ArchiveMother.create_channel("BLOCK_1")
+        block = self.table.update(page(channel))["BLOCK_1"]
+        block.set_rc_low(1)
+        block.set_rc_enabled("YES")
+
+        result = self.table.update(page(channel))["BLOCK_1"]
+
+        assert_that(result, is_(same_instance(block)))
+        assert_that(result.get_rc_low(), is_(None))
+        assert_that(result.get_rc_enabled(), is_("NO"))
+
+    def test_GIVEN_changed_channel_WHEN_updated_again_THEN_new_block(self):
+        block = self.table.update(page(ArchiveMother.create_channel("BLOCK_1", value="1.0")))[
+            "BLOCK_1"
+        ]
+
+        result = self.table.update(page(ArchiveMother.create_channel("BLOCK_1", value="2.0")))[
+            "BLOCK_1"
+        ]
+
+        assert_that(result, is_not(same_instance(block)))
+        assert_that(result.get_value(), is_("2.0"))
+
+    def test_GIVEN_blocks_WHEN_groups_THEN_groups_contain_block_descriptions(self):
+        groups = self._groups(
+            ArchiveMother.create_channel("BLOCK_1", value="1.0"),
+            ArchiveMother.create_channel("BLOCK_2", value="2.0"),
+        )
+
+        assert_that(list(groups.keys()), is_(["GROUP_1", "GROUP_2"]))
+        assert_that(groups["GROUP_1"]["BLOCK_1"], has_entries(value="1.0"))
+        assert_that(groups["GROUP_2"]["BLOCK_2"], has_entries(value="2.0"))
+
+    def test_GIVEN_one_block_changes_WHEN_groups_THEN_only_it_described_and_other_group_shared(
+        self,
+    ):
+        first = self._groups(
+            ArchiveMother.create_channel("BLOCK_1", value="1.0"),
+            ArchiveMother.create_channel("BLOCK_2", value="2.0"),
+        )
+
+        second = self._groups(
+            ArchiveMother.create_channel("BLOCK_1", value="1.5"),
+            ArchiveMother.create_channel("BLOCK_2", value="2.0"),
+        )
+
+        assert_that(second["GROUP_1"]["BLOCK_1"], has_entries(value="1.5"))
+        assert_that(second["GROUP_1"], is_not(same_instance(first["GROUP_1"])))
+        assert_that(second["GROUP_2"], is_(same_instance(first["GROUP_2"])))
+
+    def test_GIVEN_rc_value_changes_WHEN_groups_THEN_block_described_again(self):
+        channel = ArchiveMother.create_channel("BLOCK_1")
+        first = self._groups(channel)
+        blocks = self.table.update(page(channel))
+        blocks["BLOCK_1"].set_rc_low(5)
+
+        groups = self.table.groups(blocks, self.config)
+
+        assert_that(
+            groups["GROUP_1"]["BLOCK_1"], is_not(same_instance(first["GROUP_1"]["BLOCK_1"]))
+        )
+        assert_that(groups["GROUP_1"]["BLOCK_1"], has_entries(rc_low=5))
+
+    def test_GIVEN_unchanged_block_WHEN_groups_THEN_same_description_reused(self):
+        channel = ArchiveMother.create_channel("BLOCK_1")
+        first = self._groups(channel)
+
+        groups = self._groups(channel)
+
+        assert_that(groups["GROUP_1"]["BLOCK_1"], is_(same_instance(first["GROUP_1"]["BLOCK_1"])))
+
+    def test_GIVEN_block_removed_from_page_WHEN_groups_THEN_removed_from_group(self):
+        self._groups(
+            ArchiveMother.create_channel("BLOCK_1"), ArchiveMother.create_channel("BLOCK_2")
+        )
+
+        groups = self._groups(ArchiveMother.create_channel("BLOCK_1"))
+
+        assert_that(groups["GROUP_2"], is_({}))
+
+
+class TestBlockTableGroups(unittest.TestCase):
+    def setUp(self):
+        self.table = BlockTable()
+        self.instrument_config = Mock()
+
+    def _blocks(self, *names):
+        return self.table.update(page(*[ArchiveMother.create_channel(name) for name in names]))
+
+    def test_GIVEN_instrument_config_with_no_groups_WHEN_groups_called_THEN_return_empty_dict(self):
+        self.instrument_config.groups = []
+
+        result = self.table.groups({}, self.instrument_config)
+
+        self.assertDictEqual(result, {})
+
+    def test_GIVEN_instrument_config_with_groups_and_no_blocks_WHEN_groups_called_THEN_return_group_without_blocks(
+        self,
+    ):
+        self.instrument_config.groups = [{"name": "test_group", "blocks": []}]
+
+        result = self.table.groups({}, self.instrument_config)
+
+        self.assertDictEqual(result, {"test_group": {}})
+
+    def test_GIVEN_instrument_config_with_3_known_groups_WHEN_groups_called_THEN_return_3_groups(
+        self,
+    ):
+        self.instrument_config.groups = [
+            {"name": "test_group_1", "blocks": []},
+            {"name": "test_group_2", "blocks": []},
+            {"name": "test_group_3", "blocks": []},
+        ]
+
+        result = self.table.groups({}, self.instrument_config)
+
+        self.assertEqual(len(result.keys()), 3)
+
+    def test_GIVEN_block_in_archive_blocks_and_not_instrument_config_WHEN_groups_called_THEN_return_no_blocks(
+        self,
+    ):
+        self.instrument_config.groups = []
+
+        result = self.table.groups(self._blocks("test_block"), self.instrument_config)
+
+        self.assertNotIn("test_block", result)
+
+    def test_GIVEN_block_in_instrument_config_and_not_archive_blocks_WHEN_groups_called_THEN_return_no_blocks(
+        self,
+    ):
+        self.instrument_config.groups = [{"name": "test_group", "blocks": ["test_block"]}]
+
+        result = self.table.groups({}, self.instrument_config)
+
+        self.assertNotIn("test_block", result["test_group"])
+
+    def test_GIVEN_block_in_both_instrument_config_and_archive_blocks_WHEN_groups_called_THEN_return_group_from_instrument_config_with_archive_blocks_data(
+        self,
+    ):
+        self.instrument_config.groups = [{"name": "test_group", "blocks": ["test_block"]}]
+
+        result = self.table.groups(self._blocks("test_block"), self.instrument_config)
+
+        self.assertIn("test_block", result["test_group"])
+
+    def test_GIVEN_ordered_groups_WHEN_groups_called_THEN_return_same_ordered_groups(self):
+        self.instrument_config.groups = [
+            {"name": "test_group_1", "blocks": []},
+            {"name": "test_group_2", "blocks": []},
+            {"name": "test_group_3", "blocks": []},
+        ]
+
+        result = self.table.groups({}, self.instrument_config)
+
+        self.assertListEqual(
+            list(result.keys()), [group["name"] for group in self.instrument_config.groups]
+        )
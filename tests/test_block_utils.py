@@ -12,7 +12,14 @@ import unittest
 from mock import MagicMock
 
 from block import Block
-from block_utils import format_block_value, format_blocks, set_rc_values_for_blocks, shorten_title
+from block_utils import (
+    TitleTable,
+    format_block_value,
+    format_blocks,
+    parse_rc_pv,
+    set_rc_values_for_blocks,
+    shorten_title,
+)
 
 
 class TestBlockUtils(unittest.TestCase):
@@ -639,5 +646,59 @@ class FormatBlockValueTests(unittest.TestCase):
         self.assertEqual(format_block_value(value, precision), value)
 
 
+class TitleTableTests(unittest.TestCase):
+    def test_GIVEN_title_WHEN_shortened_THEN_same_as_shorten_title(self):
+        title = "INST:CS:SB:BLOCK:RC:LOW.VAL"
+
+        self.assertEqual(TitleTable().shorten_title(title), shorten_title(title))
+
+    def test_GIVEN_title_shortened_WHEN_shortened_again_THEN_same_string_returned(self):
+        table = TitleTable()
+        first = table.shorten_title("INST:CS:SB:" + "BLOCK")
+
+        self.assertIs(table.shorten_title("INST:CS:SB:" + "BLOCK"), first)
+
+    def test_GIVEN_titles_in_different_tables_WHEN_shortened_THEN_names_are_interned(self):
+        self.assertIs(
+            TitleTable().shorten_title("INST:CS:SB:" + "BLOCK"),
+            TitleTable().shorten_title("OTHER:CS:SB:" + "BLOCK"),
+        )
+
+    def test_GIVEN_full_table_WHEN_title_shortened_THEN_least_recently_used_title_dropped(self):
+        table = TitleTable(size=2)
+        table.shorten_title("INST:CS:SB:A")
+        table.shorten_title("INST:CS:SB:B")
+        table.shorten_title("INST:CS:SB:A")
+
+        table.shorten_title("INST:CS:SB:C")
+
+        self.assertEqual(list(table._titles.keys()), ["INST:CS:SB:A", "INST:CS:SB:C"])
+
+    def test_GIVEN_titles_WHEN_cleared_THEN_table_is_empty(self):
+        table = TitleTable()
+        table.shorten_title("INST:CS:SB:A")
+        table.parse_rc_pv("A:RC:LOW.VAL")
+
+        table.clear()
+
+        self.assertEqual(len(table), 0)
+
+    def test_GIVEN_run_control_pv_WHEN_parsed_THEN_block_name_and_setter_returned(self):
+        self.assertEqual(TitleTable().parse_rc_pv("BLOCK:RC:HIGH.VAL"), ("BLOCK", "set_rc_high"))
+
+    def test_GIVEN_pv_which_is_not_a_run_control_setting_WHEN_parsed_THEN_no_setter_returned(self):
+        self.assertEqual(parse_rc_pv("BLOCK:RC:OTHER.VAL"), ("BLOCK", None))
+
+    def test_GIVEN_title_table_WHEN_set_rc_values_THEN_values_set(self):
+        block = Block("BLOCK", "", "", "", "")
+        rc_low = Block("BLOCK:RC:LOW.VAL", "", "5", "", "")
+        table = TitleTable()
+
+        set_rc_values_for_blocks({"BLOCK": block}, {"BLOCK:RC:LOW.VAL": rc_low}, table)
+        set_rc_values_for_blocks({"BLOCK": block}, {"BLOCK:RC:LOW.VAL": rc_low}, table)
+
+        self.assertEqual(block.get_rc_low(), "5")
+
+
 if __name__ == "__main__":
     unittest.main()
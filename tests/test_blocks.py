@@ -49,6 +49,29 @@ class TestBlock(unittest.TestCase):
         # Assert
         self.assertEqual(test_block.get_rc_enabled(), "YES")
 
+    def test_block_has_no_instance_dictionary(self):
+        # Arrange
+        test_block = Block("TEST", "", "", "", "")
+
+        # Act and Assert
+        self.assertFalse(hasattr(test_block, "__dict__"))
+        with self.assertRaises(AttributeError):
+            test_block.unknown = 1
+
+    def test_can_clear_rc_values_on_a_block(self):
+        # Arrange
+        test_block = Block("TEST", "", "", "", "")
+        test_block.set_rc_low(10)
+        test_block.set_rc_enabled("YES")
+
+        # Act
+        test_block.clear_rc_values()
+
+        # Assert
+        self.assertEqual(
+            test_block.description_key(), Block("TEST", "", "", "", "").description_key()
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+
+from CaChannel import CaChannelException
+from hamcrest import *
+
+from external_webpage.channel_access import (
+    EVICTION_INTERVAL,
+    IDLE_TIMEOUT,
+    ChannelCache,
+    FakeChannelAccess,
+    PvMonitor,
+)
+
+PV = "TE:NDW1798:CS:PV"
+
+
+class TestPvMonitor(unittest.TestCase):
+    def setUp(self):
+        self.channel_access = FakeChannelAccess()
+
+    def test_GIVEN_pv_with_value_WHEN_monitored_THEN_value_returned(self):
+        self.channel_access.set_value(PV, "value")
+
+        monitor = PvMonitor(PV, self.channel_access)
+
+        assert_that(monitor.connected, is_(True))
+        assert_that(monitor.get(), is_("value"))
+
+    def test_GIVEN_pv_not_connected_WHEN_get_THEN_exception(self):
+        monitor = PvMonitor(PV, self.channel_access)
+
+        assert_that(monitor.connected, is_(False))
+        assert_that(calling(monitor.get), raises(CaChannelException))
+
+    def test_GIVEN_pv_not_connected_WHEN_get_with_timeout_THEN_exception_after_timeout(self):
+        monitor = PvMonitor(PV, self.channel_access)
+
+        assert_that(calling(monitor.get).with_args(0.01), raises(CaChannelException))
+
+    def test_GIVEN_monitored_pv_WHEN_value_changes_THEN_new_value_returned_and_listener_called(
+        self,
+    ):
+        self.channel_access.set_value(PV, "first")
+        monitor = PvMonitor(PV, self.channel_access)
+        values = []
+        monitor.add_listener(values.append)
+
+        self.channel_access.set_value(PV, "second")
+
+        assert_that(monitor.get(), is_("second"))
+        assert_that(values, is_(["second"]))
+
+    def test_GIVEN_monitored_pv_WHEN_disconnected_THEN_get_raises_until_reconnected(self):
+        self.channel_access.set_value(PV, "first")
+        monitor = PvMonitor(PV, self.channel_access)
+
+        self.channel_access.disconnect(PV)
+        assert_that(calling(monitor.get), raises(CaChannelException))
+
+        self.channel_access.set_value(PV, "second")
+        assert_that(monitor.get(), is_("second"))
+
+    def test_GIVEN_listener_raises_WHEN_value_changes_THEN_other_listeners_called(self):
+        monitor = PvMonitor(PV, self.channel_access)
+        values = []
+
+        def failing_listener(value):
+            raise ValueError("listener failed")
+
+        monitor.add_listener(failing_listener)
+        monitor.add_listener(values.append)
+
+        self.channel_access.set_value(PV, "value")
+
+        assert_that(values, is_(["value"]))
+
+    def test_GIVEN_monitor_WHEN_closed_THEN_subscription_removed(self):
+        monitor = PvMonitor(PV, self.channel_access)
+
+        monitor.close()
+
+        assert_that(self.channel_access.subscriptions(PV), is_(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestChannelCache(unittest.TestCase):
+    def setUp(self):
+        self.channel_access = FakeChannelAccess()
+        self.now = 0
+        self.cache = ChannelCache(self.channel_access, clock=lambda: self.now)
+
+    def test_GIVEN_pv_WHEN_read_twice_THEN_subscribed_once_with_one_miss_and_one_hit(self):
+        self.channel_access.set_value(PV, "value")
+
+        self.cache.get(PV)
+        result = self.cache.get(PV)
+
+        assert_that(result, is_("value"))
+        assert_that(self.channel_access.subscribe_count, is_(1))
+        assert_that(self.cache.statistics(), has_entries({"hits": 1, "misses": 1, "channels": 1}))
+
+    def test_GIVEN_pv_read_recently_WHEN_another_pv_read_after_eviction_interval_THEN_pv_kept(self):
+        self.channel_access.set_value(PV, "value")
+        self.cache.get(PV)
+
+        self.now = EVICTION_INTERVAL
+        self.cache.monitor("OTHER")
+
+        assert_that(self.channel_access.subscriptions(PV), is_(1))
+        assert_that(self.cache.statistics(), has_entries({"evictions": 0, "channels": 2}))
+
+    def test_GIVEN_pv_not_read_for_idle_timeout_WHEN_another_pv_read_THEN_pv_closed(self):
+        self.channel_access.set_value(PV, "value")
+        self.cache.get(PV)
+
+        self.now = IDLE_TIMEOUT + EVICTION_INTERVAL
+        self.cache.monitor("OTHER")
+
+        assert_that(self.channel_access.subscriptions(PV), is_(0))
+        assert_that(self.cache.statistics(), has_entries({"evictions": 1, "channels": 1}))
+
+    def test_GIVEN_pv_with_listener_not_read_for_idle_timeout_WHEN_another_pv_read_THEN_pv_kept(
+        self,
+    ):
+        self.channel_access.set_value(PV, "value")
+        self.cache.add_listener(PV, lambda value: None)
+
+        self.now = IDLE_TIMEOUT + EVICTION_INTERVAL
+        self.cache.monitor("OTHER")
+
+        assert_that(self.channel_access.subscriptions(PV), is_(1))
+        assert_that(self.cache.statistics(), has_entries({"evictions": 0}))
+
+    def test_GIVEN_pv_connects_WHEN_statistics_THEN_connection_and_latency_recorded(self):
+        self.channel_access.set_value(PV, "value")
+
+        self.cache.get(PV)
+
+        assert_that(
+            self.cache.statistics(),
+            has_entries(
+                {
+                    "connections": 1,
+                    "connected_channels": 1,
+                    "mean_connect_latency": greater_than_or_equal_to(0),
+                    "max_connect_latency": greater_than_or_equal_to(0),
+                }
+            ),
+        )
+
+    def test_GIVEN_pv_not_connected_WHEN_statistics_THEN_no_connections_recorded(self):
+        monitor, existing = self.cache.monitor(PV)
+
+        assert_that(existing, is_(False))
+        assert_that(monitor.connected, is_(False))
+        assert_that(
+            self.cache.statistics(),
+            has_entries({"connections": 0, "connected_channels": 0, "mean_connect_latency": None}),
+        )
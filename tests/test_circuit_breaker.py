@@ -0,0 +1,242 @@
+import json
+import socket
+import unittest
+
+from hamcrest import *
+
+from external_webpage.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    TRIAL_TIMEOUT,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    HostUnreachableError,
+    TrialInProgressError,
+    tcp_probe,
+)
+from external_webpage.instrument_scapper import ScrapeReporter
+from external_webpage.snapshot_store import SnapshotStore
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.probe_result = True
+        self.probed = []
+        self.random = 1
+        self.breaker = CircuitBreaker(
+            "HOST",
+            failure_threshold=3,
+            initial_backoff=10,
+            max_backoff=100,
+            probe=self._probe,
+            random_fn=lambda: self.random,
+            clock=lambda: self.now,
+        )
+        self.now = 0
+        self.scrapes = 0
+
+    def _probe(self, host):
+        self.probed.append(host)
+        return self.probe_result
+
+    def _scrape(self):
+        self.scrapes += 1
+        return "data"
+
+    def _fail(self, times):
+        return [self.breaker.record_failure() for _ in range(times)]
+
+    def test_GIVEN_closed_breaker_WHEN_called_THEN_scraped_without_probe(self):
+        result = self.breaker.call(self._scrape)
+
+        assert_that(result, is_("data"))
+        assert_that(self.probed, is_(empty()))
+        assert_that(self.breaker.state, is_(CLOSED))
+
+    def test_GIVEN_failures_below_threshold_WHEN_recorded_THEN_breaker_stays_closed(self):
+        self._fail(2)
+
+        assert_that(self.breaker.state, is_(CLOSED))
+
+    def test_GIVEN_failures_reach_threshold_WHEN_recorded_THEN_breaker_opens(self):
+        self._fail(3)
+
+        assert_that(self.breaker.state, is_(OPEN))
+
+    def test_GIVEN_repeated_failures_WHEN_recorded_THEN_wait_doubles_up_to_maximum(self):
+        waits = self._fail(6)
+
+        assert_that(waits, is_([10, 20, 40, 80, 100, 100]))
+
+    def test_GIVEN_jitter_WHEN_failure_recorded_THEN_wait_is_between_half_and_whole_backoff(self):
+        self.random = 0
+
+        waits = self._fail(2)
+
+        assert_that(waits, is_([5, 10]))
+
+    def test_GIVEN_open_breaker_and_host_not_accepting_connections_WHEN_called_THEN_unreachable_without_scrape(
+        self,
+    ):
+        self._fail(3)
+        self.probe_result = False
+
+        assert_that(
+            calling(self.breaker.call).with_args(self._scrape), raises(HostUnreachableError)
+        )
+        assert_that(self.scrapes, is_(0))
+        assert_that(self.breaker.state, is_(OPEN))
+
+    def test_GIVEN_open_breaker_and_host_accepting_connections_WHEN_called_THEN_half_open_and_scraped(
+        self,
+    ):
+        self._fail(3)
+
+        self.breaker.call(self._scrape)
+
+        assert_that(self.probed, is_(["HOST"]))
+        assert_that(self.scrapes, is_(1))
+        assert_that(self.breaker.state, is_(HALF_OPEN))
+
+    def test_GIVEN_half_open_breaker_WHEN_success_recorded_THEN_closed_and_backoff_reset(self):
+        self._fail(3)
+        self.breaker.call(self._scrape)
+
+        self.breaker.record_success()
+
+        assert_that(self.breaker.state, is_(CLOSED))
+        assert_that(self.breaker.record_failure(), is_(10))
+
+    def test_GIVEN_half_open_breaker_WHEN_failure_recorded_THEN_open_again(self):
+        self._fail(3)
+        self.breaker.call(self._scrape)
+
+        self.breaker.record_failure()
+
+        assert_that(self.breaker.state, is_(OPEN))
+
+    def test_GIVEN_trial_in_progress_WHEN_called_by_another_scrapper_THEN_skipped_without_probe_or_scrape(
+        self,
+    ):
+        self._fail(3)
+        self.breaker.call(self._scrape)
+
+        assert_that(
+            calling(self.breaker.call).with_args(self._scrape), raises(TrialInProgressError)
+        )
+        assert_that(self.probed, is_(["HOST"]))
+        assert_that(self.scrapes, is_(1))
+
+    def test_GIVEN_trial_succeeded_WHEN_called_THEN_scraped_without_probe(self):
+        self._fail(3)
+        self.breaker.call(self._scrape)
+        self.breaker.record_success()
+
+        self.breaker.call(self._scrape)
+
+        assert_that(self.probed, is_(["HOST"]))
+        assert_that(self.scrapes, is_(2))
+
+    def test_GIVEN_trial_probe_failed_WHEN_called_again_THEN_new_trial_made(self):
+        self._fail(3)
+        self.probe_result = False
+        assert_that(
+            calling(self.breaker.call).with_args(self._scrape), raises(HostUnreachableError)
+        )
+        self.probe_result = True
+
+        self.breaker.call(self._scrape)
+
+        assert_that(self.probed, is_(["HOST", "HOST"]))
+        assert_that(self.scrapes, is_(1))
+
+    def test_GIVEN_trial_outcome_never_recorded_WHEN_called_after_trial_timeout_THEN_new_trial_made(
+        self,
+    ):
+        self._fail(3)
+        self.breaker.call(self._scrape)
+        self.now = TRIAL_TIMEOUT
+
+        self.breaker.call(self._scrape)
+
+        assert_that(self.scrapes, is_(2))
+
+    def test_GIVEN_failures_WHEN_retry_wait_THEN_current_backoff_without_counting_failure(self):
+        self._fail(3)
+
+        wait = self.breaker.retry_wait()
+
+        assert_that(wait, is_(40))
+        assert_that(self.breaker.record_failure(), is_(80))
+
+
+class TestCircuitBreakerDefaults(unittest.TestCase):
+    def test_GIVEN_default_backoff_and_least_jitter_WHEN_first_failure_recorded_THEN_wait_at_least_a_minute(
+        self,
+    ):
+        breaker = CircuitBreaker("HOST", random_fn=lambda: 0)
+
+        assert_that(breaker.record_failure(), greater_than_or_equal_to(60))
+
+
+class TestCircuitBreakerRegistry(unittest.TestCase):
+    def test_GIVEN_registry_WHEN_breaker_for_same_host_twice_THEN_same_breaker(self):
+        registry = CircuitBreakerRegistry()
+
+        assert_that(registry.for_host("HOST"), is_(same_instance(registry.for_host("HOST"))))
+        assert_that(registry.for_host("HOST"), is_not(same_instance(registry.for_host("OTHER"))))
+
+
+class TestTcpProbe(unittest.TestCase):
+    def test_GIVEN_listening_port_WHEN_probed_THEN_true(self):
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        try:
+            assert_that(tcp_probe("127.0.0.1", server.getsockname()[1], 1), is_(True))
+        finally:
+            server.close()
+
+    def test_GIVEN_closed_port_WHEN_probed_THEN_false(self):
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        port = server.getsockname()[1]
+        server.close()
+
+        assert_that(tcp_probe("127.0.0.1", port, 1), is_(False))
+
+
+class TestScrapeReporterCircuitBreaker(unittest.TestCase):
+    def test_GIVEN_failures_reach_threshold_WHEN_failed_THEN_summary_shows_breaker_open(self):
+        store = SnapshotStore()
+        breaker = CircuitBreaker("HOST", failure_threshold=2, probe=lambda host: False)
+        reporter = ScrapeReporter("TEST_INST", "HOST", store, breaker=breaker)
+
+        for _ in range(2):
+            reporter.failed(IOError("unreachable"))
+
+        summary = json.loads(store.summary.instruments_json())
+        assert_that(summary["TEST_INST"], has_entries(breaker=OPEN))
+
+    def test_GIVEN_trial_in_progress_WHEN_failed_THEN_failure_not_counted(self):
+        breaker = CircuitBreaker("HOST", failure_threshold=1, probe=lambda host: True)
+        reporter = ScrapeReporter("TEST_INST", "HOST", SnapshotStore(), breaker=breaker)
+        reporter.failed(IOError("unreachable"))
+        breaker.call(lambda: None)
+
+        reporter.failed(TrialInProgressError("being tried"))
+
+        assert_that(breaker.state, is_(HALF_OPEN))
+        assert_that(breaker._failures, is_(1))
+
+    def test_GIVEN_open_breaker_WHEN_succeeded_THEN_summary_shows_breaker_closed(self):
+        store = SnapshotStore()
+        breaker = CircuitBreaker("HOST", failure_threshold=1)
+        reporter = ScrapeReporter("TEST_INST", "HOST", store, breaker=breaker)
+        reporter.failed(IOError("unreachable"))
+
+        reporter.succeeded({"inst_pvs": {}})
+
+        summary = json.loads(store.summary.instruments_json())
+        assert_that(summary["TEST_INST"], has_entries(breaker=CLOSED))
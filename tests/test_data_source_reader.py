@@ -1,11 +1,21 @@
 import binascii
 import unittest
 import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
 
 from hamcrest import *
 from mock import MagicMock, patch
 
-from external_webpage.data_source_reader import DataSourceReader
+from external_webpage.channel_access import ChannelCache, FakeChannelAccess
+from external_webpage.data_source_reader import (
+    CONFIG_PV,
+    URL_CONNECT_TIMEOUT,
+    DataSourceReader,
+    connection_statistics,
+)
+
+CONFIG_PV_NAME = "PREFIX" + CONFIG_PV
 
 
 def patch_page_contents(request_response, json):
@@ -32,12 +42,17 @@ def compress_and_hex(value):
 
 class TestDataSourceReader(unittest.TestCase):
     def setUp(self):
-        self.reader = DataSourceReader("HOST", "PREFIX")
+        self.channel_access = FakeChannelAccess()
+        self.reader = DataSourceReader(
+            "HOST", "PREFIX", channel_cache=ChannelCache(self.channel_access)
+        )
+        connect_timeout = patch("external_webpage.channel_access.CONNECT_TIMEOUT", 0)
+        connect_timeout.start()
+        self.addCleanup(connect_timeout.stop)
 
-    @patch("requests.get")
-    @patch("external_webpage.data_source_reader.caget")
+    @patch("requests.Session.get")
     def test_GIVEN_JSON_with_single_quotes_WHEN_read_THEN_conversion_successful(
-        self, caget, request_response
+        self, request_response
     ):
         patch_page_contents(request_response, b"{'data': 'some_data'}")
 
@@ -45,47 +60,203 @@ class TestDataSourceReader(unittest.TestCase):
 
         assert_that(json_object, is_({"data": "some_data"}))
 
-    @patch("requests.get")
-    @patch("external_webpage.data_source_reader.caget")
-    def test_GIVEN_JSON_with_None_WHEN_read_THEN_conversion_successful(
-        self, caget, request_response
-    ):
+    @patch("requests.Session.get")
+    def test_GIVEN_JSON_with_None_WHEN_read_THEN_conversion_successful(self, request_response):
         patch_page_contents(request_response, b'{"data": None}')
 
         json_object = self.reader.read_config()
 
         assert_that(json_object, is_({"data": None}))
 
-    @patch("requests.get")
-    @patch("external_webpage.data_source_reader.caget")
-    def test_GIVEN_JSON_with_True_WHEN_read_THEN_conversion_successful(
-        self, caget, request_response
-    ):
+    @patch("requests.Session.get")
+    def test_GIVEN_JSON_with_True_WHEN_read_THEN_conversion_successful(self, request_response):
         patch_page_contents(request_response, b'{"data": True}')
 
         json_object = self.reader.read_config()
 
         assert_that(json_object, is_({"data": True}))
 
-    @patch("requests.get")
-    @patch("external_webpage.data_source_reader.caget")
-    def test_GIVEN_JSON_with_False_WHEN_read_THEN_conversion_successful(
-        self, caget, request_response
-    ):
+    @patch("requests.Session.get")
+    def test_GIVEN_JSON_with_False_WHEN_read_THEN_conversion_successful(self, request_response):
         patch_page_contents(request_response, b'{"data": False}')
 
         json_object = self.reader.read_config()
 
         assert_that(json_object, is_({"data": False}))
 
-    @patch("requests.get")
-    @patch("external_webpage.data_source_reader.caget")
-    def test_GIVEN_valid_config_from_caget_WHEN_read_THEN_webserver_is_not_tried(
-        self, caget, request_response
+    @patch("requests.Session.get")
+    def test_GIVEN_valid_config_from_channel_access_WHEN_read_THEN_webserver_is_not_tried(
+        self, request_response
     ):
-        caget.return_value = compress_and_hex('{"data": false}')
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": false}'))
 
         json_object = self.reader.read_config()
 
         assert_that(json_object, is_({"data": False}))
         request_response.assert_not_called()
+
+    @patch("requests.Session.get")
+    def test_GIVEN_unchanged_config_from_channel_access_WHEN_read_twice_THEN_same_config_returned_without_decoding(
+        self, request_response
+    ):
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": false}'))
+        first = self.reader.read_config()
+
+        with patch("external_webpage.data_source_reader.dehex_and_decompress") as decompress:
+            second = self.reader.read_config()
+
+        assert_that(second, is_(same_instance(first)))
+        decompress.assert_not_called()
+
+    @patch("requests.Session.get")
+    def test_GIVEN_changed_config_from_channel_access_WHEN_read_THEN_new_config_returned(
+        self, request_response
+    ):
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": false}'))
+        self.reader.read_config()
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": true}'))
+
+        json_object = self.reader.read_config()
+
+        assert_that(json_object, is_({"data": True}))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_unchanged_config_from_webserver_WHEN_read_twice_THEN_same_config_returned(
+        self, request_response
+    ):
+        patch_page_contents(request_response, b"{'data': 'some_data'}")
+
+        first = self.reader.read_config()
+        second = self.reader.read_config()
+
+        assert_that(second, is_(same_instance(first)))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_config_read_several_times_WHEN_read_THEN_channel_subscribed_to_once(
+        self, request_response
+    ):
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": false}'))
+
+        for _ in range(3):
+            self.reader.read_config()
+
+        assert_that(self.channel_access.subscribe_count, is_(1))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_config_channel_disconnects_WHEN_read_THEN_webserver_is_used(
+        self, request_response
+    ):
+        self.channel_access.set_value(CONFIG_PV_NAME, compress_and_hex('{"data": false}'))
+        self.reader.read_config()
+        self.channel_access.disconnect(CONFIG_PV_NAME)
+        patch_page_contents(request_response, b"{'data': 'from webserver'}")
+
+        json_object = self.reader.read_config()
+
+        assert_that(json_object, is_({"data": "from webserver"}))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_same_archiver_page_WHEN_read_twice_THEN_same_json_object_returned(
+        self, request_response
+    ):
+        patch_page_contents(request_response, b'{"Channels": []}')
+
+        first = self.reader.get_json_from_blocks_archive()
+        second = self.reader.get_json_from_blocks_archive()
+
+        assert_that(second, is_({"Channels": []}))
+        assert_that(second, is_(same_instance(first)))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_archiver_page_changes_WHEN_read_THEN_new_json_returned(self, request_response):
+        patch_page_contents(request_response, b'{"Channels": []}')
+        self.reader.get_json_from_blocks_archive()
+        patch_page_contents(request_response, b'{"Channels": [{"Name": "BLOCK"}]}')
+
+        result = self.reader.get_json_from_blocks_archive()
+
+        assert_that(result, is_({"Channels": [{"Name": "BLOCK"}]}))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_same_content_on_different_archiver_groups_WHEN_read_THEN_each_group_cached_separately(
+        self, request_response
+    ):
+        patch_page_contents(request_response, b'{"Channels": []}')
+        blocks = self.reader.get_json_from_blocks_archive()
+
+        patch_page_contents(request_response, b'{"Channels": [{"Name": "BLOCK"}]}')
+        self.reader.get_json_from_dataweb_archive()
+        patch_page_contents(request_response, b'{"Channels": []}')
+
+        assert_that(self.reader.get_json_from_blocks_archive(), is_(same_instance(blocks)))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_archiver_page_WHEN_read_THEN_short_connect_timeout_used(self, request_response):
+        patch_page_contents(request_response, b'{"Channels": []}')
+
+        self.reader.get_json_from_blocks_archive()
+
+        connect_timeout, _ = request_response.call_args[1]["timeout"]
+        assert_that(connect_timeout, is_(URL_CONNECT_TIMEOUT))
+
+    @patch("requests.Session.get")
+    def test_GIVEN_config_from_webserver_WHEN_read_THEN_short_connect_timeout_used(
+        self, request_response
+    ):
+        patch_page_contents(request_response, b'{"data": "from webserver"}')
+
+        self.reader.read_config()
+
+        connect_timeout, _ = request_response.call_args[1]["timeout"]
+        assert_that(connect_timeout, is_(URL_CONNECT_TIMEOUT))
+
+
+class ArchiverPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"Channels": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDataSourceReaderConnections(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), ArchiverPageHandler)
+        self.port = self.server.server_address[1]
+        Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.reader = DataSourceReader("127.0.0.1", "PREFIX")
+
+    def tearDown(self):
+        self.reader.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_GIVEN_new_reader_WHEN_connection_statistics_THEN_no_requests_and_no_reuse_rate(self):
+        assert_that(
+            self.reader.connection_statistics(),
+            is_({"requests": 0, "connections": 0, "reuse_rate": None}),
+        )
+
+    def test_GIVEN_several_pages_read_WHEN_connection_statistics_THEN_connection_reused(self):
+        for group in ["BLOCKS", "DATAWEB", "BLOCKS"]:
+            self.reader._get_json_from_info_page(self.port, group)
+
+        statistics = self.reader.connection_statistics()
+
+        assert_that(statistics["requests"], is_(3))
+        assert_that(statistics["connections"], is_(1))
+        assert_that(statistics["reuse_rate"], close_to(2 / 3.0, 0.001))
+
+    def test_GIVEN_pages_read_WHEN_all_connection_statistics_THEN_reader_requests_included(self):
+        before = connection_statistics()["requests"]
+
+        self.reader._get_json_from_info_page(self.port, "INST")
+
+        assert_that(connection_statistics()["requests"], greater_than_or_equal_to(before + 1))
@@ -6,7 +6,11 @@ from builtins import zip
 from hamcrest import *
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from external_webpage.web_page_parser import BlocksParseError, WebPageParser
+from external_webpage.web_page_parser import (
+    BlocksParseError,
+    WebPageParser,
+    decode_fake_unicode,
+)
 from tests.data_mother import ArchiveMother
 
 
@@ -230,5 +234,26 @@ class TestBlocksFromJSON(unittest.TestCase):
         assert_that(result[expected_name].get_description()["value"], is_(expected_value))
 
 
+class TestDecodeFakeUnicode(unittest.TestCase):
+    def test_GIVEN_value_without_backslash_WHEN_decoded_THEN_same_value_returned(self):
+        value = "1.0 2.0 3.0"
+
+        assert_that(decode_fake_unicode(value), is_(same_instance(value)))
+
+    def test_GIVEN_backslash_which_is_not_an_escape_WHEN_decoded_THEN_value_unchanged(self):
+        assert_that(decode_fake_unicode("C:\\data\\u12"), is_("C:\\data\\u12"))
+
+    def test_GIVEN_many_escaped_runs_WHEN_decoded_THEN_every_run_replaced(self):
+        value = "\\u-062\\u-075 " * 500
+
+        assert_that(decode_fake_unicode(value), is_("\u00b5 " * 500))
+
+    def test_GIVEN_escape_which_is_not_a_byte_WHEN_decoded_THEN_value_error(self):
+        assert_that(calling(decode_fake_unicode).with_args("\\u0300"), raises(ValueError))
+
+    def test_GIVEN_escapes_which_are_not_utf8_WHEN_decoded_THEN_value_error(self):
+        assert_that(calling(decode_fake_unicode).with_args("\\u-062"), raises(ValueError))
+
+
 if __name__ == "__main__":
     unittest.main()
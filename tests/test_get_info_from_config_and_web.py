@@ -1,6 +1,9 @@
 import os
 import sys
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
 
 from hamcrest import *
 from mock import Mock
@@ -9,6 +12,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from external_webpage.instrument_information_collator import InstrumentInformationCollator
 from tests.data_mother import ArchiveMother, ConfigMother
 
+TIMEOUT = 5
+
 
 class TestGetInfoFromConfigAndWeb(unittest.TestCase):
     def setUp(self):
@@ -22,6 +27,141 @@ class TestGetInfoFromConfigAndWeb(unittest.TestCase):
         self.reader.read_config = Mock(return_value=config)
 
         self.scraper = InstrumentInformationCollator("host", "prefix", reader=self.reader)
+        self.fetch_executor = ThreadPoolExecutor(max_workers=3)
+
+    def tearDown(self):
+        self.fetch_executor.shutdown(wait=True)
+
+    def test_GIVEN_slow_archiver_pages_WHEN_parse_THEN_pages_fetched_concurrently(self):
+        page_info = ArchiveMother.create_info_page([])
+
+        def slow_page():
+            time.sleep(0.2)
+            return page_info
+
+        self.reader.get_json_from_blocks_archive = Mock(side_effect=slow_page)
+        self.reader.get_json_from_dataweb_archive = Mock(side_effect=slow_page)
+        self.reader.get_json_from_instrument_archive = Mock(side_effect=slow_page)
+
+        scraper = InstrumentInformationCollator(
+            "host", "prefix", reader=self.reader, fetch_executor=self.fetch_executor
+        )
+
+        start = time.monotonic()
+        result = scraper.collate()
+
+        assert_that(time.monotonic() - start, less_than(0.5))
+        assert_that(result["error_statuses"], is_([]))
+
+    def test_GIVEN_instrument_archive_fails_WHEN_parse_THEN_error_status_and_blocks_still_read(
+        self,
+    ):
+        self.reader.get_json_from_blocks_archive = Mock(
+            return_value=ArchiveMother.create_info_page(
+                [ArchiveMother.create_channel(name="BLOCK", value="1.0")]
+            )
+        )
+        self.reader.read_config = Mock(
+            return_value=ConfigMother.create_config(
+                blocks=[ConfigMother.create_block("BLOCK")],
+                groups=[ConfigMother.create_group("GROUP", ["BLOCK"])],
+            )
+        )
+        self.reader.get_json_from_instrument_archive = Mock(side_effect=IOError("no archiver"))
+
+        result = self.scraper.collate()
+
+        assert_that(result["error_statuses"], is_(["Failed to read instrument archiver"]))
+        assert_that(result["groups"]["GROUP"], has_key("BLOCK"))
+        assert_that(result["inst_pvs"], is_({}))
+
+    def test_GIVEN_blocks_archive_fails_WHEN_parse_THEN_error_status_and_instrument_pvs_still_read(
+        self,
+    ):
+        self.reader.get_json_from_dataweb_archive = Mock(side_effect=IOError("no archiver"))
+        self.reader.get_json_from_instrument_archive = Mock(
+            return_value=ArchiveMother.create_info_page(
+                [ArchiveMother.create_channel(name="DAE:RUNSTATE.VAL", value="SETUP")]
+            )
+        )
+
+        result = self.scraper.collate()
+
+        assert_that(result["error_statuses"], is_(["Failed to read block archiver"]))
+        assert_that(result["inst_pvs"], has_key("RUNSTATE"))
+
+    def test_GIVEN_config_can_not_be_read_WHEN_parse_THEN_error_raised(self):
+        self.reader.read_config = Mock(side_effect=IOError("no block server"))
+
+        assert_that(calling(self.scraper.collate), raises(IOError))
+
+    def test_GIVEN_config_can_not_be_read_WHEN_parse_THEN_error_raised_without_waiting_for_pages(
+        self,
+    ):
+        release = Event()
+
+        def stalled_page():
+            release.wait(TIMEOUT)
+            return ArchiveMother.create_info_page([])
+
+        self.reader.get_json_from_blocks_archive = Mock(side_effect=stalled_page)
+        self.reader.get_json_from_dataweb_archive = Mock(side_effect=stalled_page)
+        self.reader.get_json_from_instrument_archive = Mock(side_effect=stalled_page)
+        self.reader.read_config = Mock(side_effect=IOError("no block server"))
+        fetch_executor = ThreadPoolExecutor(max_workers=1)
+        scraper = InstrumentInformationCollator(
+            "host", "prefix", reader=self.reader, fetch_executor=fetch_executor
+        )
+
+        start = time.monotonic()
+        assert_that(calling(scraper.collate), raises(IOError))
+        elapsed = time.monotonic() - start
+        release.set()
+        fetch_executor.shutdown(wait=True)
+
+        assert_that(elapsed, less_than(1))
+        # Only the fetch already running when the configuration failed is made
+        assert_that(self.reader.get_json_from_instrument_archive.called, is_(False))
+
+    def test_GIVEN_no_fetch_pool_and_config_can_not_be_read_WHEN_parse_THEN_pages_not_fetched(
+        self,
+    ):
+        self.reader.read_config = Mock(side_effect=IOError("no block server"))
+
+        assert_that(calling(self.scraper.collate), raises(IOError))
+        assert_that(self.reader.get_json_from_blocks_archive.called, is_(False))
+
+    def test_GIVEN_collator_WHEN_closed_THEN_reader_closed(self):
+        self.scraper.close()
+
+        self.reader.close.assert_called_once_with()
+
+    def test_GIVEN_unchanged_config_WHEN_parse_twice_THEN_instrument_config_reused(self):
+        self.scraper.collate()
+        first = self.scraper._instrument_config
+
+        self.scraper.collate()
+
+        assert_that(self.scraper._instrument_config, is_(same_instance(first)))
+
+    def test_GIVEN_changed_config_WHEN_parse_THEN_new_config_used(self):
+        self.scraper.collate()
+        self.reader.read_config = Mock(return_value=ConfigMother.create_config(name="new_config"))
+
+        result = self.scraper.collate()
+
+        assert_that(result["config_name"], is_("new_config"))
+
+    def test_GIVEN_changed_config_WHEN_parse_THEN_title_table_cleared(self):
+        self.scraper.collate()
+        self.scraper.web_page_parser.titles.shorten_title("INST:CS:SB:REMOVED_BLOCK")
+        self.reader.read_config = Mock(return_value=ConfigMother.create_config(name="new_config"))
+
+        self.scraper.collate()
+
+        assert_that(
+            self.scraper.web_page_parser.titles._titles, is_not(has_key("INST:CS:SB:REMOVED_BLOCK"))
+        )
 
     def test_GIVEN_no_blocks_WHEN_parse_THEN_normal_value_returned(self):
         expected_config_name = "test_config"
@@ -172,6 +312,61 @@ class TestGetInfoFromConfigAndWeb(unittest.TestCase):
 
         assert_that(result["inst_pvs"]["TITLE"]["value"], is_(title_value))
 
+    def test_GIVEN_unchanged_archiver_pages_WHEN_parse_twice_THEN_groups_and_inst_pvs_reused(self):
+        first = self.scraper.collate()
+        self.scraper.web_page_parser = Mock()
+
+        second = self.scraper.collate()
+
+        self.scraper.web_page_parser.extract_blocks.assert_not_called()
+        assert_that(second["groups"], is_(same_instance(first["groups"])))
+        assert_that(second["inst_pvs"], is_(same_instance(first["inst_pvs"])))
+
+    def test_GIVEN_blocks_page_changes_WHEN_parse_THEN_groups_rebuilt_and_inst_pvs_reused(self):
+        config = ConfigMother.create_config(
+            blocks=[ConfigMother.create_block("BLOCK")],
+            groups=[ConfigMother.create_group("GROUP", ["BLOCK"])],
+        )
+        self.reader.read_config = Mock(return_value=config)
+        first = self.scraper.collate()
+        self.reader.get_json_from_blocks_archive = Mock(
+            return_value=ArchiveMother.create_info_page(
+                [ArchiveMother.create_channel(name="BLOCK", value="2.0")]
+            )
+        )
+
+        second = self.scraper.collate()
+
+        assert_that(first["groups"]["GROUP"], is_({}))
+        assert_that(second["groups"]["GROUP"]["BLOCK"]["value"], is_("2.0"))
+        assert_that(second["inst_pvs"], is_(same_instance(first["inst_pvs"])))
+
+    def test_GIVEN_block_archive_failed_WHEN_parse_again_with_earlier_page_THEN_groups_rebuilt(
+        self,
+    ):
+        self.reader.read_config = Mock(
+            return_value=ConfigMother.create_config(
+                blocks=[ConfigMother.create_block("BLOCK")],
+                groups=[ConfigMother.create_group("GROUP", ["BLOCK"])],
+            )
+        )
+        blocks_page = Mock(
+            return_value=ArchiveMother.create_info_page(
+                [ArchiveMother.create_channel(name="BLOCK", value="1.0")]
+            )
+        )
+        self.reader.get_json_from_blocks_archive = blocks_page
+        self.scraper.collate()
+        self.reader.get_json_from_blocks_archive = Mock(side_effect=IOError("no archiver"))
+        failed = self.scraper.collate()
+        self.reader.get_json_from_blocks_archive = blocks_page
+
+        result = self.scraper.collate()
+
+        assert_that(failed["groups"]["GROUP"], is_({}))
+        assert_that(result["error_statuses"], is_([]))
+        assert_that(result["groups"]["GROUP"], has_key("BLOCK"))
+
     def test_GIVEN_visible_block_WHEN_parse_THEN_block_is_marked_as_visible(self):
         block_name = "block"
         group_name = "group1"
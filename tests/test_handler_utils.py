@@ -4,12 +4,14 @@ import unittest
 from hamcrest import *
 
 from external_webpage.request_handler_utils import (
-    get_detailed_state_of_specific_instrument,
+    get_clock_offset,
     get_instrument_and_callback,
     get_instrument_time_since_epoch,
-    get_summary_details_of_all_instruments,
-    set_time_shift,
+    get_since_generation,
+    get_snapshot_of_specific_instrument,
+    get_time_shift,
 )
+from external_webpage.snapshot_store import SnapshotStore
 
 CALLBACK_STR = "?callback={}&"
 INST_STR = "&Instrument={}&"
@@ -96,121 +98,76 @@ class TestHandlerUtils_InstrumentandCallback(unittest.TestCase):
         )
         self.assertEqual(exp_instrument, inst)
 
-
-class TestHandlerUtils_IbexRunning(unittest.TestCase):
-    def test_GIVEN_empty_dict_WHEN_get_ibex_running_called_THEN_empty_dict_json_returned(self):
-        self.assertEqual(dict(), get_summary_details_of_all_instruments(dict()))
-
-    def test_GIVEN_dict_with_key_containing_data_WHEN_get_ibex_running_called_THEN_running_instrument_true(
+    def test_GIVEN_path_without_cache_busting_parameter_WHEN_get_instrument_and_callback_called_THEN_instrument_and_callback_returned(
         self,
     ):
-        inst = "TEST"
-        inp = {inst: "some_data"}
-
-        result = get_summary_details_of_all_instruments(inp)
+        inst, callback = get_instrument_and_callback("/?callback=display&Instrument=all")
 
-        assert_that(result[inst], has_entry("is_up", True))
+        self.assertEqual(("ALL", "display"), (inst, callback))
 
-    def test_GIVEN_dict_with_key_containing_no_data_WHEN_get_ibex_running_called_THEN_running_instrument_false(
+    def test_GIVEN_path_with_instrument_first_WHEN_get_instrument_and_callback_called_THEN_instrument_and_callback_returned(
         self,
     ):
-        inst = "TEST"
-        inp = {inst: ""}
+        inst, callback = get_instrument_and_callback("/?Instrument=inst&callback=display")
 
-        result = get_summary_details_of_all_instruments(inp)
+        self.assertEqual(("INST", "display"), (inst, callback))
 
-        assert_that(result[inst], has_entry("is_up", False))
 
-    def test_GIVEN_dict_with_instruments_with_and_without_data_WHEN_get_ibex_running_called_THEN_running_and_not_running_instruments_returned(
-        self,
-    ):
-        running_inst, not_running_inst = "RUN", "NOT"
-        inp = {not_running_inst: "", running_inst: "some_data"}
+class TestHandlerUtils_SinceGeneration(unittest.TestCase):
+    def test_GIVEN_path_without_since_WHEN_get_since_generation_called_THEN_none_returned(self):
+        self.assertIsNone(get_since_generation(CALLBACK_AND_INST.format("test", "inst")))
 
-        result = get_summary_details_of_all_instruments(inp)
+    def test_GIVEN_path_with_since_WHEN_get_since_generation_called_THEN_generation_returned(self):
+        path = CALLBACK_AND_INST.format("test", "inst") + "since=0a1b2c3d-12&_=1"
 
-        assert_that(result[running_inst], has_entry("is_up", True))
-        assert_that(result[not_running_inst], has_entry("is_up", False))
+        self.assertEqual("0a1b2c3d-12", get_since_generation(path))
 
-    def test_GIVEN_dict_with_run_state_of_running_WHEN_get_summary_details_THEN_run_state_is_running(
+    def test_GIVEN_path_with_since_last_WHEN_get_since_generation_called_THEN_generation_returned(
         self,
     ):
-        inst = "TEST"
-        expected_state = "running"
-        inp = {inst: {"inst_pvs": {"RUNSTATE": {"value": expected_state}}}}
-
-        result = get_summary_details_of_all_instruments(inp)
+        path = CALLBACK_AND_INST.format("test", "inst") + "since=0a1b2c3d-3"
 
-        assert_that(result[inst], has_entry("run_state", expected_state))
+        self.assertEqual("0a1b2c3d-3", get_since_generation(path))
 
-    def test_GIVEN_dict_with_no_run_state_as_none_WHEN_get_summary_details_THEN_run_state_is_unknown(
+    def test_GIVEN_path_with_invalid_since_WHEN_get_since_generation_called_THEN_none_returned(
         self,
     ):
-        inst = "TEST"
-        expected_state = "UNKNOWN"
-        inp = {inst: {"inst_pvs": {"RUNSTATE": None}}}
+        path = CALLBACK_AND_INST.format("test", "inst") + "since=abc"
 
-        result = get_summary_details_of_all_instruments(inp)
+        self.assertIsNone(get_since_generation(path))
 
-        assert_that(result[inst], has_entry("run_state", expected_state))
-
-    def test_GIVEN_dict_with_no_run_state_missing_value_key_WHEN_get_summary_details_THEN_run_state_is_unknown(
+    def test_GIVEN_path_with_bare_generation_WHEN_get_since_generation_called_THEN_none_returned(
         self,
     ):
-        inst = "TEST"
-        expected_state = "UNKNOWN"
-        inp = {inst: {"inst_pvs": {"RUNSTATE": {}}}}
-
-        result = get_summary_details_of_all_instruments(inp)
-
-        assert_that(result[inst], has_entry("run_state", expected_state))
+        path = CALLBACK_AND_INST.format("test", "inst") + "since=3"
 
-    def test_GIVEN_dict_with_no_run_state_value_WHEN_get_summary_details_THEN_run_state_is_unknown(
-        self,
-    ):
-        inst = "TEST"
-        expected_state = "UNKNOWN"
-        inp = {inst: {"inst_pvs": {}}}
+        self.assertIsNone(get_since_generation(path))
 
-        result = get_summary_details_of_all_instruments(inp)
 
-        assert_that(result[inst], has_entry("run_state", expected_state))
+class TestHandlerUtils_InstrumentSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.store = SnapshotStore()
 
-    def test_GIVEN_dict_with_multiple_instruments_WHEN_get_summary_details_THEN_instruments_returned_in_named_order(
-        self,
-    ):
-        inst = "TEST"
-        expected_instrument_names = ["anInst", "Another", "B", "CAPITAL", "clower"]
-        inp = {"B": "", "Another": "", "CAPITAL": "", "clower": "", "anInst": ""}
-
-        result = list(get_summary_details_of_all_instruments(inp).keys())
-
-        assert_that(result, is_(expected_instrument_names))
-
-
-class TestHandlerUtils_DetailedInstrumentState(unittest.TestCase):
-    def test_GIVEN_instrument_not_in_data_WHEN_get_details_called_THEN_raises_error(self):
-        inst = "TEST_INST"
-        data = dict()
+    def test_GIVEN_instrument_not_in_snapshots_WHEN_get_snapshot_called_THEN_raises_error(self):
         with self.assertRaises(ValueError):
-            get_detailed_state_of_specific_instrument(inst, data)
+            get_snapshot_of_specific_instrument("TEST_INST", self.store.snapshots())
 
-    def test_GIVEN_instrument_with_no_data_WHEN_get_details_called_THEN_raises_error(self):
+    def test_GIVEN_instrument_with_no_data_WHEN_get_snapshot_called_THEN_raises_error(self):
         inst = "TEST_INST"
-        data = {inst: ""}
+        self.store.publish(inst, "")
         with self.assertRaises(ValueError):
-            get_detailed_state_of_specific_instrument(inst, data)
+            get_snapshot_of_specific_instrument(inst, self.store.snapshots())
 
-    def test_GIVEN_instrument_with_data_WHEN_get_details_called_THEN_data_returned_for_that_instrument(
+    def test_GIVEN_instrument_with_data_WHEN_get_snapshot_called_THEN_snapshot_for_that_instrument_returned(
         self,
     ):
         inst = "TEST_INST"
-        inst_data = ["test"]
-        data_dict = {inst: inst_data}
+        self.store.publish(inst, ["test"])
+        self.store.publish("OTHER", ["other"])
 
-        out = get_detailed_state_of_specific_instrument(inst, data_dict)
+        out = get_snapshot_of_specific_instrument(inst, self.store.snapshots())
 
-        self.assertEqual(out, inst_data)
+        self.assertEqual(out.body, b'["test"]')
 
 
 class TestHandlerUtils_InstrumentTime(unittest.TestCase):
@@ -240,69 +197,47 @@ class TestHandlerUtils_InstrumentTime(unittest.TestCase):
 
 
 class TestHandlerUtils_CheckOutOfSync(unittest.TestCase):
-    def test_that_GIVEN_time_difference_is_greater_than_threshold_THEN_set_out_of_sync_to_true(
-        self,
-    ):
+    def test_that_GIVEN_instrument_clock_behind_THEN_clock_offset_is_negative(self):
         instrument_data = {"inst_pvs": {"TIME_OF_DAY": {"value": "does not matter"}}}
 
-        set_time_shift(
+        clock_offset = get_clock_offset(
             "",
             instrument_data,
-            time_shift_threshold=2,
             extract_time_from_instrument_func=lambda _, __: 5,
             current_time_func=lambda: 10,
         )
 
-        assert_that(instrument_data["out_of_sync"], equal_to(True))
+        assert_that(clock_offset, equal_to(-5))
 
-    def test_that_GIVEN_time_difference_is_less_than_threshold_THEN_set_out_of_sync_to_false(self):
+    def test_that_GIVEN_invalid_time_THEN_clock_offset_is_None(self):
         instrument_data = {"inst_pvs": {"TIME_OF_DAY": {"value": "does not matter"}}}
 
-        set_time_shift(
+        clock_offset = get_clock_offset(
             "",
             instrument_data,
-            time_shift_threshold=17,
-            extract_time_from_instrument_func=lambda _, __: 5,
+            extract_time_from_instrument_func=lambda _, __: "foo",
             current_time_func=lambda: 10,
         )
 
-        assert_that(instrument_data["out_of_sync"], equal_to(False))
-
-    def test_that_GIVEN_time_difference_of_five_THEN_set_time_diff_to_five(self):
-        instrument_data = {"inst_pvs": {"TIME_OF_DAY": {"value": "does not matter"}}}
+        assert_that(clock_offset, equal_to(None))
 
-        set_time_shift(
-            "",
-            instrument_data,
-            time_shift_threshold=17,
-            extract_time_from_instrument_func=lambda _, __: 5,
-            current_time_func=lambda: 10,
-        )
+    def test_that_GIVEN_time_difference_is_greater_than_threshold_THEN_out_of_sync(self):
+        time_diff, out_of_sync = get_time_shift("", -5, time_shift_threshold=2)
 
-        assert_that(instrument_data["time_diff"], equal_to(5))
+        assert_that(out_of_sync, equal_to(True))
 
-    def test_that_GIVEN_invalid_time_THEN_set_time_diff_to_None(self):
-        instrument_data = {"inst_pvs": {"TIME_OF_DAY": {"value": "does not matter"}}}
+    def test_that_GIVEN_time_difference_is_less_than_threshold_THEN_not_out_of_sync(self):
+        time_diff, out_of_sync = get_time_shift("", -5, time_shift_threshold=17)
 
-        set_time_shift(
-            "",
-            instrument_data,
-            time_shift_threshold=17,
-            extract_time_from_instrument_func=lambda _, __: "foo",
-            current_time_func=lambda: 10,
-        )
+        assert_that(out_of_sync, equal_to(False))
 
-        assert_that(instrument_data["time_diff"], equal_to(None))
+    def test_that_GIVEN_time_difference_of_five_THEN_time_diff_is_five(self):
+        time_diff, out_of_sync = get_time_shift("", -5, time_shift_threshold=17)
 
-    def test_that_GIVEN_invalid_time_THEN_set_out_of_sync_to_false(self):
-        instrument_data = {"inst_pvs": {"TIME_OF_DAY": {"value": "does not matter"}}}
+        assert_that(time_diff, equal_to(5))
 
-        set_time_shift(
-            "",
-            instrument_data,
-            time_shift_threshold=17,
-            extract_time_from_instrument_func=lambda _, __: "foo",
-            current_time_func=lambda: 10,
-        )
+    def test_that_GIVEN_unknown_clock_offset_THEN_time_diff_is_None_and_not_out_of_sync(self):
+        time_diff, out_of_sync = get_time_shift("", None, time_shift_threshold=17)
 
-        assert_that(instrument_data["out_of_sync"], equal_to(False))
+        assert_that(time_diff, equal_to(None))
+        assert_that(out_of_sync, equal_to(False))
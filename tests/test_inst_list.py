@@ -10,7 +10,8 @@ from CaChannel import CaChannelException
 from hamcrest import *
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from external_webpage.web_scrapper_manager import InstList
+from external_webpage.channel_access import ChannelCache, FakeChannelAccess
+from external_webpage.web_scrapper_manager import INST_LIST_PV, InstList
 
 caget_error = None
 caget_value = ""
@@ -141,5 +142,44 @@ class TestInstList(unittest.TestCase):
         assert_that(self.inst_list.error_on_retrieve, is_(InstList.INSTRUMENT_LIST_CAN_NOT_BE_READ))
 
 
+class TestInstListMonitor(unittest.TestCase):
+    def setUp(self):
+        self.channel_access = FakeChannelAccess()
+        self.changes = []
+        self.inst_list = InstList(
+            channel_cache=ChannelCache(self.channel_access),
+            on_change=lambda: self.changes.append(True),
+        )
+
+    def set_inst_list(self, instruments):
+        compressed = zlib.compress(bytes(json.dumps(instruments), "utf-8"))
+        self.channel_access.set_value(INST_LIST_PV, binascii.hexlify(bytearray(compressed)))
+
+    def test_GIVEN_monitored_inst_list_WHEN_retrieve_THEN_list_returned(self):
+        self.set_inst_list([{"pvPrefix": "IN:INST:", "hostName": "NDXINST", "name": "INST"}])
+
+        assert_that(self.inst_list.retrieve(), is_({"INST": ("NDXINST", "IN:INST:")}))
+
+    def test_GIVEN_inst_list_not_connected_WHEN_retrieve_THEN_error_and_empty_list(self):
+        assert_that(self.inst_list.retrieve(), is_({}))
+        assert_that(self.inst_list.error_on_retrieve, is_(InstList.INSTRUMENT_LIST_CAN_NOT_BE_READ))
+
+    def test_GIVEN_monitored_inst_list_WHEN_it_changes_THEN_change_notified(self):
+        self.set_inst_list([])
+
+        self.set_inst_list([{"pvPrefix": "IN:INST:", "hostName": "NDXINST", "name": "INST"}])
+
+        assert_that(self.changes, has_length(2))
+        assert_that(self.inst_list.retrieve(), is_({"INST": ("NDXINST", "IN:INST:")}))
+
+    def test_GIVEN_monitored_inst_list_WHEN_retrieved_several_times_THEN_subscribed_once(self):
+        self.set_inst_list([])
+
+        self.inst_list.retrieve()
+        self.inst_list.retrieve()
+
+        assert_that(self.channel_access.subscribe_count, is_(1))
+
+
 if __name__ == "__main__":
     unittest.main()
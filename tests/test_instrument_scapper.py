@@ -0,0 +1,64 @@
+import json
+import time
+import unittest
+
+from hamcrest import *
+
+from external_webpage.instrument_scapper import publish_instrument_data
+from external_webpage.snapshot_store import SnapshotStore
+
+
+class TestPublishInstrumentData(unittest.TestCase):
+    def setUp(self):
+        self.name = "TEST_INST"
+        self.store = SnapshotStore()
+
+    def test_GIVEN_collated_data_WHEN_published_THEN_data_and_its_encoded_body_are_stored(self):
+        data = {"config_name": "conf", "groups": {}, "inst_pvs": {}, "error_statuses": []}
+
+        publish_instrument_data(self.name, data, self.store)
+
+        snapshot = self.store.get(self.name)
+        assert_that(snapshot.data, has_entries(data))
+        assert_that(json.loads(snapshot.body.decode("utf-8")), has_entries(data))
+
+    def test_GIVEN_collated_data_WHEN_published_THEN_time_shift_is_included_in_body(self):
+        data = {"inst_pvs": {}}
+
+        publish_instrument_data(self.name, data, self.store)
+
+        body = json.loads(self.store.get(self.name).body.decode("utf-8"))
+        assert_that(body, has_entries({"time_diff": None, "out_of_sync": False}))
+
+    def test_GIVEN_collated_data_WHEN_published_THEN_collated_data_is_not_modified(self):
+        data = {"inst_pvs": {}}
+
+        publish_instrument_data(self.name, data, self.store)
+
+        assert_that(data, is_({"inst_pvs": {}}))
+
+    def test_GIVEN_instrument_time_WHEN_published_THEN_time_diff_served(self):
+        instrument_time = time.strftime("%m/%d/%Y %H:%M:%S", time.localtime(time.time() + 60))
+        data = {"inst_pvs": {"TIME_OF_DAY": {"value": instrument_time}}}
+
+        snapshot = publish_instrument_data(self.name, data, self.store)
+
+        assert_that(snapshot.data["time_diff"], close_to(60, 2))
+
+    def test_GIVEN_unavailable_instrument_WHEN_published_THEN_snapshot_is_not_up(self):
+        publish_instrument_data(self.name, "", self.store)
+
+        assert_that(self.store.get(self.name).is_up(), is_(False))
+
+    def test_GIVEN_data_which_is_not_json_WHEN_published_THEN_value_error_and_nothing_stored(self):
+        assert_that(
+            calling(publish_instrument_data).with_args(
+                self.name, {"inst_pvs": {}, "bad": object()}, self.store
+            ),
+            raises(ValueError),
+        )
+        assert_that(self.store.get(self.name), is_(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
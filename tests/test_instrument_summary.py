@@ -0,0 +1,214 @@
+import json
+import unittest
+from collections import OrderedDict
+
+from hamcrest import *
+
+from external_webpage.circuit_breaker import CLOSED, OPEN
+from external_webpage.instrument_summary import InstrumentSummary
+from external_webpage.snapshot_store import SnapshotStore
+
+
+def _running(run_state="RUNNING", title="title"):
+    return {
+        "inst_pvs": {"RUNSTATE": {"value": run_state}, "TITLE": {"value": title}},
+        "groups": {},
+    }
+
+
+def _served_summary(data):
+    store = SnapshotStore()
+    for name, value in data.items():
+        store.publish(name, value)
+    return json.loads(store.summary.body(""), object_pairs_hook=OrderedDict)["instruments"]
+
+
+class TestInstrumentSummary(unittest.TestCase):
+    def setUp(self):
+        self.summary = InstrumentSummary()
+
+    def test_GIVEN_empty_summary_WHEN_body_THEN_body_has_no_instruments(self):
+        assert_that(json.loads(self.summary.body("")), is_({"error": "", "instruments": {}}))
+
+    def test_GIVEN_instruments_WHEN_body_THEN_body_has_summary_of_each_instrument(self):
+        data = {"ZOOM": _running(), "alf": "", "LARMOR": _running("SETUP"), "Imat": _running(None)}
+        for name, value in data.items():
+            self.summary.update(name, value)
+
+        instruments = {
+            "alf": {"is_up": False, "run_state": "UNKNOWN", "breaker": CLOSED},
+            "Imat": {"is_up": True, "run_state": None, "breaker": CLOSED},
+            "LARMOR": {"is_up": True, "run_state": "SETUP", "breaker": CLOSED},
+            "ZOOM": {"is_up": True, "run_state": "RUNNING", "breaker": CLOSED},
+        }
+        expected = {"error": "an error", "instruments": instruments}
+        assert_that(json.loads(self.summary.body("an error")), is_(expected))
+
+    def test_GIVEN_instruments_WHEN_instruments_json_THEN_instruments_in_case_insensitive_order(
+        self,
+    ):
+        for name in ["ZOOM", "alf", "LARMOR"]:
+            self.summary.update(name, "")
+
+        result = json.loads(self.summary.instruments_json(), object_pairs_hook=OrderedDict)
+
+        assert_that(list(result.keys()), contains_exactly("alf", "LARMOR", "ZOOM"))
+
+    def test_GIVEN_instrument_WHEN_updated_with_same_run_state_THEN_summary_unchanged(self):
+        self.summary.update("ALF", _running(title="first"))
+        version = self.summary.version
+
+        changed = self.summary.update("ALF", _running(title="second"))
+
+        assert_that(changed, is_(False))
+        assert_that(self.summary.version, is_(version))
+
+    def test_GIVEN_instrument_WHEN_run_state_changes_THEN_summary_updated(self):
+        self.summary.update("ALF", _running("SETUP"))
+        version = self.summary.version
+
+        changed = self.summary.update("ALF", _running("RUNNING"))
+
+        assert_that(changed, is_(True))
+        assert_that(self.summary.version, is_(version + 1))
+        assert_that(
+            json.loads(self.summary.instruments_json()),
+            is_({"ALF": {"is_up": True, "run_state": "RUNNING", "breaker": CLOSED}}),
+        )
+
+    def test_GIVEN_instrument_WHEN_breaker_state_changes_THEN_summary_updated(self):
+        self.summary.update("ALF", "")
+        version = self.summary.version
+
+        changed = self.summary.set_breaker_state("ALF", OPEN)
+
+        assert_that(changed, is_(True))
+        assert_that(self.summary.version, is_(version + 1))
+        assert_that(json.loads(self.summary.instruments_json())["ALF"], has_entries(breaker=OPEN))
+
+    def test_GIVEN_breaker_state_set_before_first_data_WHEN_updated_THEN_summary_has_breaker_state(
+        self,
+    ):
+        self.summary.set_breaker_state("ALF", OPEN)
+
+        self.summary.update("ALF", "")
+
+        assert_that(json.loads(self.summary.instruments_json())["ALF"], has_entries(breaker=OPEN))
+
+    def test_GIVEN_unchanged_summary_and_error_WHEN_body_THEN_same_body_object_returned(self):
+        self.summary.update("ALF", _running())
+
+        assert_that(self.summary.body(""), is_(same_instance(self.summary.body(""))))
+
+    def test_GIVEN_error_changes_WHEN_body_THEN_body_has_new_error(self):
+        self.summary.update("ALF", _running())
+        self.summary.body("")
+
+        assert_that(json.loads(self.summary.body("new error"))["error"], is_("new error"))
+
+
+class TestSnapshotStoreSummary(unittest.TestCase):
+    def test_GIVEN_published_instruments_WHEN_summary_THEN_summary_contains_instruments(self):
+        store = SnapshotStore()
+        store.publish("ALF", _running())
+        store.publish("LARMOR", "")
+
+        assert_that(
+            json.loads(store.summary.instruments_json()),
+            is_(
+                {
+                    "ALF": {"is_up": True, "run_state": "RUNNING", "breaker": CLOSED},
+                    "LARMOR": {"is_up": False, "run_state": "UNKNOWN", "breaker": CLOSED},
+                }
+            ),
+        )
+
+
+class TestInstrumentSummaryDetails(unittest.TestCase):
+    def test_GIVEN_empty_dict_WHEN_summary_served_THEN_empty_dict_json_returned(self):
+        self.assertEqual(dict(), _served_summary(dict()))
+
+    def test_GIVEN_dict_with_key_containing_data_WHEN_summary_served_THEN_running_instrument_true(
+        self,
+    ):
+        inst = "TEST"
+        inp = {inst: "some_data"}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("is_up", True))
+
+    def test_GIVEN_dict_with_key_containing_no_data_WHEN_summary_served_THEN_running_instrument_false(
+        self,
+    ):
+        inst = "TEST"
+        inp = {inst: ""}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("is_up", False))
+
+    def test_GIVEN_dict_with_instruments_with_and_without_data_WHEN_summary_served_THEN_running_and_not_running_instruments_returned(
+        self,
+    ):
+        running_inst, not_running_inst = "RUN", "NOT"
+        inp = {not_running_inst: "", running_inst: "some_data"}
+
+        result = _served_summary(inp)
+
+        assert_that(result[running_inst], has_entry("is_up", True))
+        assert_that(result[not_running_inst], has_entry("is_up", False))
+
+    def test_GIVEN_dict_with_run_state_of_running_WHEN_summary_served_THEN_run_state_is_running(
+        self,
+    ):
+        inst = "TEST"
+        expected_state = "running"
+        inp = {inst: {"inst_pvs": {"RUNSTATE": {"value": expected_state}}}}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("run_state", expected_state))
+
+    def test_GIVEN_dict_with_no_run_state_as_none_WHEN_summary_served_THEN_run_state_is_unknown(
+        self,
+    ):
+        inst = "TEST"
+        expected_state = "UNKNOWN"
+        inp = {inst: {"inst_pvs": {"RUNSTATE": None}}}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("run_state", expected_state))
+
+    def test_GIVEN_dict_with_no_run_state_missing_value_key_WHEN_summary_served_THEN_run_state_is_unknown(
+        self,
+    ):
+        inst = "TEST"
+        expected_state = "UNKNOWN"
+        inp = {inst: {"inst_pvs": {"RUNSTATE": {}}}}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("run_state", expected_state))
+
+    def test_GIVEN_dict_with_no_run_state_value_WHEN_summary_served_THEN_run_state_is_unknown(
+        self,
+    ):
+        inst = "TEST"
+        expected_state = "UNKNOWN"
+        inp = {inst: {"inst_pvs": {}}}
+
+        result = _served_summary(inp)
+
+        assert_that(result[inst], has_entry("run_state", expected_state))
+
+    def test_GIVEN_dict_with_multiple_instruments_WHEN_summary_served_THEN_instruments_returned_in_named_order(
+        self,
+    ):
+        expected_instrument_names = ["anInst", "Another", "B", "CAPITAL", "clower"]
+        inp = {"B": "", "Another": "", "CAPITAL": "", "clower": "", "anInst": ""}
+
+        result = list(_served_summary(inp).keys())
+
+        assert_that(result, is_(expected_instrument_names))
@@ -0,0 +1,49 @@
+import json
+import unittest
+
+from hamcrest import *
+
+from external_webpage.json_backend import STDLIB, available_backends
+from tests.data_mother import ArchiveMother, ConfigMother
+
+
+class TestJsonBackend(unittest.TestCase):
+    def test_GIVEN_any_installation_WHEN_available_backends_THEN_standard_library_is_last(self):
+        assert_that(available_backends()[-1].name, is_(STDLIB))
+
+    def test_GIVEN_archive_page_WHEN_encoded_by_each_backend_THEN_same_as_standard_library(self):
+        page = ArchiveMother.create_info_page(
+            [ArchiveMother.create_channel(name="BLOCK", value="1.0", units="mm")]
+        )
+
+        for backend in available_backends():
+            encoded = backend.dumps(page)
+            assert_that(encoded, instance_of(bytes))
+            assert_that(json.loads(encoded), is_(page), backend.name)
+
+    def test_GIVEN_config_WHEN_decoded_by_each_backend_THEN_same_as_standard_library(self):
+        config = json.dumps(ConfigMother.create_config(blocks=[ConfigMother.create_block("BLOCK")]))
+
+        for backend in available_backends():
+            assert_that(backend.loads(config), is_(json.loads(config)), backend.name)
+            assert_that(
+                backend.loads(config.encode("utf-8")), is_(json.loads(config)), backend.name
+            )
+
+    def test_GIVEN_lone_surrogate_WHEN_decoded_by_each_backend_THEN_same_as_standard_library(self):
+        document = '{"value": "\\udd00"}'
+
+        for backend in available_backends():
+            assert_that(backend.loads(document), is_({"value": "\udd00"}), backend.name)
+
+    def test_GIVEN_invalid_json_WHEN_decoded_by_each_backend_THEN_value_error(self):
+        for backend in available_backends():
+            assert_that(calling(backend.loads).with_args("{'a': 1}"), raises(ValueError))
+
+    def test_GIVEN_object_which_is_not_json_WHEN_encoded_by_each_backend_THEN_type_error(self):
+        for backend in available_backends():
+            assert_that(calling(backend.dumps).with_args({"a": object()}), raises(TypeError))
+
+
+if __name__ == "__main__":
+    unittest.main()
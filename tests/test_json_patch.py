@@ -0,0 +1,66 @@
+import unittest
+
+from hamcrest import *
+
+from external_webpage.json_patch import apply_patch, make_patch
+
+
+class TestJsonPatch(unittest.TestCase):
+    def assert_patch_recreates_target(self, source, target):
+        patch = make_patch(source, target)
+
+        result = apply_patch(source, patch)
+
+        assert_that(result, is_(target))
+        assert_that(list(result.keys()), is_(list(target.keys())))
+        return patch
+
+    def test_GIVEN_identical_documents_WHEN_patch_made_THEN_patch_is_empty(self):
+        assert_that(make_patch({"a": {"b": 1}}, {"a": {"b": 1}}), is_([]))
+
+    def test_GIVEN_nested_value_changed_WHEN_patch_made_THEN_only_that_value_replaced(self):
+        patch = self.assert_patch_recreates_target(
+            {"groups": {"g": {"block": {"value": "1"}, "other": {"value": "2"}}}},
+            {"groups": {"g": {"block": {"value": "5"}, "other": {"value": "2"}}}},
+        )
+
+        assert_that(patch, is_([{"op": "replace", "path": "/groups/g/block/value", "value": "5"}]))
+
+    def test_GIVEN_key_added_and_removed_WHEN_patch_made_THEN_add_and_remove_operations(self):
+        patch = self.assert_patch_recreates_target({"a": 1, "b": 2}, {"a": 1, "c": 3})
+
+        assert_that(
+            patch,
+            is_([{"op": "remove", "path": "/b"}, {"op": "add", "path": "/c", "value": 3}]),
+        )
+
+    def test_GIVEN_keys_reordered_WHEN_patch_made_THEN_object_replaced_whole(self):
+        patch = self.assert_patch_recreates_target(
+            {"groups": {"first": {}, "second": {}}}, {"groups": {"second": {}, "first": {}}}
+        )
+
+        assert_that(patch, has_length(1))
+        assert_that(patch[0], has_entries({"op": "replace", "path": "/groups"}))
+
+    def test_GIVEN_list_changed_WHEN_patch_made_THEN_list_replaced_whole(self):
+        patch = self.assert_patch_recreates_target(
+            {"error_statuses": []}, {"error_statuses": ["Failed"]}
+        )
+
+        assert_that(patch, is_([{"op": "replace", "path": "/error_statuses", "value": ["Failed"]}]))
+
+    def test_GIVEN_key_with_special_characters_WHEN_patch_made_THEN_key_escaped_in_path(self):
+        patch = self.assert_patch_recreates_target({"a/b~c": 1}, {"a/b~c": 2})
+
+        assert_that(patch[0]["path"], is_("/a~1b~0c"))
+
+    def test_GIVEN_document_WHEN_patch_applied_THEN_original_not_modified(self):
+        source = {"a": {"b": 1}}
+
+        apply_patch(source, [{"op": "replace", "path": "/a/b", "value": 2}])
+
+        assert_that(source, is_({"a": {"b": 1}}))
+
+
+if __name__ == "__main__":
+    unittest.main()
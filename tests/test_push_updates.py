@@ -0,0 +1,101 @@
+import unittest
+
+from hamcrest import *
+from tornado.testing import AsyncTestCase, gen_test
+
+from external_webpage.push_updates import (
+    UNAVAILABLE_EVENT,
+    UpdateBroadcaster,
+    format_server_sent_event,
+    snapshot_event,
+)
+from external_webpage.snapshot_store import SnapshotStore
+
+
+class TestServerSentEvents(unittest.TestCase):
+    def test_GIVEN_data_WHEN_formatted_THEN_data_line_ends_with_blank_line(self):
+        assert_that(format_server_sent_event(b'{"a": 1}'), is_(b'data: {"a": 1}\n\n'))
+
+    def test_GIVEN_id_and_event_WHEN_formatted_THEN_id_and_event_lines_before_data(self):
+        assert_that(
+            format_server_sent_event(b"x", event_id=3, event="name"),
+            is_(b"id: 3\nevent: name\ndata: x\n\n"),
+        )
+
+    def test_GIVEN_data_on_several_lines_WHEN_formatted_THEN_each_line_is_a_data_line(self):
+        assert_that(format_server_sent_event(b"a\nb"), is_(b"data: a\ndata: b\n\n"))
+
+    def test_GIVEN_snapshot_of_instrument_WHEN_event_created_THEN_body_sent_with_generation_token_as_id(
+        self,
+    ):
+        snapshot = SnapshotStore().publish("INST", {"a": 1})
+
+        assert_that(
+            snapshot_event(snapshot),
+            is_("id: {}\ndata: ".format(snapshot.token).encode("utf-8") + snapshot.body + b"\n\n"),
+        )
+
+    def test_GIVEN_snapshot_of_unavailable_instrument_WHEN_event_created_THEN_unavailable_event(
+        self,
+    ):
+        snapshot = SnapshotStore().publish("INST", "")
+
+        assert_that(
+            snapshot_event(snapshot),
+            is_(
+                "id: {}\nevent: {}\ndata: \n\n".format(snapshot.token, UNAVAILABLE_EVENT).encode(
+                    "utf-8"
+                )
+            ),
+        )
+
+
+class TestUpdateBroadcaster(AsyncTestCase):
+    def setUp(self):
+        super(TestUpdateBroadcaster, self).setUp()
+        self.broadcaster = UpdateBroadcaster()
+
+    @gen_test
+    def test_GIVEN_subscription_WHEN_message_published_for_its_key_THEN_message_received(self):
+        subscription = self.broadcaster.subscribe("INST")
+
+        self.broadcaster.publish("INST", b"message")
+
+        message = yield subscription.next_message(1)
+        assert_that(message, is_(b"message"))
+
+    @gen_test
+    def test_GIVEN_subscription_WHEN_message_published_for_other_key_THEN_nothing_received(self):
+        subscription = self.broadcaster.subscribe("INST")
+
+        self.broadcaster.publish("OTHER", b"message")
+
+        message = yield subscription.next_message(0.01)
+        assert_that(message, is_(None))
+
+    @gen_test
+    def test_GIVEN_several_messages_published_WHEN_next_message_THEN_only_latest_received(self):
+        subscription = self.broadcaster.subscribe("INST")
+
+        self.broadcaster.publish("INST", b"first")
+        self.broadcaster.publish("INST", b"second")
+
+        message = yield subscription.next_message(1)
+        assert_that(message, is_(b"second"))
+        message = yield subscription.next_message(0.01)
+        assert_that(message, is_(None))
+
+    @gen_test
+    def test_GIVEN_subscription_WHEN_unsubscribed_THEN_closed_and_key_has_no_subscribers(self):
+        subscription = self.broadcaster.subscribe("INST")
+
+        self.broadcaster.unsubscribe(subscription)
+
+        message = yield subscription.next_message(1)
+        assert_that(message, is_(None))
+        assert_that(subscription.closed, is_(True))
+        assert_that(self.broadcaster.has_subscribers("INST"), is_(False))
+
+
+if __name__ == "__main__":
+    unittest.main()
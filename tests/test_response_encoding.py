@@ -0,0 +1,101 @@
+import gzip
+import unittest
+
+from hamcrest import *
+
+from external_webpage import response_encoding
+from external_webpage.response_encoding import (
+    BROTLI,
+    GZIP,
+    IDENTITY,
+    EncodedBody,
+    available_encodings,
+    choose_content_encoding,
+    deflate_fragment,
+    gzip_around_fragment,
+)
+
+BODY = b'{"config_name": "conf", "groups": {"group": {"block": {"value": "1.000"}}}}' * 50
+
+
+class TestChooseContentEncoding(unittest.TestCase):
+    def test_GIVEN_no_accept_encoding_WHEN_choose_THEN_identity(self):
+        assert_that(choose_content_encoding(None, [GZIP]), is_(IDENTITY))
+
+    def test_GIVEN_gzip_accepted_WHEN_choose_THEN_gzip(self):
+        assert_that(choose_content_encoding("gzip, deflate", [GZIP]), is_(GZIP))
+
+    def test_GIVEN_gzip_and_brotli_accepted_WHEN_choose_THEN_first_available_preference_chosen(
+        self,
+    ):
+        assert_that(choose_content_encoding("gzip, deflate, br", [BROTLI, GZIP]), is_(BROTLI))
+
+    def test_GIVEN_brotli_accepted_but_not_available_WHEN_choose_THEN_gzip(self):
+        assert_that(choose_content_encoding("gzip, deflate, br", [GZIP]), is_(GZIP))
+
+    def test_GIVEN_gzip_refused_with_zero_quality_WHEN_choose_THEN_identity(self):
+        assert_that(choose_content_encoding("gzip;q=0, deflate", [GZIP]), is_(IDENTITY))
+
+    def test_GIVEN_wildcard_accepted_WHEN_choose_THEN_first_available(self):
+        assert_that(choose_content_encoding("*", [GZIP]), is_(GZIP))
+
+    @unittest.skipIf(response_encoding.brotli is None, "brotli is not installed")
+    def test_GIVEN_page_callback_WHEN_available_encodings_THEN_brotli_preferred(self):
+        assert_that(available_encodings("instrument_data"), is_([BROTLI, GZIP]))
+
+    def test_GIVEN_client_chosen_callback_WHEN_available_encodings_THEN_only_gzip(self):
+        assert_that(available_encodings("jQuery3600_1700000000000"), is_([GZIP]))
+
+
+class TestGzipAroundFragment(unittest.TestCase):
+    def test_GIVEN_compressed_body_WHEN_wrapped_THEN_decompresses_to_prefix_body_and_suffix(self):
+        fragment = deflate_fragment(BODY)
+
+        result = gzip_around_fragment(b"callback(", BODY, fragment, b")")
+
+        assert_that(gzip.decompress(result), is_(b"callback(" + BODY + b")"))
+
+    def test_GIVEN_empty_prefix_and_body_WHEN_wrapped_THEN_decompresses_to_suffix(self):
+        result = gzip_around_fragment(b"", b"", deflate_fragment(b""), b")")
+
+        assert_that(gzip.decompress(result), is_(b")"))
+
+    def test_GIVEN_prefix_longer_than_a_stored_block_WHEN_wrapped_THEN_decompresses_correctly(self):
+        prefix = b"p" * 70000
+
+        result = gzip_around_fragment(prefix, BODY, deflate_fragment(BODY), b")")
+
+        assert_that(gzip.decompress(result), is_(prefix + BODY + b")"))
+
+
+class TestEncodedBody(unittest.TestCase):
+    def test_GIVEN_identity_WHEN_jsonp_THEN_body_wrapped_in_callback(self):
+        assert_that(EncodedBody(b"[1]").jsonp("cb"), is_(b"cb([1])"))
+
+    def test_GIVEN_gzip_WHEN_jsonp_THEN_compressed_body_wrapped_in_callback(self):
+        encoded = EncodedBody(BODY)
+
+        result = encoded.jsonp("cb", GZIP)
+
+        assert_that(gzip.decompress(result), is_(b"cb(" + BODY + b")"))
+        assert_that(len(result), less_than(len(BODY)))
+
+    @unittest.skipIf(response_encoding.brotli is None, "brotli is not installed")
+    def test_GIVEN_brotli_WHEN_jsonp_called_twice_THEN_same_compressed_response_reused(self):
+        encoded = EncodedBody(BODY)
+
+        first = encoded.jsonp("instrument_data", BROTLI)
+        second = encoded.jsonp("instrument_data", BROTLI)
+
+        assert_that(
+            response_encoding.brotli.decompress(first), is_(b"instrument_data(" + BODY + b")")
+        )
+        assert_that(second, is_(same_instance(first)))
+
+    @unittest.skipIf(response_encoding.brotli is None, "brotli is not installed")
+    def test_GIVEN_client_chosen_callback_WHEN_jsonp_with_brotli_THEN_error(self):
+        assert_that(calling(EncodedBody(BODY).jsonp).with_args("cb", BROTLI), raises(ValueError))
+
+
+if __name__ == "__main__":
+    unittest.main()
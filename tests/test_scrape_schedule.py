@@ -0,0 +1,73 @@
+import unittest
+
+from hamcrest import *
+
+from external_webpage.scrape_schedule import DeadlineSchedule, StaggeredPhases
+
+
+class TestStaggeredPhases(unittest.TestCase):
+    def test_GIVEN_phases_WHEN_first_offset_THEN_zero(self):
+        assert_that(StaggeredPhases(10).next_offset(), is_(0))
+
+    def test_GIVEN_phases_WHEN_offsets_taken_THEN_all_within_period(self):
+        phases = StaggeredPhases(10)
+
+        offsets = [phases.next_offset() for _ in range(50)]
+
+        assert_that(offsets, only_contains(all_of(greater_than_or_equal_to(0), less_than(10))))
+
+    def test_GIVEN_phases_WHEN_offsets_taken_THEN_evenly_spread_over_period(self):
+        phases = StaggeredPhases(10)
+
+        offsets = sorted(phases.next_offset() for _ in range(20))
+
+        gaps = [later - earlier for earlier, later in zip(offsets, offsets[1:])]
+        assert_that(max(gaps), less_than(10 / 20 * 3))
+
+
+class TestDeadlineSchedule(unittest.TestCase):
+    def setUp(self):
+        self.now = 100
+
+    def _schedule(self, offset=0):
+        return DeadlineSchedule(offset, clock=lambda: self.now)
+
+    def test_GIVEN_offset_WHEN_remaining_THEN_offset_until_first_deadline(self):
+        schedule = self._schedule(3)
+
+        assert_that(schedule.remaining(), is_(3))
+
+    def test_GIVEN_scrape_took_time_WHEN_advanced_THEN_next_deadline_measured_from_previous_deadline(
+        self,
+    ):
+        schedule = self._schedule()
+        self.now += 2
+
+        wait = schedule.advance(5)
+
+        assert_that(wait, is_(3))
+        assert_that(schedule.deadline, is_(105))
+
+    def test_GIVEN_scrape_overran_deadlines_WHEN_advanced_THEN_missed_deadlines_skipped(self):
+        schedule = self._schedule()
+        self.now += 12
+
+        wait = schedule.advance(5)
+
+        assert_that(schedule.deadline, is_(115))
+        assert_that(wait, is_(3))
+
+    def test_GIVEN_deadline_passed_WHEN_remaining_THEN_zero(self):
+        schedule = self._schedule(1)
+        self.now += 2
+
+        assert_that(schedule.remaining(), is_(0))
+
+    def test_GIVEN_future_deadline_WHEN_restarted_THEN_deadline_is_now(self):
+        schedule = self._schedule()
+        schedule.advance(30)
+
+        schedule.restart()
+
+        assert_that(schedule.remaining(), is_(0))
+        assert_that(schedule.advance(5), is_(5))
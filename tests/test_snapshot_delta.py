@@ -0,0 +1,138 @@
+import json
+import unittest
+
+from hamcrest import *
+from mock import patch
+
+from external_webpage.snapshot_delta import (
+    compute_delta,
+    encode_delta_message,
+    encode_snapshot_message,
+)
+from external_webpage.snapshot_store import SnapshotStore
+
+
+def instrument_data(block_value="1.000", run_state="SETUP", config_name="conf"):
+    return {
+        "config_name": config_name,
+        "groups": {
+            "group": {"changing": {"value": block_value}, "static": {"value": "2.000"}},
+            "other": {"block": {"value": "3.000"}},
+        },
+        "inst_pvs": {"RUNSTATE": {"value": run_state}},
+        "error_statuses": [],
+    }
+
+
+class TestComputeDelta(unittest.TestCase):
+    def test_GIVEN_identical_data_WHEN_delta_computed_THEN_delta_is_empty(self):
+        delta = compute_delta(instrument_data(), instrument_data())
+
+        assert_that(
+            delta,
+            is_(
+                {
+                    "groups": {},
+                    "inst_pvs": {},
+                    "removed_inst_pvs": [],
+                    "changed": {},
+                    "removed": [],
+                }
+            ),
+        )
+
+    def test_GIVEN_block_value_changed_WHEN_delta_computed_THEN_only_that_block_in_delta(self):
+        delta = compute_delta(instrument_data("1.000"), instrument_data("5.000"))
+
+        assert_that(delta["groups"], is_({"group": {"changing": {"value": "5.000"}}}))
+
+    def test_GIVEN_inst_pv_changed_and_removed_WHEN_delta_computed_THEN_changes_in_delta(self):
+        previous = instrument_data()
+        previous["inst_pvs"]["TITLE"] = {"value": "title"}
+
+        delta = compute_delta(previous, instrument_data(run_state="RUNNING"))
+
+        assert_that(delta["inst_pvs"], is_({"RUNSTATE": {"value": "RUNNING"}}))
+        assert_that(delta["removed_inst_pvs"], is_(["TITLE"]))
+
+    def test_GIVEN_top_level_value_changed_WHEN_delta_computed_THEN_value_in_changed(self):
+        delta = compute_delta(instrument_data(), instrument_data(config_name="new"))
+
+        assert_that(delta["changed"], is_({"config_name": "new"}))
+
+    def test_GIVEN_group_layout_changed_WHEN_delta_computed_THEN_none(self):
+        current = instrument_data()
+        del current["groups"]["other"]
+
+        assert_that(compute_delta(instrument_data(), current), is_(None))
+
+    def test_GIVEN_instrument_became_unavailable_WHEN_delta_computed_THEN_none(self):
+        assert_that(compute_delta(instrument_data(), ""), is_(None))
+
+
+class TestDeltaMessages(unittest.TestCase):
+    def setUp(self):
+        self.store = SnapshotStore()
+
+    def test_GIVEN_first_snapshot_WHEN_published_THEN_no_delta_message(self):
+        snapshot = self.store.publish("INST", instrument_data())
+
+        assert_that(snapshot.delta_message, is_(None))
+
+    def test_GIVEN_previous_data_WHEN_delta_message_encoded_THEN_message_has_generations(self):
+        message = json.loads(
+            encode_delta_message(
+                instrument_data("1.000"), "token-1", instrument_data("5.000"), "token-2"
+            )
+        )
+
+        assert_that(
+            message, has_entries({"type": "delta", "generation": "token-2", "base": "token-1"})
+        )
+        assert_that(message["groups"], is_({"group": {"changing": {"value": "5.000"}}}))
+
+    def test_GIVEN_changed_data_published_WHEN_snapshot_read_THEN_it_has_delta_message(self):
+        previous = self.store.publish("INST", instrument_data("1.000"))
+
+        snapshot = self.store.publish("INST", instrument_data("5.000"))
+
+        assert_that(
+            json.loads(snapshot.delta_message),
+            has_entries({"generation": snapshot.token, "base": previous.token}),
+        )
+
+    def test_GIVEN_changed_data_published_WHEN_delta_message_not_read_THEN_delta_not_computed(self):
+        self.store.publish("INST", instrument_data("1.000"))
+
+        with patch("external_webpage.snapshot_store.encode_delta_message") as encode:
+            snapshot = self.store.publish("INST", instrument_data("5.000"))
+
+            encode.assert_not_called()
+            snapshot.delta_message
+            snapshot.delta_message
+
+        encode.assert_called_once()
+
+    def test_GIVEN_snapshot_WHEN_snapshot_message_encoded_THEN_message_contains_data(self):
+        snapshot = self.store.publish("INST", instrument_data())
+
+        message = json.loads(encode_snapshot_message(snapshot))
+
+        expected_data = instrument_data()
+        expected_data["generation"] = snapshot.token
+        assert_that(
+            message, is_({"type": "snapshot", "generation": snapshot.token, "data": expected_data})
+        )
+
+    def test_GIVEN_unavailable_snapshot_WHEN_snapshot_message_encoded_THEN_unavailable_message(
+        self,
+    ):
+        snapshot = self.store.publish("INST", "")
+
+        message = json.loads(encode_snapshot_message(snapshot))
+
+        assert_that(message, is_({"type": "unavailable", "generation": snapshot.token}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+import json
+import unittest
+
+from hamcrest import *
+
+from external_webpage.response_encoding import GZIP, IDENTITY
+from external_webpage.snapshot_store import HISTORY_LENGTH, SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SnapshotStore()
+
+    def test_GIVEN_empty_store_WHEN_get_THEN_none_returned(self):
+        assert_that(self.store.get("INST"), is_(None))
+        assert_that(self.store.snapshots(), is_({}))
+
+    def test_GIVEN_published_data_WHEN_get_THEN_snapshot_has_data_and_encoded_body(self):
+        self.store.publish("INST", {"a": 1})
+
+        snapshot = self.store.get("INST")
+
+        assert_that(snapshot.data, is_({"a": 1}))
+        assert_that(json.loads(snapshot.body), is_({"a": 1, "generation": snapshot.token}))
+        assert_that(snapshot.is_up(), is_(True))
+
+    def test_GIVEN_reader_holds_snapshots_WHEN_new_data_published_THEN_readers_snapshots_are_unchanged(
+        self,
+    ):
+        self.store.publish("INST", {"a": 1})
+        held = self.store.snapshots()
+
+        self.store.publish("INST", {"a": 2})
+        self.store.publish("OTHER", {"b": 1})
+
+        assert_that(held, has_length(1))
+        assert_that(held["INST"].data, is_({"a": 1}))
+        assert_that(self.store.get("INST").data, is_({"a": 2}))
+
+    def test_GIVEN_first_publish_WHEN_get_THEN_generation_is_one_with_etag(self):
+        snapshot = self.store.publish("INST", {"a": 1})
+
+        assert_that(snapshot.generation, is_(1))
+        assert_that(snapshot.etag, matches_regexp(r'^"\w+-1"$'))
+
+    def test_GIVEN_identical_data_published_WHEN_get_THEN_snapshot_and_generation_unchanged(self):
+        first = self.store.publish("INST", {"a": 1})
+
+        second = self.store.publish("INST", {"a": 1})
+
+        assert_that(second, is_(same_instance(first)))
+        assert_that(self.store.get("INST").generation, is_(1))
+
+    def test_GIVEN_changed_data_published_WHEN_get_THEN_generation_increases_and_etag_changes(self):
+        first = self.store.publish("INST", {"a": 1})
+
+        second = self.store.publish("INST", {"a": 2})
+
+        assert_that(second.generation, is_(2))
+        assert_that(second.etag, is_not(first.etag))
+
+    def test_GIVEN_snapshot_WHEN_etag_for_encodings_THEN_compressed_etags_differ_from_identity(
+        self,
+    ):
+        snapshot = self.store.publish("INST", {"a": 1})
+
+        assert_that(snapshot.etag_for(IDENTITY), is_(snapshot.etag))
+        assert_that(snapshot.etag_for(GZIP), is_not(snapshot.etag))
+        assert_that(snapshot.etag_for(GZIP), matches_regexp(r'^".*-gzip"$'))
+
+    def test_GIVEN_two_stores_WHEN_same_data_published_THEN_etags_differ(self):
+        other_store = SnapshotStore()
+
+        first = self.store.publish("INST", {"a": 1})
+        second = other_store.publish("INST", {"a": 1})
+
+        assert_that(second.etag, is_not(first.etag))
+
+    def test_GIVEN_listener_WHEN_changed_and_identical_data_published_THEN_only_changes_notified(
+        self,
+    ):
+        notified = []
+        self.store.add_listener(notified.append)
+
+        first = self.store.publish("INST", {"a": 1})
+        self.store.publish("INST", {"a": 1})
+        second = self.store.publish("INST", {"a": 2})
+
+        assert_that(notified, contains_exactly(first, second))
+
+    def test_GIVEN_listener_which_raises_WHEN_published_THEN_snapshot_still_published(self):
+        def listener(snapshot):
+            raise RuntimeError("listener failed")
+
+        self.store.add_listener(listener)
+
+        self.store.publish("INST", {"a": 1})
+
+        assert_that(self.store.get("INST").data, is_({"a": 1}))
+
+    def test_GIVEN_empty_data_WHEN_published_THEN_body_has_only_generation(self):
+        snapshot = self.store.publish("INST", {})
+
+        assert_that(
+            snapshot.body, is_('{{"generation": "{}"}}'.format(snapshot.token).encode("utf-8"))
+        )
+
+    def test_GIVEN_unavailable_instrument_WHEN_published_THEN_body_has_no_generation(self):
+        snapshot = self.store.publish("INST", "")
+
+        assert_that(snapshot.body, is_(b'""'))
+
+    def test_GIVEN_identical_unavailable_instrument_published_twice_WHEN_get_THEN_generation_unchanged(
+        self,
+    ):
+        self.store.publish("INST", "")
+        self.store.publish("INST", "")
+
+        assert_that(self.store.get("INST").generation, is_(1))
+
+    def test_GIVEN_many_changes_WHEN_get_THEN_history_keeps_latest_earlier_generations(self):
+        for value in range(HISTORY_LENGTH + 5):
+            self.store.publish("INST", {"a": value})
+
+        history = self.store.get("INST").history
+
+        assert_that(history, has_length(HISTORY_LENGTH))
+        assert_that(history[-1], is_((HISTORY_LENGTH + 4, {"a": HISTORY_LENGTH + 3})))
+
+    def test_GIVEN_generation_in_history_WHEN_patch_since_THEN_patch_to_current_data(self):
+        first = self.store.publish("INST", {"a": 1, "b": 1})
+        self.store.publish("INST", {"a": 2, "b": 1})
+        snapshot = self.store.publish("INST", {"a": 3, "b": 1})
+
+        message = json.loads(snapshot.patch_message_since(first.token))
+
+        assert_that(
+            message,
+            is_(
+                {
+                    "generation": snapshot.token,
+                    "base": first.token,
+                    "patch": [{"op": "replace", "path": "/a", "value": 3}],
+                }
+            ),
+        )
+
+    def test_GIVEN_current_generation_WHEN_patch_since_THEN_empty_patch(self):
+        snapshot = self.store.publish("INST", {"a": 1})
+
+        message = json.loads(snapshot.patch_message_since(snapshot.token))
+
+        assert_that(message["patch"], is_([]))
+
+    def test_GIVEN_generation_too_old_WHEN_patch_since_THEN_none(self):
+        first = self.store.publish("INST", {"a": -1})
+        for value in range(HISTORY_LENGTH + 5):
+            self.store.publish("INST", {"a": value})
+
+        assert_that(self.store.get("INST").patch_message_since(first.token), is_(None))
+
+    def test_GIVEN_generation_when_instrument_unavailable_WHEN_patch_since_THEN_none(self):
+        first = self.store.publish("INST", "")
+        snapshot = self.store.publish("INST", {"a": 1})
+
+        assert_that(snapshot.patch_message_since(first.token), is_(None))
+
+    def test_GIVEN_generation_from_before_restart_WHEN_patch_since_THEN_none(self):
+        self.store.publish("INST", {"a": 1})
+        snapshot = self.store.publish("INST", {"a": 2})
+        restarted_store = SnapshotStore()
+        restarted_store.publish("INST", {"a": 3})
+        token_before_restart = restarted_store.publish("INST", {"a": 4}).token
+
+        assert_that(snapshot.patch_message_since(token_before_restart), is_(None))
+
+    def test_GIVEN_malformed_token_WHEN_patch_since_THEN_none(self):
+        snapshot = self.store.publish("INST", {"a": 1})
+
+        assert_that(snapshot.patch_message_since("1"), is_(None))
+
+    def test_GIVEN_summary_listener_WHEN_breaker_state_changes_THEN_listener_called(self):
+        notified = []
+        self.store.add_summary_listener(lambda: notified.append(True))
+        self.store.publish("INST", "")
+
+        self.store.set_breaker_state("INST", "open")
+
+        assert_that(notified, has_length(1))
+
+    def test_GIVEN_summary_listener_WHEN_breaker_state_unchanged_THEN_listener_not_called(self):
+        self.store.publish("INST", "")
+        self.store.set_breaker_state("INST", "open")
+        notified = []
+        self.store.add_summary_listener(lambda: notified.append(True))
+
+        self.store.set_breaker_state("INST", "open")
+
+        assert_that(notified, is_(empty()))
+
+    def test_GIVEN_data_which_is_not_json_WHEN_published_THEN_value_error_and_previous_snapshot_kept(
+        self,
+    ):
+        self.store.publish("INST", {"a": 1})
+
+        assert_that(
+            calling(self.store.publish).with_args("INST", {"a": object()}), raises(ValueError)
+        )
+        assert_that(self.store.get("INST").data, is_({"a": 1}))
+        assert_that(self.store.get("INST").generation, is_(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
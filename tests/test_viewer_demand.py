@@ -0,0 +1,88 @@
+import unittest
+
+from hamcrest import *
+
+from external_webpage.viewer_demand import ViewerDemand
+
+INSTRUMENT = "TEST_INST"
+
+
+class TestViewerDemand(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.demand = ViewerDemand(viewed_recently=300, clock=lambda: self.now)
+        self.woken = []
+        self.listener = lambda: self.woken.append(True)
+
+    def test_GIVEN_instrument_never_viewed_WHEN_is_viewed_THEN_false(self):
+        assert_that(self.demand.is_viewed(INSTRUMENT), is_(False))
+
+    def test_GIVEN_instrument_viewed_WHEN_is_viewed_within_recent_time_THEN_true(self):
+        self.demand.record_view(INSTRUMENT)
+        self.now = 299
+
+        assert_that(self.demand.is_viewed(INSTRUMENT), is_(True))
+        assert_that(self.demand.viewed_instruments(), is_([INSTRUMENT]))
+
+    def test_GIVEN_instrument_viewed_WHEN_is_viewed_after_recent_time_THEN_false(self):
+        self.demand.record_view(INSTRUMENT)
+        self.now = 300
+
+        assert_that(self.demand.is_viewed(INSTRUMENT), is_(False))
+        assert_that(self.demand.viewed_instruments(), is_(empty()))
+
+    def test_GIVEN_listener_WHEN_unviewed_instrument_viewed_THEN_listener_called_once(self):
+        self.demand.add_listener(INSTRUMENT, self.listener)
+
+        self.demand.record_view(INSTRUMENT)
+        self.demand.record_view(INSTRUMENT)
+
+        assert_that(self.woken, has_length(1))
+
+    def test_GIVEN_instrument_viewed_long_ago_WHEN_another_instrument_viewed_THEN_old_view_forgotten(
+        self,
+    ):
+        self.demand.record_view(INSTRUMENT)
+        self.now = 300
+
+        self.demand.record_view("OTHER")
+
+        assert_that(self.demand._last_viewed, is_({"OTHER": 300}))
+
+    def test_GIVEN_instrument_viewed_recently_WHEN_another_instrument_viewed_THEN_view_kept(self):
+        self.demand.record_view(INSTRUMENT)
+        self.now = 299
+
+        self.demand.record_view("OTHER")
+
+        assert_that(self.demand.viewed_instruments(), is_(["OTHER", INSTRUMENT]))
+
+    def test_GIVEN_listener_WHEN_instrument_viewed_again_after_recent_time_THEN_listener_called_again(
+        self,
+    ):
+        self.demand.add_listener(INSTRUMENT, self.listener)
+        self.demand.record_view(INSTRUMENT)
+        self.now = 300
+
+        self.demand.record_view(INSTRUMENT)
+
+        assert_that(self.woken, has_length(2))
+
+    def test_GIVEN_listener_removed_WHEN_instrument_viewed_THEN_listener_not_called(self):
+        self.demand.add_listener(INSTRUMENT, self.listener)
+        self.demand.remove_listener(INSTRUMENT, self.listener)
+
+        self.demand.record_view(INSTRUMENT)
+
+        assert_that(self.woken, is_(empty()))
+
+    def test_GIVEN_listener_raises_WHEN_instrument_viewed_THEN_other_listeners_called(self):
+        def failing_listener():
+            raise RuntimeError("listener failed")
+
+        self.demand.add_listener(INSTRUMENT, failing_listener)
+        self.demand.add_listener(INSTRUMENT, self.listener)
+
+        self.demand.record_view(INSTRUMENT)
+
+        assert_that(self.woken, has_length(1))
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import unittest
 from builtins import object
 
@@ -24,6 +25,7 @@ class MockWebScrapper(object):
         self.pv_prefix = pv_prefix
         self.started = False
         self.stopped = False
+        self.joined = False
         self.is_alive_flag = False
 
     def __repr__(self):
@@ -32,6 +34,10 @@ class MockWebScrapper(object):
     def stop(self):
         self.stopped = True
 
+    def join(self):
+        self.joined = True
+        self.is_alive_flag = False
+
     def start(self):
         self.started = True
         self.is_alive_flag = True
@@ -187,6 +193,38 @@ class TestWebScrapperManager(unittest.TestCase):
         assert_that(web_scrapper_manager.scrappers[0].pv_prefix, is_(self.expected_prefix))
         assert_that(web_scrapper_manager.scrappers[0].started, is_(True), "scrapper started")
 
+    def test_GIVEN_refresh_requested_WHEN_wait_THEN_wait_ends_early(self):
+        web_scrapper_manager = WebScrapperManager(MockWebScrapper, self.inst_list)
+        web_scrapper_manager.request_refresh()
+
+        start = time.monotonic()
+        web_scrapper_manager.wait(10)
+
+        assert_that(time.monotonic() - start, less_than(1))
+
+    def test_GIVEN_refresh_requested_WHEN_scrapper_list_maintained_THEN_refresh_request_cleared(
+        self,
+    ):
+        web_scrapper_manager = WebScrapperManager(MockWebScrapper, self.inst_list)
+        web_scrapper_manager.request_refresh()
+
+        web_scrapper_manager.maintain_scrapper_list()
+
+        assert_that(web_scrapper_manager._refresh_event.is_set(), is_(False))
+
+    def test_GIVEN_running_scrappers_WHEN_stop_all_THEN_scrappers_stopped_and_engine_shut_down(
+        self,
+    ):
+        engine = Mock()
+        web_scrapper_manager = WebScrapperManager(MockWebScrapper, self.inst_list, engine=engine)
+        web_scrapper_manager.maintain_scrapper_list()
+
+        web_scrapper_manager.stop_all()
+
+        assert_that(web_scrapper_manager.scrappers[0].stopped, is_(True))
+        assert_that(web_scrapper_manager.scrappers[0].joined, is_(True))
+        engine.shutdown.assert_called_once_with()
+
 
 if __name__ == "__main__":
     unittest.main()
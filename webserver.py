@@ -4,21 +4,36 @@ from future import standard_library
 
 standard_library.install_aliases()
 import asyncio
-import json
 import logging
 import os
-from builtins import str
 from logging.handlers import TimedRotatingFileHandler
 
 import tornado.ioloop
 import tornado.web
+import tornado.websocket
+from tornado.iostream import StreamClosedError
 
-from external_webpage.instrument_scapper import scraped_data, scraped_data_lock
+from external_webpage import json_backend
+from external_webpage.channel_access import channel_cache
+from external_webpage.data_source_reader import connection_statistics
+from external_webpage.instrument_scapper import snapshot_store
+from external_webpage.push_updates import (
+    UpdateBroadcaster,
+    format_server_sent_event,
+    snapshot_event,
+)
 from external_webpage.request_handler_utils import (
-    get_detailed_state_of_specific_instrument,
     get_instrument_and_callback,
-    get_summary_details_of_all_instruments,
+    get_since_generation,
+    get_snapshot_of_specific_instrument,
+)
+from external_webpage.response_encoding import (
+    IDENTITY,
+    available_encodings,
+    choose_content_encoding,
 )
+from external_webpage.snapshot_delta import encode_snapshot_message
+from external_webpage.viewer_demand import viewer_demand
 from external_webpage.web_scrapper_manager import WebScrapperManager
 
 logger = logging.getLogger("JSON_bourne")
@@ -31,6 +46,61 @@ logger.addHandler(handler)
 # use dataweb2.isis.rl.ac.uk / ndaextweb3-data.nd.rl.ac.uk (130.246.92.89)
 HOST, PORT = "130.246.92.89", 443
 
+# Name used to request the summary of all instruments
+ALL_INSTRUMENTS = "ALL"
+
+# Seconds between comments sent to idle event streams, so that proxies do not close them
+EVENT_STREAM_KEEP_ALIVE = 30
+
+# Updates pushed to clients holding an event stream open
+broadcaster = UpdateBroadcaster()
+# New snapshots pushed to the clients connected by websocket
+websocket_broadcaster = UpdateBroadcaster()
+last_broadcast_all_instruments_body = None
+
+
+def get_all_instruments_body():
+    """
+    Returns: the summary of all the instruments as UTF-8 encoded JSON
+    """
+    return snapshot_store.summary.body(web_manager.instrument_list_retrieval_errors())
+
+
+def broadcast_snapshot(snapshot):
+    """
+    Push a new snapshot to the clients following its instrument, and the summary of all instruments to the
+    clients following that if it has changed. Must be called on the IO loop.
+    Args:
+        snapshot: the new snapshot
+    """
+    broadcaster.publish(snapshot.name, snapshot_event(snapshot))
+    websocket_broadcaster.publish(snapshot.name, snapshot)
+    broadcast_summary()
+
+
+def broadcast_summary():
+    """
+    Push the summary of all instruments to the clients following it if it has changed, e.g. after a new snapshot
+    or a change of state of a host's circuit breaker. Must be called on the IO loop.
+    """
+    global last_broadcast_all_instruments_body
+    if broadcaster.has_subscribers(ALL_INSTRUMENTS):
+        body = get_all_instruments_body()
+        if body != last_broadcast_all_instruments_body:
+            last_broadcast_all_instruments_body = body
+            broadcaster.publish(ALL_INSTRUMENTS, format_server_sent_event(body))
+
+
+def record_view(instrument):
+    """
+    Record that a client has viewed an instrument's data. Names which are not of a known instrument are ignored,
+    so that requests for made up instruments are not kept.
+    Args:
+        instrument: name of the instrument
+    """
+    if snapshot_store.get(instrument) is not None:
+        viewer_demand.record_view(instrument)
+
 
 class MyHandler(tornado.web.RequestHandler):
     """
@@ -46,32 +116,46 @@ class MyHandler(tornado.web.RequestHandler):
         instrument = "Not set"
         try:
             instrument, callback = get_instrument_and_callback(path)
+            # Allow responses to be cached but make clients check they are still current with their Etag
+            self.set_header("Cache-Control", "no-cache")
 
             # Debug is only needed when debugging
             logger.debug(
                 "Connection from {} looking at {}".format(self.request.remote_ip, instrument)
             )
 
-            with scraped_data_lock:
-                if instrument == "ALL":
-                    ans = {
-                        "error": web_manager.instrument_list_retrieval_errors(),
-                        "instruments": get_summary_details_of_all_instruments(scraped_data),
-                    }
+            if instrument == ALL_INSTRUMENTS:
+                body = get_all_instruments_body()
+                response = b"".join([callback.encode("utf-8"), b"(", body, b")"])
 
+            else:
+                record_view(instrument)
+                # The instrument's JSON is encoded and compressed once per scrape, so only the
+                # callback needs adding
+                snapshot = get_snapshot_of_specific_instrument(
+                    instrument, snapshot_store.snapshots()
+                )
+                # A client with a recent generation only needs the patch from it
+                since = get_since_generation(path)
+                patch_message = None if since is None else snapshot.patch_message_since(since)
+                if patch_message is not None:
+                    response = b"".join([callback.encode("utf-8"), b"(", patch_message, b")"])
                 else:
-                    ans = get_detailed_state_of_specific_instrument(instrument, scraped_data)
-
-            try:
-                ans_as_json = str(json.dumps(ans))
-            except Exception as err:
-                raise ValueError("Unable to convert answer data to JSON: {}".format(err))
-
-            response = "{}({})".format(callback, ans_as_json)
+                    encoding = choose_content_encoding(
+                        self.request.headers.get("Accept-Encoding"), available_encodings(callback)
+                    )
+                    self.set_header("Vary", "Accept-Encoding")
+                    self.set_header("Etag", snapshot.etag_for(encoding))
+                    if self.check_etag_header():
+                        self.set_status(304)
+                        return
+                    response = snapshot.encoded.jsonp(callback, encoding)
+                    if encoding != IDENTITY:
+                        self.set_header("Content-Encoding", encoding)
 
             self.set_status(200)
             self.set_header("Content-type", "text/html")
-            self.write(response.encode("utf-8"))
+            self.write(response)
         except ValueError as e:
             logger.exception(
                 "Value Error when getting data from {} for {}: {}".format(
@@ -93,6 +177,157 @@ class MyHandler(tornado.web.RequestHandler):
         return
 
 
+def get_status():
+    """
+    Returns: dictionary of statistics for monitoring the server
+    """
+    return {
+        "http_connections": connection_statistics(),
+        "channel_access": channel_cache.statistics(),
+        "viewed_instruments": viewer_demand.viewed_instruments(),
+    }
+
+
+class StatusHandler(tornado.web.RequestHandler):
+    """
+    Serves statistics for monitoring the server as JSON.
+    """
+
+    def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Cache-Control", "no-cache")
+        self.write(json_backend.dumps(get_status()))
+
+
+class InstrumentEventsHandler(tornado.web.RequestHandler):
+    """
+    Handle clients following an instrument, or the summary of all instruments, as server-sent events. An event
+    is sent with the current data when the client connects and then each time the data changes.
+    """
+
+    _subscription = None
+
+    async def get(self):
+        """
+        Called when a client opens an event stream. Sends events until the client disconnects.
+        """
+        instrument = self.get_argument("Instrument", "").upper()
+        if instrument == "":
+            raise tornado.web.HTTPError(400, "No instrument specified")
+
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        # The pages are served from a different host to the data
+        self.set_header("Access-Control-Allow-Origin", "*")
+
+        self._subscription = broadcaster.subscribe(instrument)
+        try:
+            message = self._current_event(instrument)
+            while not self._subscription.closed:
+                record_view(instrument)
+                if message is None:
+                    message = b": keep alive\n\n"
+                self.write(message)
+                await self.flush()
+                message = await self._subscription.next_message(EVENT_STREAM_KEEP_ALIVE)
+        except StreamClosedError:
+            pass
+        finally:
+            broadcaster.unsubscribe(self._subscription)
+
+    def on_connection_close(self):
+        """
+        Called when the client disconnects, stops the stream without waiting for the next event.
+        """
+        if self._subscription is not None:
+            self._subscription.close()
+
+    def _current_event(self, instrument):
+        """
+        Args:
+            instrument: the instrument being followed
+
+        Returns: the event for the current data; None if there is none or the client already has it
+        """
+        if instrument == ALL_INSTRUMENTS:
+            return format_server_sent_event(get_all_instruments_body())
+
+        snapshot = snapshot_store.get(instrument)
+        if snapshot is None:
+            return None
+        # The token of a generation from before the server restarted never matches
+        if self.request.headers.get("Last-Event-ID") == snapshot.token:
+            return None
+        return snapshot_event(snapshot)
+
+
+class InstrumentWebSocketHandler(tornado.websocket.WebSocketHandler):
+    """
+    Handle clients following an instrument over a websocket. The whole snapshot is sent when the client connects,
+    after which only the changes are sent. The changes are computed once per scrape and shared by all clients.
+    """
+
+    _subscription = None
+
+    def check_origin(self, origin):
+        """
+        Allow connections from any origin, as the pages are served from a different host to the data.
+        """
+        return True
+
+    def open(self):
+        """
+        Called when a client connects, starts sending it the instrument's data.
+        """
+        instrument = self.get_argument("Instrument", "").upper()
+        if instrument == "" or instrument == ALL_INSTRUMENTS:
+            self.close(reason="A single instrument must be specified")
+            return
+        self._subscription = websocket_broadcaster.subscribe(instrument)
+        tornado.ioloop.IOLoop.current().spawn_callback(self._send_updates, instrument)
+
+    async def _send_updates(self, instrument):
+        """
+        Send the current snapshot then each change to it until the client disconnects. If the client falls behind
+        it is sent the whole of the latest snapshot instead of the changes it missed.
+        Args:
+            instrument: the instrument being followed
+        """
+        sent_generation = None
+        snapshot = snapshot_store.get(instrument)
+        try:
+            while not self._subscription.closed:
+                record_view(instrument)
+                if snapshot is not None:
+                    if (
+                        sent_generation is not None
+                        and sent_generation == snapshot.generation - 1
+                        and snapshot.delta_message is not None
+                    ):
+                        await self.write_message(snapshot.delta_message)
+                    elif sent_generation != snapshot.generation:
+                        await self.write_message(encode_snapshot_message(snapshot))
+                    sent_generation = snapshot.generation
+                snapshot = await self._subscription.next_message(EVENT_STREAM_KEEP_ALIVE)
+        except tornado.websocket.WebSocketClosedError:
+            pass
+        finally:
+            websocket_broadcaster.unsubscribe(self._subscription)
+
+    def on_message(self, message):
+        """
+        Messages from the client are ignored.
+        """
+        pass
+
+    def on_close(self):
+        """
+        Called when the client disconnects, stops sending updates.
+        """
+        if self._subscription is not None:
+            self._subscription.close()
+
+
 if __name__ == "__main__":
     # It can sometime be useful to define a local instrument list to add/override the instrument list do this here
     # E.g. to add local instrument local_inst_list = {"LOCALHOST": ("localhost", "MYPVPREFIX")}
@@ -103,10 +338,17 @@ if __name__ == "__main__":
     # As documented at https://github.com/tornadoweb/tornado/issues/2608
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+    io_loop = tornado.ioloop.IOLoop.current()
+    snapshot_store.add_listener(lambda snapshot: io_loop.add_callback(broadcast_snapshot, snapshot))
+    snapshot_store.add_summary_listener(lambda: io_loop.add_callback(broadcast_summary))
+
     try:
         application = tornado.web.Application(
             [
                 (r"/", MyHandler),
+                (r"/events", InstrumentEventsHandler),
+                (r"/websocket", InstrumentWebSocketHandler),
+                (r"/status", StatusHandler),
             ]
         )
         http_server = tornado.httpserver.HTTPServer(
@@ -117,7 +359,7 @@ if __name__ == "__main__":
             },
         )
         http_server.listen(PORT, HOST)
-        tornado.ioloop.IOLoop.current().start()
+        io_loop.start()
     except KeyboardInterrupt:
         print("Shutting down")
         web_manager.stop()